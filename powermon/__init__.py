@@ -1,6 +1,6 @@
 # import locale
-import gettext
 import pathlib
+from functools import lru_cache
 
 #from .mqttbroker.mqttbroker import MqttBroker
 
@@ -9,6 +9,15 @@ from .version import __version__
 __all__: list = ['__version__']
 
 LOCALE_PATH = f"{pathlib.Path(__file__).parent}/locale/"
-lang = gettext.translation(domain="powermon", localedir=LOCALE_PATH, languages=['en'])
-lang.install()
-tl = lang.gettext
+
+
+@lru_cache(maxsize=1)
+def _translation():
+    # loaded on first use - importing powermon does not read the message catalog
+    import gettext
+    return gettext.translation(domain="powermon", localedir=LOCALE_PATH, languages=['en'])
+
+
+def tl(message: str) -> str:
+    """ translate message """
+    return _translation().gettext(message)
@@ -40,11 +40,13 @@ def create_app(deps: Optional[Deps] = None) -> typer.Typer:
     ble_app = typer.Typer(help="Bluetooth Low Energy operations")
     config_app = typer.Typer(help="Configuration management")
     test_app = typer.Typer(help="Run protocol fixture tests")
+    profile_app = typer.Typer(help="Profile powermon itself")
 
     app.add_typer(list_app, name="list")
     app.add_typer(ble_app, name="ble")
     app.add_typer(config_app, name="config")
     app.add_typer(test_app, name="test")
+    app.add_typer(profile_app, name="profile")
 
     # ------------------------------------------------------------------
     # Completion + caching helpers (closed over deps for test injection)
@@ -148,32 +150,24 @@ def create_app(deps: Optional[Deps] = None) -> typer.Typer:
     def _resolve_command_id_exact(proto: object, token: str) -> tuple[CommandDefinition, SelectorTarget | None]:
         """
         Resolve user-supplied command token (any case) to canonical command_id.
-        Exact match only (no prefix guessing).
+        Command ids, selectors and parameterised commands only (no prefix guessing).
         """
         tok = token.strip()
         if not tok:
             raise typer.BadParameter("Command token is empty")
 
-        # get the commands defined by the protocol, and build a mapping of upper-case command_id -> canonical command_id
-        commands = getattr(proto, "commands", {}) or {}
-
-        canon_by_upper = {str(cid).upper(): str(cid) for cid in commands.keys()}
-        u = tok.upper()
-
-        if u in canon_by_upper:
-            return commands[canon_by_upper[u]], None  # type: ignore[index]
-            #return canon_by_upper[u]
-
-        # check selectors for matches if no command_id match found
-        selectors = getattr(proto, "selectors", {}) or {}
-
-        for selector_name, selector_target in selectors.items():
-            if str(selector_name).upper() == u:
-                #breakpoint()
-                #return str(selector_target.command_id)
-                return commands[selector_target.command_id], selector_target
-
-        raise typer.BadParameter(f"Command not found (not defined): '{token}'")
+        try:
+            resolved = proto.command_index.resolve(tok)  # type: ignore[attr-defined]
+        except KeyError as exc:
+            raise typer.BadParameter(f"Command not found (not defined): '{token}'") from exc
+        except ValueError as exc:
+            # a parameterised command named without its parameters - fine to describe / decode its responses
+            commands = getattr(proto, "commands", {}) or {}
+            canon_by_upper = {str(cid).upper(): str(cid) for cid in commands.keys()}
+            if tok.upper() in canon_by_upper:
+                return commands[canon_by_upper[tok.upper()]], None  # type: ignore[index]
+            raise typer.BadParameter(str(exc)) from exc
+        return resolved.command, resolved.selector
 
         
     def _wire_request_bytes(proto: object, req: object) -> bytes:
@@ -902,7 +896,7 @@ def create_app(deps: Optional[Deps] = None) -> typer.Typer:
             readings_map = getattr(cmd, "readings", {}) or {}
             if readings_map and decode_all is not None:
                 try:
-                    decoded = decode_all(parsed, readings_map)
+                    decoded = decode_all(parsed, cmd.decode_plan)
 
                     if selector is not None and selector.reading_key is not None:
                         # If the command was resolved via a reading selector, filter to just that reading key for display
@@ -926,6 +920,150 @@ def create_app(deps: Optional[Deps] = None) -> typer.Typer:
 
         console.print(table)
 
+    # ---- bench ----
+
+    @app.command("bench")
+    def bench_cmd(
+        protocol: str = typer.Argument(
+            ...,
+            metavar="PROTOCOL",
+            help="Protocol token (e.g. 'pi30')",
+            autocompletion=complete_protocols,
+        ),
+        command: Optional[str] = typer.Argument(
+            None,
+            metavar="[COMMAND]",
+            help="Only benchmark this command's fixtures.",
+            autocompletion=complete_commands_for_ctx,
+        ),
+        iterations: int = typer.Option(5000, "--iterations", "-n", min=1, help="Iterations per stage."),
+        save: Optional[Path] = typer.Option(None, "--save-baseline", dir_okay=False, help="Write results to this baseline JSON file."),
+        baseline: Optional[Path] = typer.Option(
+            None,
+            "--baseline",
+            exists=True,
+            dir_okay=False,
+            help="Compare against this baseline JSON file, exit 1 on regression.",
+        ),
+        threshold: float = typer.Option(0.25, "--threshold", min=0.0, help="Allowed slowdown vs baseline (0.25 = 25%)."),
+    ) -> None:
+        """
+        Benchmark the response decode path using the protocol fixtures.
+
+        Every fixture is run through validate -> verify_crc -> strip -> parse -> decode_all,
+        reporting ns/op and allocated bytes/op per stage.
+
+        Examples:
+        powermon-cli bench pi30
+        powermon-cli bench pi30 qpigs -n 20000
+        powermon-cli bench pi30 --save-baseline bench-pi30.json
+        powermon-cli bench pi30 --baseline bench-pi30.json --threshold 0.2
+        """
+        from .bench import STAGES, BenchError, find_regressions, iter_benches, load_baseline, save_baseline
+
+        proto = cached_protocol(protocol)
+        try:
+            results = list(iter_benches(proto, command=command, iterations=iterations))
+        except BenchError as exc:
+            print(f"[red]{exc}[/]")
+            raise typer.Exit(code=1) from exc
+
+        table = Table(title=f"Decode benchmark: {proto.protocol_id} ({iterations} iterations)")
+        table.add_column("Fixture", style="cyan", no_wrap=True)
+        for stage in STAGES:
+            table.add_column(f"{stage}\nns/op (B/op)", justify="right")
+        table.add_column("total\nns/op", justify="right", style="green")
+        for r in results:
+            if r.error is not None:
+                table.add_row(r.key, f"[red]{r.error}[/]")
+                continue
+            table.add_row(
+                r.key,
+                *(f"{s.ns_per_op:,.0f} ({s.alloc_bytes_per_op:,})" for s in r.stages),
+                f"{r.total_ns_per_op:,.0f}",
+            )
+        console.print(table)
+
+        if save is not None:
+            save_baseline(results, save)
+            print(f"[green]Baseline saved to {save}[/]")
+
+        if baseline is not None:
+            try:
+                regressions = find_regressions(results, load_baseline(baseline), threshold=threshold)
+            except BenchError as exc:
+                print(f"[red]{exc}[/]")
+                raise typer.Exit(code=2) from exc
+            for reg in regressions:
+                print(f"[red]REGRESSION[/] {reg.key} {reg.stage}: {reg.baseline_ns:,.0f} -> {reg.current_ns:,.0f} ns/op (x{reg.ratio:.2f})")
+            if regressions:
+                raise typer.Exit(code=1)
+            print(f"[green]No regressions against {baseline} (threshold {threshold:.0%})[/]")
+
+    # ---- profile ----
+
+    @profile_app.command("startup")
+    def profile_startup_cmd(
+        entry: str = typer.Option("all", "--entry", "-e", help="Entry point: 'run' (powermon), 'cli' (powermon-cli) or 'all'."),
+        min_ms: float = typer.Option(5.0, "--min-ms", min=0.0, help="Hide imports with a smaller cumulative time."),
+        depth: int = typer.Option(4, "--depth", min=1, help="Levels of the import tree to show."),
+        top: int = typer.Option(10, "--top", min=0, help="Also list this many modules with the largest self time."),
+        repeat: int = typer.Option(1, "--repeat", "-r", min=1, help="Import this many times, report the fastest."),
+        budget: bool = typer.Option(False, "--budget", help="Exit 1 if an entry point is over its startup budget."),
+    ) -> None:
+        """
+        Show what the entry points import at startup, with cumulative import times.
+
+        Each entry point is imported in a fresh interpreter with `python -X importtime`.
+
+        Examples:
+        powermon-cli profile startup
+        powermon-cli profile startup -e run --min-ms 1 --depth 6
+        powermon-cli profile startup --repeat 3 --budget
+        """
+        from rich.tree import Tree
+
+        from .importprofile import ENTRY_POINTS, STARTUP_BUDGET_MS, ImportProfileError, check_budget, profile_startup
+
+        entries = list(ENTRY_POINTS) if entry == "all" else [entry]
+        failures = []
+        for name in entries:
+            try:
+                profile = profile_startup(name, repeat=repeat)
+            except ImportProfileError as exc:
+                print(f"[red]{exc}[/]")
+                raise typer.Exit(code=1) from exc
+
+            tree = Tree(f"[bold]{name}[/]: {ENTRY_POINTS[name]} - [green]{profile.total_ms:,.1f} ms[/]"
+                        f" (budget {STARTUP_BUDGET_MS.get(name, 0):,.0f} ms)")
+
+            def _add(branch, nodes, level):
+                for node in sorted(nodes, key=lambda n: n.cumulative_us, reverse=True):
+                    if node.cumulative_us < min_ms * 1000:
+                        continue
+                    child = branch.add(f"[cyan]{node.module}[/] {node.cumulative_us / 1000:,.1f} ms"
+                                       f" [dim](self {node.self_us / 1000:,.1f} ms)[/]")
+                    if level < depth:
+                        _add(child, node.children, level + 1)
+
+            _add(tree, profile.roots, 1)
+            console.print(tree)
+
+            if top:
+                table = Table(title=f"{name}: largest self import times")
+                table.add_column("Module", style="cyan")
+                table.add_column("self ms", justify="right")
+                table.add_column("cumulative ms", justify="right")
+                for node in profile.heaviest(top):
+                    table.add_row(node.module, f"{node.self_us / 1000:,.1f}", f"{node.cumulative_us / 1000:,.1f}")
+                console.print(table)
+            failures.extend(check_budget(profile))
+
+        for failure in failures:
+            print(f"[red]OVER BUDGET[/] {failure.entry}: {failure.message}")
+        if budget and failures:
+            raise typer.Exit(code=1)
+
 
     return app
 
@@ -0,0 +1,218 @@
+# powermon/cli/bench.py
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from powermon.protocols.decoding import decode_all
+
+# the decode hot path, in the order a response passes through it
+STAGES = ("validate", "verify_crc", "strip", "parse", "decode_all")
+
+
+class BenchError(ValueError):
+    """Raised when a benchmark cannot be run (eg no fixtures for the protocol)."""
+
+
+@dataclass(frozen=True)
+class StageResult:
+    stage: str
+    ns_per_op: float
+    alloc_bytes_per_op: int  # peak traced memory allocated while running the stage once
+
+
+@dataclass(frozen=True)
+class FixtureBench:
+    protocol_id: str
+    command_id: str
+    fixture: int  # 1-based, matches `powermon-cli test run --fixture`
+    description: str
+    iterations: int
+    stages: list[StageResult] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.protocol_id}/{self.command_id}#{self.fixture}"
+
+    @property
+    def total_ns_per_op(self) -> float:
+        return sum(s.ns_per_op for s in self.stages)
+
+
+@dataclass(frozen=True)
+class Regression:
+    key: str
+    stage: str
+    baseline_ns: float
+    current_ns: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ns / self.baseline_ns if self.baseline_ns else float("inf")
+
+
+def load_fixtures(proto: Any) -> dict[str, list[Any]]:
+    """Return the FIXTURES mapping (command_id -> list[CommandFixture]) for a protocol."""
+    proto_id = getattr(proto, "protocol_id", None)
+    if not proto_id:
+        raise BenchError("ProtocolDefinition has no protocol_id")
+    try:
+        fixtures_mod = import_module(f"powermon.protocols.{str(proto_id).lower()}.fixtures")
+    except ImportError as exc:
+        raise BenchError(f"No fixtures module for protocol '{proto_id}'") from exc
+    fixtures = getattr(fixtures_mod, "FIXTURES", None)
+    if not isinstance(fixtures, dict):
+        raise BenchError("fixtures.py must export FIXTURES: dict[str, list[CommandFixture]]")
+    return fixtures
+
+
+def stage_calls(framing: Any, cmd: Any, raw: bytes) -> list[tuple[str, Callable[[], Any]]]:
+    """
+    Build a zero-arg callable for each stage, with its input precomputed
+    from the previous stage so each one can be timed in isolation.
+    """
+    framing.validate(raw)
+    framing.verify_crc(raw)
+    payload = framing.strip(raw)
+    parsed = cmd.response.parse(payload)
+    readings = cmd.decode_plan
+    decode_all(parsed, readings)
+    return [
+        ("validate", lambda: framing.validate(raw)),
+        ("verify_crc", lambda: framing.verify_crc(raw)),
+        ("strip", lambda: framing.strip(raw)),
+        ("parse", lambda: cmd.response.parse(payload)),
+        ("decode_all", lambda: decode_all(parsed, readings)),
+    ]
+
+
+def _time_ns_per_op(func: Callable[[], Any], iterations: int) -> float:
+    perf_counter_ns = time.perf_counter_ns
+    start = perf_counter_ns()
+    for _ in range(iterations):
+        func()
+    return (perf_counter_ns() - start) / iterations
+
+
+def _alloc_bytes_per_op(func: Callable[[], Any], samples: int = 5) -> int:
+    """Peak memory allocated by a single call (min over a few samples to exclude one-off caching)."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            before, _peak = tracemalloc.get_traced_memory()
+            result = func()
+            _current, peak = tracemalloc.get_traced_memory()
+            del result
+            peaks.append(peak - before)
+        return max(0, min(peaks))
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def bench_fixture(proto: Any, cmd: Any, index: int, fixture: Any, *, iterations: int = 5000) -> FixtureBench:
+    """Benchmark every stage of the decode path for one fixture."""
+    common = {
+        "protocol_id": str(proto.protocol_id),
+        "command_id": str(cmd.command_id),
+        "fixture": index,
+        "description": getattr(fixture, "description", "") or "",
+        "iterations": iterations,
+    }
+    try:
+        calls = stage_calls(proto.framing, cmd, bytes(fixture.raw_response))
+    except Exception as exc:  # fixture does not decode - report it rather than time a failure path
+        return FixtureBench(**common, error=f"{exc.__class__.__name__}: {exc}")
+
+    stages = []
+    for stage, func in calls:
+        func()  # warm up (lazy imports, caches)
+        stages.append(
+            StageResult(
+                stage=stage,
+                ns_per_op=_time_ns_per_op(func, iterations),
+                alloc_bytes_per_op=_alloc_bytes_per_op(func),
+            )
+        )
+    return FixtureBench(**common, stages=stages)
+
+
+def iter_benches(
+    proto: Any,
+    *,
+    command: Optional[str] = None,
+    iterations: int = 5000,
+) -> Iterator[FixtureBench]:
+    """Benchmark every fixture of a protocol (or of a single command)."""
+    fixtures_map = load_fixtures(proto)
+    if command is not None:
+        wanted = command.strip().upper()
+        fixtures_map = {cid: fxs for cid, fxs in fixtures_map.items() if str(cid).upper() == wanted}
+        if not fixtures_map:
+            raise BenchError(f"No fixtures found for command '{command}'")
+
+    for command_id, fixtures in fixtures_map.items():
+        cmd = proto.commands.get(command_id)
+        if cmd is None:
+            continue
+        for index, fixture in enumerate(fixtures, start=1):
+            yield bench_fixture(proto, cmd, index, fixture, iterations=iterations)
+
+
+# ------------------------------------------------------------------
+# Baselines
+# ------------------------------------------------------------------
+
+def to_baseline(results: list[FixtureBench]) -> dict[str, Any]:
+    """Baseline document: {"python": ..., "results": {key: {stage: {ns_per_op, alloc_bytes_per_op}}}}"""
+    import platform
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {
+            r.key: {s.stage: {"ns_per_op": round(s.ns_per_op, 1), "alloc_bytes_per_op": s.alloc_bytes_per_op} for s in r.stages}
+            for r in results
+            if r.error is None
+        },
+    }
+
+
+def save_baseline(results: list[FixtureBench], path: Path) -> None:
+    path.write_text(json.dumps(to_baseline(results), indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: Path) -> dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise BenchError(f"Unable to read baseline {path}: {exc}") from exc
+    if not isinstance(data.get("results"), dict):
+        raise BenchError(f"Baseline {path} has no results")
+    return data
+
+
+def find_regressions(results: list[FixtureBench], baseline: dict[str, Any], *, threshold: float = 0.25) -> list[Regression]:
+    """Stages that are more than `threshold` (fractional) slower than the baseline."""
+    regressions = []
+    for r in results:
+        base = baseline["results"].get(r.key)
+        if not base:
+            continue
+        for s in r.stages:
+            baseline_ns = (base.get(s.stage) or {}).get("ns_per_op")
+            if baseline_ns and s.ns_per_op > baseline_ns * (1 + threshold):
+                regressions.append(Regression(key=r.key, stage=s.stage, baseline_ns=baseline_ns, current_ns=s.ns_per_op))
+    return regressions
+
@@ -52,7 +52,6 @@ def default_deps() -> Deps:
     Any errors importing protocol modules should be surfaced loudly (wrapped as ConfigError).
     """
     from platform import python_version as _python_version
-    from deepdiff import DeepDiff as _DeepDiff
 
     from powermon import tl as _translate
     from powermon.version import __version__ as _version
@@ -63,19 +62,27 @@ def default_deps() -> Deps:
     from powermon.outputs.output import Output
 
     # ------------------------------------------------------------------
-    # Lazy registry construction (imports all protocol definition modules)
+    # Lazy registry (protocol definition modules are imported on first use)
     # ------------------------------------------------------------------
     @lru_cache(maxsize=1)
     def _registry():
         """
-        Build and cache the ProtocolRegistry.
+        Build and cache the ProtocolRegistry - indexes the protocols, imports none of them.
+        """
+        # Import here to avoid protocol imports at app creation time
+        from powermon.protocols.catalog import build_registry
+        return build_registry()
+
+    def _from_registry(lookup: Callable[[Any], Any]) -> Any:
+        """
+        Run a registry lookup (which may load protocols).
 
         Any protocol import/load failure is converted into ConfigError with details.
         """
         try:
-            # Import here to avoid protocol imports at app creation time
-            from powermon.protocols.catalog import build_registry
-            return build_registry(validate=True)
+            return lookup(_registry())
+        except _ConfigError:
+            raise
         except Exception as exc:
             # If your catalog defines a ProtocolCatalogError with .failures, surface it nicely.
             # Otherwise, fall back to generic exception formatting.
@@ -96,7 +103,7 @@ def default_deps() -> Deps:
                     "Failed to load one or more protocols:\n" + detail
                 ) from exc
 
-            raise _ConfigError(f"Failed to build protocol registry: {exc}") from exc
+            raise _ConfigError(f"Failed to load protocol: {exc}") from exc
 
     def _parse_protocol_type(token: str) -> ProtocolType:
         """
@@ -125,17 +132,22 @@ def default_deps() -> Deps:
     # ------------------------------------------------------------------
     def _list_protocols() -> list[Any]:
         # returns list[ProtocolDefinition] in practice
-        return _registry().list_protocols()
+        return _from_registry(lambda registry: registry.list_protocols())
 
     def _list_commands(protocol_token: str) -> Iterable[Any]:
         # returns Iterable[CommandDefinition] in practice
         ptype = _parse_protocol_type(protocol_token)
-        return _registry().list_commands(ptype)
+        return _from_registry(lambda registry: list(registry.list_commands(ptype)))
 
     def _get_protocol_definition(protocol_token: str) -> Any:
         # returns ProtocolDefinition in practice
         ptype = _parse_protocol_type(protocol_token)
-        return _registry().get(ptype)
+        return _from_registry(lambda registry: registry.get(ptype))
+
+    def _deepdiff(*args: Any, **kwargs: Any) -> Any:
+        # deepdiff is only needed by `compare` - import it when called
+        from deepdiff import DeepDiff
+        return DeepDiff(*args, **kwargs)
 
     # ------------------------------------------------------------------
     # Config generator (stub for now—replace later with real implementation)
@@ -167,7 +179,7 @@ def default_deps() -> Deps:
         protocol_enum=ProtocolType,
         get_protocol_definition=_get_protocol_definition,
         config_error_type=_ConfigError,
-        deepdiff=_DeepDiff,
+        deepdiff=_deepdiff,
         generate_config_file=_generate_config_file,
         ble_reset=_ble_reset,
         ble_scan=_ble_scan,
@@ -0,0 +1,137 @@
+""" powermon / cli / importprofile.py
+
+Startup import profiling for the powermon entry points.
+
+Each entry point is imported in a fresh interpreter under `python -X importtime`
+and the output parsed into a tree of ImportNodes. check_budget reports an entry
+point that takes longer than its STARTUP_BUDGET_MS or that imports one of the
+DEFERRED_MODULES (heavy / optional dependencies only the code using them should
+import). Used by `powermon-cli profile startup`.
+"""
+from __future__ import annotations
+
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+# what each entry point imports before it does any work
+ENTRY_POINTS = {
+    "run": "import powermon.powermon",  # `powermon`
+    "cli": "from powermon.cli.app import create_app; create_app()",  # `powermon-cli` (app and deps built)
+}
+
+# cumulative import time allowed per entry point (best of a few runs)
+STARTUP_BUDGET_MS = {"run": 750.0, "cli": 750.0}
+
+# heavy / optional dependencies only the code paths that use them should import
+DEFERRED_MODULES = ("bleak", "construct", "Crypto", "dateparser", "deepdiff", "paho")
+
+
+class ImportProfileError(RuntimeError):
+    """Raised when an entry point cannot be profiled (eg it fails to import)."""
+
+
+@dataclass
+class ImportNode:
+    module: str
+    self_us: int
+    cumulative_us: int
+    children: list[ImportNode] = field(default_factory=list)
+
+    def walk(self, depth: int = 0) -> Iterator[tuple[int, ImportNode]]:
+        yield depth, self
+        for child in self.children:
+            yield from child.walk(depth + 1)
+
+
+@dataclass
+class ImportProfile:
+    entry: str
+    roots: list[ImportNode]
+
+    @property
+    def total_us(self) -> int:
+        return sum(node.cumulative_us for node in self.roots)
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_us / 1000
+
+    def nodes(self) -> Iterator[ImportNode]:
+        for root in self.roots:
+            for _, node in root.walk():
+                yield node
+
+    def modules(self) -> set[str]:
+        return {node.module for node in self.nodes()}
+
+    def imported(self, package: str) -> bool:
+        """ was package (or any of its submodules) imported """
+        return any(module == package or module.startswith(package + ".") for module in self.modules())
+
+    def heaviest(self, count: int) -> list[ImportNode]:
+        """ the modules with the largest self time """
+        return sorted(self.nodes(), key=lambda node: node.self_us, reverse=True)[:count]
+
+
+@dataclass(frozen=True)
+class BudgetFailure:
+    entry: str
+    message: str
+
+
+def parse_importtime(text: str, entry: str = "") -> ImportProfile:
+    """
+    Build the import tree from `python -X importtime` output.
+
+    Each import is reported after its own imports, indented two spaces per level.
+    """
+    pending: dict[int, list[ImportNode]] = {}
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|", 2)
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # the header line
+        name = parts[2][1:]
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        node = ImportNode(module=name.strip(), self_us=int(parts[0]), cumulative_us=int(parts[1]))
+        node.children = pending.pop(depth + 1, [])
+        pending.setdefault(depth, []).append(node)
+    return ImportProfile(entry=entry, roots=pending.get(0, []))
+
+
+def profile_startup(entry: str, repeat: int = 1, python: Optional[str] = None) -> ImportProfile:
+    """ import profile of an entry point in a fresh interpreter - the fastest of repeat runs """
+    try:
+        code = ENTRY_POINTS[entry]
+    except KeyError as exc:
+        raise ImportProfileError(f"Unknown entry point '{entry}', expected one of: {', '.join(ENTRY_POINTS)}") from exc
+    best: Optional[ImportProfile] = None
+    for _ in range(max(1, repeat)):
+        proc = subprocess.run(
+            [python or sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if proc.returncode:
+            raise ImportProfileError(f"'{entry}' failed to import:\n{proc.stderr[-2000:]}")
+        profile = parse_importtime(proc.stderr, entry=entry)
+        if best is None or profile.total_us < best.total_us:
+            best = profile
+    return best
+
+
+def check_budget(profile: ImportProfile, budget_ms: Optional[float] = None) -> list[BudgetFailure]:
+    """ the ways the profile breaks the startup budget (empty if it is within it) """
+    failures = []
+    if budget_ms is None:
+        budget_ms = STARTUP_BUDGET_MS.get(profile.entry)
+    if budget_ms is not None and profile.total_ms > budget_ms:
+        failures.append(BudgetFailure(profile.entry, f"imports took {profile.total_ms:,.0f} ms (budget {budget_ms:,.0f} ms)"))
+    for package in DEFERRED_MODULES:
+        if profile.imported(package):
+            failures.append(BudgetFailure(profile.entry, f"imports '{package}' at startup - import it where it is used"))
+    return failures
@@ -1,41 +1,22 @@
 """ commands / command.py """
 import logging
-from enum import Enum
 
-from dateparser import parse as dateparse  # pylint: disable=W0611 # noqa: 401
 from pydantic import BaseModel
 
 from powermon.commands.command_definition import CommandDefinition
 from powermon.commands.result import Result
+from powermon.commands.templating import dateparse  # noqa: F401 - for templated commands
 from powermon.domain.triggers import Trigger
 from powermon.exceptions import (CommandExecutionFailed, ConfigError,
                                   InvalidCRC, InvalidResponse)
 from powermon.outputs import OutputType, multiple_from_config
 from powermon.outputs.output import Output
 from powermon.outputs.api_mqtt import ApiMqtt
+from powermon.protocols.model import CommandType  # noqa: F401 - defined with the protocol model
 
 log = logging.getLogger("Command")
 
 
-class CommandType(Enum):
-    """ enum of valid types of Results """
-    VICTRON_PING = 1
-    VICTRON_GET_FW = 3
-    VICTRON_GET_ID = 4
-    VICTRON_RESTART = 6
-    VICTRON_GET = 7
-    VICTRON_SET = 8
-    VICTRON_ASYNC = 'A'
-    VICTRON_LISTEN = 'L'
-    SERIAL_READONLY = 'serial_readonly'
-    SERIAL_READ_UNTIL_DONE = 'serial_read_util_done'
-    PI18_QUERY = 'pi18_query'
-    PI18_SETTER = 'pi18_setter'
-    JKSERIAL_SETTER = 'jkserial_setter'
-    JKSERIAL_READ = 'jkserial_read'
-    JKSERIAL_ACTIVATION = 'jkserial_activation'
-
-
 class Command():
     """
     Command object, holds the details of the command, including:
@@ -2,13 +2,16 @@
 import logging
 import re
 from enum import StrEnum, auto
+from typing import TYPE_CHECKING
 
-import construct as cs
 from pydantic import BaseModel
 
 from powermon.commands.reading_definition import ReadingDefinition, ReadingType
 from powermon.commands.result import ResponseType, ResultType
 
+if TYPE_CHECKING:
+    import construct as cs
+
 log = logging.getLogger("CommandDefinition")
 
 
@@ -67,7 +70,7 @@ class CommandDefinition:
         self.command_type = None
         self.command_code: str = None
         self.command_data: str = None
-        self.construct: cs.Construct = None
+        self.construct: "cs.Construct" = None
         self.construct_min_response: int = 0
         self.match = None
 
@@ -15,6 +15,8 @@ class ReadingDTO(BaseModel):
 
 class Reading:
     """ class to contain the raw reading, processed reading and reading definition for a particular reading """
+    __slots__ = ("_raw_value", "_processed_value", "_definition", "is_valid")
+
     def __str__(self):
         return f"Reading: {self.data_name=}, {self.data_value=}, {self.data_unit=}, {self.is_valid=}"
 
@@ -5,9 +5,13 @@ from ast import literal_eval
 from copy import deepcopy
 from enum import StrEnum, auto
 from struct import unpack
+from typing import TYPE_CHECKING
 
 from powermon.commands.reading import Reading
 
+if TYPE_CHECKING:
+    from powermon.commands.readingarray import ReadingArray
+
 log = logging.getLogger("ReadingDefinition")
 
 
@@ -317,11 +321,21 @@ class ReadingDefinition():
             case _:
                 return raw_value.decode('utf-8')
 
+    def processed_value(self, raw_value, override=None):
+        """ the processed value of a raw value """
+        return self.translate_raw_response(raw_value)
+
     def reading_from_raw_response(self, raw_value, override=None) -> list[Reading]:
         """ generate a reading object from a raw value """
         log.debug("raw_value: %s, override: %s", raw_value, override)
-        value = self.translate_raw_response(raw_value)
-        return [Reading(raw_value=raw_value, processed_value=value, definition=self)]
+        return [Reading(raw_value=raw_value, processed_value=self.processed_value(raw_value, override), definition=self)]
+
+    def add_readings_to(self, readings: "ReadingArray", raw_value, override=None) -> None:
+        """ decode a raw value into a ReadingArray - without building Reading objects unless reading_from_raw_response is overridden """
+        if type(self).reading_from_raw_response is ReadingDefinition.reading_from_raw_response:
+            readings.append(readings.layout.definition_meta(self), raw_value, self.processed_value(raw_value, override))
+        else:
+            readings.extend(self.reading_from_raw_response(raw_value, override=override) or ())
 
     def get_invalid_message(self, raw_value) -> str:
         """ message for invalid state """
@@ -527,9 +541,8 @@ class ReadingDefinitionNumeric(ReadingDefinition):
         if response_type not in [ResponseType.INT, ResponseType.TEMPLATE_INT, ResponseType.FLOAT, ResponseType.LE_2B_S, ResponseType.HEX_CHAR, ResponseType.TEMPLATE_ORD_INT]:
             raise TypeError(f"{type(self)} response must be of type int or float, ResponseType {response_type} is not valid")
 
-    def reading_from_raw_response(self, raw_value, override=None) -> list[Reading]:
-        """ generate a reading object from a raw value """
-        log.debug("raw_value: %s, override: %s", raw_value, override)
+    def processed_value(self, raw_value, override=None):
+        """ the processed value of a raw value - rounded to decimal_places """
         value = self.translate_raw_response(raw_value)
         decimal_places = None
         if self.decimal_places:
@@ -539,8 +552,7 @@ class ReadingDefinitionNumeric(ReadingDefinition):
 
         if decimal_places:
             value = round(value, decimal_places)
-
-        return [Reading(raw_value=raw_value, processed_value=value, definition=self)]
+        return value
 
 
 class ReadingDefinitionNull(ReadingDefinition):
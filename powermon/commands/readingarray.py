@@ -0,0 +1,234 @@
+""" readingarray.py
+
+Compact storage for the readings of a Result.
+
+A Reading is an object (and a set of properties) per decoded value, which adds
+up for the array heavy results (eg NEEY's 24 cell voltages and resistances)
+polled every few seconds. A ReadingArray keeps a result's readings as parallel
+columns instead:
+- metas: the ReadingMeta (name, unit, icon, ...) of each reading - interned
+  per command definition, so every poll of a command shares the same objects
+- raw_values / values: the raw and processed value of each reading
+- a validity bitmap (an int, 0 while every reading is valid)
+
+Formatters see ReadingView objects - lightweight views that quack like Reading.
+"""
+import weakref
+from typing import Any, Hashable, Iterable, Iterator, Optional
+
+from powermon.commands.reading import ReadingDTO
+
+# a ReadingLayout stops interning (and hands out uninterned metas) past this many entries
+MAX_INTERNED = 1024
+
+
+class ReadingMeta:
+    """ the display metadata of a reading definition - shared by the readings of that definition """
+    __slots__ = ("definition", "data_name", "data_unit", "icon", "device_class", "state_class", "component")
+
+    def __str__(self):
+        return f"ReadingMeta: {self.data_name=}, {self.data_unit=}"
+
+    def __init__(self, definition, key: Optional[tuple] = None) -> None:
+        self.definition = definition
+        self.data_name, self.data_unit, self.icon, self.device_class, self.state_class, self.component = \
+            (ReadingMeta.key_of(definition) if key is None else key)[:6]
+
+    @staticmethod
+    def key_of(definition) -> tuple:
+        """ the metadata of definition - readings with equal metadata share a ReadingMeta (and its definition,
+            so everything formatters read from the definition, eg options, is part of the key)
+        """
+        return (definition.description, definition.unit or "", definition.icon, definition.device_class,
+                definition.state_class, definition.component, _options_key(getattr(definition, "options", None)))
+
+
+def _options_key(options) -> Hashable:
+    """ a hashable equivalent of a definition's options (a dict or list) """
+    if options is None:
+        return None
+    key = tuple(options.items()) if isinstance(options, dict) else tuple(options)
+    try:
+        hash(key)
+    except TypeError:
+        # unhashable option values
+        return repr(options)
+    return key
+
+
+class ReadingLayout:
+    """ the interned ReadingMetas of one command definition """
+    _layouts: "weakref.WeakKeyDictionary[Any, ReadingLayout]" = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def for_command(cls, command_definition) -> "ReadingLayout":
+        """ the layout of command_definition - created on first use """
+        try:
+            layout = cls._layouts.get(command_definition)
+            if layout is None:
+                layout = cls._layouts[command_definition] = cls()
+        except TypeError:
+            # not hashable / weak referenceable (eg a stand-in definition) - nothing is shared
+            layout = cls()
+        return layout
+
+    def __init__(self) -> None:
+        self._metas: dict[tuple, ReadingMeta] = {}
+        self._by_definition: dict[int, tuple[Any, ReadingMeta]] = {}
+
+    def __len__(self) -> int:
+        return len(self._metas)
+
+    def meta(self, definition) -> ReadingMeta:
+        """ the interned ReadingMeta for definition
+            (keyed on the metadata, definitions are copied and adjusted per reading, eg flags and temperature units)
+        """
+        return self._intern(ReadingMeta.key_of(definition), definition)
+
+    def decoded_meta(self, reading_key: str, definition) -> ReadingMeta:
+        """ the interned ReadingMeta of a reading decoded by a protocol's DecodePlan
+            (definition is the protocols.model ReadingDefinition of reading_key - named by its label)
+        """
+        name = getattr(definition, "label", None) or reading_key
+        return self._intern((name, getattr(definition, "unit", None) or "", None, None, None, None, None), definition)
+
+    def _intern(self, key: tuple, definition) -> ReadingMeta:
+        meta = self._metas.get(key)
+        if meta is None:
+            meta = ReadingMeta(definition, key)
+            if len(self._metas) < MAX_INTERNED:
+                self._metas[key] = meta
+        return meta
+
+    def definition_meta(self, definition) -> ReadingMeta:
+        """ meta(definition), remembered per definition object - for the command's own definitions, which are not changed while decoding """
+        entry = self._by_definition.get(id(definition))
+        if entry is not None and entry[0] is definition:
+            return entry[1]
+        meta = self.meta(definition)
+        if len(self._by_definition) < MAX_INTERNED:
+            self._by_definition[id(definition)] = (definition, meta)
+        return meta
+
+
+class ReadingView:
+    """ a view of one reading in a ReadingArray - quacks like Reading """
+    __slots__ = ("_array", "_index", "meta")
+
+    def __str__(self):
+        return f"Reading: {self.data_name=}, {self.data_value=}, {self.data_unit=}, {self.is_valid=}"
+
+    def __init__(self, array: "ReadingArray", index: int) -> None:
+        self._array = array
+        self._index = index
+        self.meta: ReadingMeta = array.metas[index]
+
+    @property
+    def raw_value(self):
+        return self._array.raw_values[self._index]
+
+    @property
+    def processed_value(self):
+        return self._array.values[self._index]
+
+    @property
+    def data_value(self):
+        return self._array.values[self._index]
+
+    @property
+    def is_valid(self) -> bool:
+        return self._array.is_valid(self._index)
+
+    @property
+    def definition(self):
+        return self.meta.definition
+
+    @property
+    def data_name(self) -> str:
+        return self.meta.data_name
+
+    @property
+    def data_unit(self) -> str:
+        return self.meta.data_unit
+
+    @property
+    def icon(self) -> str | None:
+        return self.meta.icon
+
+    @property
+    def device_class(self) -> str | None:
+        return self.meta.device_class
+
+    @property
+    def state_class(self) -> str | None:
+        return self.meta.state_class
+
+    @property
+    def component(self) -> str | None:
+        return self.meta.component
+
+    def to_dto(self) -> ReadingDTO:
+        """ convert the reading to a data transfer object """
+        return ReadingDTO(data_name=self.data_name, data_value=self.data_value, data_unit=self.data_unit)
+
+
+class ReadingArray:
+    """ the readings of a result, stored as parallel columns - a sequence of ReadingViews """
+    __slots__ = ("layout", "metas", "raw_values", "values", "_invalid")
+
+    def __str__(self):
+        return f"ReadingArray: {len(self)} readings, {self.invalid_count()} invalid"
+
+    def __init__(self, layout: Optional[ReadingLayout] = None) -> None:
+        self.layout = ReadingLayout() if layout is None else layout
+        self.metas: list[ReadingMeta] = []
+        self.raw_values: list = []
+        self.values: list = []
+        self._invalid = 0  # bit n set: reading n is not valid
+
+    @classmethod
+    def from_readings(cls, readings: Iterable, layout: Optional[ReadingLayout] = None) -> "ReadingArray":
+        array = cls(layout)
+        array.extend(readings)
+        return array
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ReadingView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("reading index out of range")
+        return ReadingView(self, index)
+
+    def __iter__(self) -> Iterator[ReadingView]:
+        for index in range(len(self.values)):
+            yield ReadingView(self, index)
+
+    def is_valid(self, index: int) -> bool:
+        return not (self._invalid >> index) & 1
+
+    def invalid_count(self) -> int:
+        return self._invalid.bit_count()
+
+    def append(self, meta: ReadingMeta, raw_value, value, is_valid: bool = True) -> None:
+        if not is_valid:
+            self._invalid |= 1 << len(self.values)
+        self.metas.append(meta)
+        self.raw_values.append(raw_value)
+        self.values.append(value)
+
+    def add(self, definition, raw_value, value, is_valid: bool = True) -> None:
+        """ add a reading of definition """
+        self.append(self.layout.meta(definition), raw_value, value, is_valid)
+
+    def extend(self, readings: Iterable) -> None:
+        """ add Readings (or ReadingViews) """
+        for reading in readings:
+            if isinstance(reading, ReadingView):
+                self.append(reading.meta, reading.raw_value, reading.data_value, reading.is_valid)
+            else:
+                self.add(reading.definition, reading.raw_value, reading.processed_value, reading.is_valid)
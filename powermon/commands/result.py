@@ -1,10 +1,13 @@
 """ result.py """
+import copy
 import logging
 from enum import Enum, auto
+from typing import Any, Mapping, Optional
 
 from pydantic import BaseModel
 
 from powermon.commands.reading import Reading
+from powermon.commands.readingarray import ReadingArray, ReadingLayout
 from powermon.commands.reading_definition import (ReadingDefinition,
                                                   ResponseType)
 from powermon.exceptions import CommandExecutionFailed
@@ -25,6 +28,7 @@ class ResultType(Enum):
     CONSTRUCT = auto()  # the raw response is parsed by into construct container first, then the reading definitions are applied
     MULTIVALUED = auto()  # the response has multiple values, but they all correspond to one result
     VED_INDEXED = auto()  # the response has a key / value pair (separated by \t, each pair separated by \r\n), with the key used to find the definition
+    DECODED = auto()  # the readings were decoded by the protocol's DecodePlan
 
 
 class ResultDTO(BaseModel):
@@ -39,9 +43,9 @@ class Result:
     object to contain all the info of a result, including
     - command definition <- should this be the command object???
     - 'raw response' from the device
-    - list of Readings (processed results)
+    - the Readings (processed results) - kept in a ReadingArray, iterating it gives Reading like views
     """
-    def __init__(self, command, raw_response: bytes, responses: list | dict, is_error=False):
+    def __init__(self, command, raw_response: bytes, responses: list | dict, is_error=False, result_type: Optional[ResultType] = None):
         self.is_valid = True
         self.error = False
         self.error_messages = []
@@ -53,7 +57,7 @@ class Result:
             self.result_type = ResultType.ERROR
             self.readings = None
         else:
-            self.result_type = command.command_definition.result_type
+            self.result_type = command.command_definition.result_type if result_type is None else result_type
             self.readings: list[Reading] = responses
 
         log.debug("Result: %s", self)
@@ -86,25 +90,44 @@ class Result:
             self.error_messages = [self.raw_response]
 
     @property
-    def readings(self) -> list[Reading]:
-        """ list of processed readings """
+    def readings(self) -> ReadingArray:
+        """ the processed readings """
         return self._readings
 
     @readings.setter
     def readings(self, responses):
+        if isinstance(responses, ReadingArray):
+            # already decoded
+            self._readings = responses
+            return
         self._readings = self.decode_responses(responses=responses)
 
+    @classmethod
+    def from_decoded(cls, command, raw_response: bytes, values: Mapping[str, Any], definitions: Mapping[str, Any]) -> "Result":
+        """ a result of the {reading_key: value} readings decoded by a protocol's DecodePlan (definitions: the command's readings) """
+        layout = ReadingLayout.for_command(command.command_definition)
+        readings = ReadingArray(layout)
+        for key, value in values.items():
+            readings.append(layout.decoded_meta(key, definitions.get(key)), value, value)
+        return cls(command=command, raw_response=raw_response, responses=readings, result_type=ResultType.DECODED)
+
+    def with_readings(self, readings: list[Reading]) -> "Result":
+        """ a shallow copy of this result with the supplied (already decoded) readings """
+        result = copy.copy(self)
+        result._readings = ReadingArray.from_readings(readings, self._readings.layout)
+        return result
+
     def add_readings(self, readings: list[Reading]) -> bool:
-        """ add a list of readings to the current list """
+        """ add a list of readings to the current readings """
         self._readings.extend(readings)
         return True
 
-    def decode_responses(self, responses=None) -> list[Reading]:
+    def decode_responses(self, responses=None) -> ReadingArray:
         """
-        Take the response and decode into a list of Readings depending on the result type
+        Take the response and decode into Readings depending on the result type
         """
         log.info("result.response passed to decode: %s, result_type %s", responses, self.result_type)
-        all_readings : list[Reading] = []
+        all_readings = ReadingArray(ReadingLayout.for_command(self.command.command_definition))
 
         if responses is None:
             return all_readings
@@ -115,10 +138,7 @@ class Result:
                 # Get the reading definition (there is only one)
                 reading_definition: ReadingDefinition = self.command.command_definition.get_reading_definition()
                 # Process the response using the reading_definition, into readings
-                readings = self.readings_from_response(responses, reading_definition)
-                # check if readings are not none
-                if readings is not None:
-                    all_readings.extend(readings)
+                self.add_readings_from_response(all_readings, responses, reading_definition)
             case ResultType.ORDERED | ResultType.SLICED | ResultType.COMMA_DELIMITED:
                 # Have a list of reading_definitions and a list of responses that correspond to each other
                 # possibly additional INFO definitions (at end of definition list??)
@@ -129,43 +149,38 @@ class Result:
                 for position in range(definition_count):
                     reading_definition: ReadingDefinition = self.command.command_definition.get_reading_definition(position=position)
                     if position < response_count:
-                        readings = self.readings_from_response(responses[position], reading_definition)
-                        all_readings.extend(readings)
+                        self.add_readings_from_response(all_readings, responses[position], reading_definition)
                     else:
                         # More definitions than results, either INFO type definitions or too little data
                         if reading_definition.response_type == ResponseType.INFO_FROM_COMMAND:
                             # INFO is contained in supplied command eg QEY2023 -> 2023
-                            readings = self.readings_from_response(self.command.code, reading_definition)
-                            all_readings.extend(readings)
+                            self.add_readings_from_response(all_readings, self.command.code, reading_definition)
             case ResultType.VED_INDEXED | ResultType.CONSTRUCT | ResultType.BYTEARRAY:
                 # have a list of (index,value) tuples
                 for key, value in responses:
                     reading_definition: ReadingDefinition = self.command.command_definition.get_reading_definition(lookup=key)
                     if reading_definition is not None:
                         # Process the response using the reading_definition, into readings
-                        readings = self.readings_from_response(value, reading_definition)
-                        all_readings.extend(readings)
+                        self.add_readings_from_response(all_readings, value, reading_definition)
             case ResultType.ERROR:
                 # Get the reading_definition - this may need fixing for errors
                 reading_definition: ReadingDefinition = self.command.command_definition.get_reading_definition()
                 # Process the response using the reading_definition, into readings
-                readings = self.readings_from_response(responses, reading_definition)
-                all_readings.extend(readings)
+                self.add_readings_from_response(all_readings, responses, reading_definition)
             case _:
                 # unknown result type
                 raise ValueError(f"Unknown result type: {self.result_type}")
-        log.debug("got readings: %s", ",".join(str(i) for i in all_readings))
-        # print(','.join(str(reading) for reading in all_readings))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("got readings: %s", ",".join(str(i) for i in all_readings))
         return all_readings
 
-    def readings_from_response(self, response, reading_definition) -> list[Reading]:
-        """ return readings from a raw_response using the supplied reading definition """
+    def add_readings_from_response(self, readings: ReadingArray, response, reading_definition) -> None:
+        """ decode a raw_response into readings using the supplied reading definition """
         try:
-            return reading_definition.reading_from_raw_response(response, override=self.command.override)
+            reading_definition.add_readings_to(readings, response, override=self.command.override)
         except (ValueError, IndexError):
-            error = Reading(raw_value=None, processed_value=reading_definition.get_invalid_message(response), definition=ReadingDefinition.from_config({"description": reading_definition.description}))
-            error.is_valid = False
-            return [error]
+            readings.add(ReadingDefinition.from_config({"description": reading_definition.description}),
+                         None, reading_definition.get_invalid_message(response), is_valid=False)
 
     def to_dto(self) -> ResultDTO:
         """ convert result object to data transfer object """
@@ -0,0 +1,11 @@
+""" commands / templating.py
+
+Names available to templated commands (the template is eval'd in the module that
+expands it, which imports these).
+"""
+
+
+def dateparse(*args, **kwargs):
+    """ dateparser.parse - imported on first use, dateparser is slow to import """
+    from dateparser import parse  # type: ignore[unresolved-import]
+    return parse(*args, **kwargs)
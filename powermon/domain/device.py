@@ -3,15 +3,16 @@
 import logging
 from typing import List, Optional
 
-from rich import print as pprint  # ty: ignore[unresolved-import]
-
 from powermon.outputs import Output
 from powermon.ports import Port
 
 from ..commands.result import Result
 from ..mqttbroker import MqttBroker
+from ..protocols.decoding import decode_response
+from ..runtime.readings_cache import ReadingsCache
 from . import DeviceConfig
 from .task import Task
+from .task_cache_query import TaskCacheQuery
 
 # Set-up logger
 log = logging.getLogger("Device")
@@ -25,12 +26,14 @@ class Device:
     """
     # def __init__(self, name: str, serial_number: str = "", model: str = "", manufacturer: str = "", port: Port = None):
     @classmethod 
-    async def from_configs(cls, configs: List[DeviceConfig], mqtt_broker: Optional[MqttBroker] = None) -> List['Device']:
+    async def from_configs(cls, configs: List[DeviceConfig], mqtt_broker: Optional[MqttBroker] = None,
+                           readings_cache: Optional[ReadingsCache] = None) -> List['Device']:
         """Builds a list of Device objects from a list of DeviceConfig objects"""
         devices: List[Device] = []
         for config in configs:
             device: Device = await cls.from_config(config)
             device.mqtt_broker = mqtt_broker
+            device.readings_cache = readings_cache
             # add Tasks to device Task list
             for task_config in config.tasks:
                 log.info("Adding task, config: %s", task_config)
@@ -57,6 +60,8 @@ class Device:
         self.tasks: list[Task] = [] if tasks is None else tasks
         self.mqtt_broker: MqttBroker = mqtt_broker
         self.adhoc_commands: list = []
+        # shared store of the latest readings of all devices
+        self.readings_cache: Optional[ReadingsCache] = None
 
     def __str__(self):
         return f"Device: {self.name=}, {self.serial_number=}, {self.model=}, {self.manufacturer=} {self.port=}, {self.mqtt_broker=}, Actions:{[str(Action) for Action in self.Actions]}"
@@ -101,9 +106,14 @@ class Device:
         """ add task to list of tasks """
         if task is None:
             return
-        # do Task processing - eg find definition
-        #
-        task.command_definition = self.port.protocol.get_command_definition(task.get_command())
+        # do Task processing - eg find definition (cache queries do not run a device command)
+        if not isinstance(task, TaskCacheQuery):
+            protocol = self.port.protocol
+            if hasattr(protocol, "resolve"):
+                task.command_definition = protocol.resolve(task.get_command()).command
+            else:
+                # protocol objects without a ProtocolDefinition
+                task.command_definition = protocol.get_command_definition(task.get_command())
         self.tasks.append(task)
 
 
@@ -168,28 +178,71 @@ class Device:
     #             self.mqtt_broker.post_adhoc_result(item)
 
 
-    async def run_tasks(self, force=False):
-        """loops through the Task list and runs any Tasks that are due"""
-        # run any adhoc commands
-        # await self.run_adhoc_commands()
-
-        # check for any commands in the queue
-        if self.tasks is None or len(self.tasks) == 0:
-            log.info("no Tasks in queue")
+    async def run_task(self, task: Task) -> None:
+        """runs a single Task and processes its outputs"""
+        log.info("Processing task: %s", task)
+        # cache queries are answered from the readings cache - the device is not polled
+        if isinstance(task, TaskCacheQuery):
+            self.process_result(task, task.query(self.readings_cache))
             return
 
-        for i, task in enumerate(self.tasks):
-            if force or task.trigger.is_due():
-                log.info("Processing task[%s]: %s", i, task)
-                # run command
-                pprint(f"processing Task[{i}]: {task}") # FIXME: remove print
-                result: Result = await self.port.execute_task(task)
-                pprint(f"Got result: {result}")  # TODO: remove print
+        # run command
+        result: Result = await self.port.execute_action(task)
+        log.info("Got result: %s", result)
+        self.process_result(task, result)
+
+
+    async def run_tasks(self, tasks: List[Task]) -> None:
+        """runs several (due together) Tasks - the device commands are sent in a single port session,
+           cache queries are answered once those commands' readings are in the cache
+        """
+        port_tasks = [task for task in tasks if not isinstance(task, TaskCacheQuery)]
+        if len(port_tasks) == 1:
+            await self.run_task(port_tasks[0])
+        elif port_tasks:
+            log.info("Processing batch of %i tasks: %s", len(port_tasks), ", ".join(str(task) for task in port_tasks))
+            results = await self.port.execute_batch(port_tasks)
+            # decode / output the whole batch once all the commands have been sent
+            for task, result in zip(port_tasks, results):
+                if isinstance(result, Exception):
+                    log.error("Error running task: %s for device: %s - %s", task, self.name, result)
+                    continue
                 log.info("Got result: %s", result)
-                continue  # TODO: fix from here
-
-                # loop through each output and process result
-                output: Output
-                for output in command.outputs:
-                    log.debug("Using Output: %s", output)
-                    output.process(command=command, result=result, device=self)
+                self.process_result(task, result)
+        for task in tasks:
+            if isinstance(task, TaskCacheQuery):
+                await self.run_task(task)
+
+
+    def decode_result(self, task: Task, raw_response) -> Result:
+        """ decode the raw response to task's command into a Result (an error Result if it does not decode) """
+        protocol = self.port.protocol
+        resolved = protocol.resolve(task.get_command())
+        raw_response = bytes(raw_response)
+        try:
+            values = decode_response(protocol.framing, resolved.command, raw_response)
+        except Exception as exc:  # pylint: disable=W0718
+            log.warning("could not decode response to: %s for device: %s - %s", task, self.name, exc)
+            return Result(command=task, raw_response=exc, responses=[], is_error=True)
+        selector = resolved.selector
+        if selector is not None and selector.reading_key is not None:
+            # a reading selector (eg battery_voltage) - only that reading
+            values = {selector.reading_key: values[selector.reading_key]} if selector.reading_key in values else {}
+        return Result.from_decoded(task, raw_response, values, resolved.command.readings)
+
+
+    def process_result(self, task: Task, result: Result) -> None:
+        """ cache a task's result and pass it to the task's outputs """
+        if not isinstance(task, TaskCacheQuery):
+            if not isinstance(result, Result):
+                # the port returns the raw response
+                result = self.decode_result(task, result)
+            # keep the readings for cache query tasks / formatters of other devices
+            if self.readings_cache is not None and result.readings:
+                self.readings_cache.record_many(self.name, result.readings)
+
+        # loop through each output and process result
+        output: Output
+        for output in task.outputs:
+            log.debug("Using Output: %s", output)
+            output.process(command=task, result=result, device=self)
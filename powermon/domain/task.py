@@ -2,10 +2,9 @@
 import logging
 from typing import Optional
 
-from dateparser import parse as dateparse # type: ignore[unresolved-import] # noqa: F401
-
 from powermon.commands.command_definition import CommandDefinition
 from powermon.commands.result import Result
+from powermon.commands.templating import dateparse  # noqa: F401 - for templated commands
 from powermon.exceptions import (
     CommandExecutionFailed,
     InvalidCRC,
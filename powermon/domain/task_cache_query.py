@@ -0,0 +1,130 @@
+""" powermon / domain / task_cache_query.py
+
+Task that reads values from the readings cache instead of polling a device.
+
+The command is a comma separated list of queries, each:
+   <device>/<reading>[:<function>[:<seconds>]]
+
+   - <reading> can be * for every reading of the device
+   - <function> is latest (default), min, max, mean or count
+   - <seconds> is the window the function is applied over (default: everything cached)
+
+eg  command: "bms/battery_voltage, bms/battery_current:mean:300, inverter/*"
+"""
+import logging
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Optional
+
+from powermon.exceptions import ConfigError
+from powermon.runtime.readings_cache import ReadingsCache
+
+from .task import Task
+
+log = logging.getLogger("TaskCacheQuery")
+
+FUNCTIONS = ("latest", "min", "max", "mean", "count")
+
+
+@dataclass(frozen=True)
+class CacheQuery:
+    """ a single parsed query """
+    device: str
+    reading: str
+    function: str = "latest"
+    window: Optional[float] = None
+
+    @classmethod
+    def parse(cls, query: str) -> "CacheQuery":
+        query = query.strip()
+        target, _, options = query.partition(":")
+        device, sep, reading = target.rpartition("/")
+        if not sep or not device or not reading:
+            raise ConfigError(f"cache query '{query}' should be <device>/<reading>[:<function>[:<seconds>]]")
+        function, _, window = options.partition(":")
+        function = function.strip().lower() or "latest"
+        if function not in FUNCTIONS:
+            raise ConfigError(f"cache query '{query}' has unknown function '{function}', should be one of {FUNCTIONS}")
+        try:
+            seconds = float(window) if window.strip() else None
+        except ValueError as exc:
+            raise ConfigError(f"cache query '{query}' has invalid window '{window}'") from exc
+        return cls(device=device.strip(), reading=reading.strip(), function=function, window=seconds)
+
+
+@dataclass(frozen=True)
+class CachedReading:
+    """ quacks like a Reading, for the formatters """
+    data_name: str
+    data_value: Any
+    data_unit: str = ""
+    timestamp: float = 0.0
+    is_valid: bool = True
+    icon: Optional[str] = None
+    device_class: Optional[str] = None
+    state_class: Optional[str] = None
+    component: Optional[str] = None
+    definition: Any = None
+
+
+@dataclass
+class CacheQueryResult:
+    """ quacks like a Result, for the outputs """
+    readings: list[CachedReading] = field(default_factory=list)
+    error: bool = False
+    error_messages: list[str] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.error
+
+    def with_readings(self, readings: list) -> "CacheQueryResult":
+        return replace(self, readings=list(readings))
+
+
+class TaskCacheQuery(Task):
+    """ task that queries the readings cache """
+
+    def __init__(self, command_str: str, trigger, outputs, config):
+        super().__init__(command_str=command_str, trigger=trigger, outputs=outputs, config=config)
+        self.queries: list[CacheQuery] = [CacheQuery.parse(query) for query in command_str.split(",") if query.strip()]
+        if not self.queries:
+            raise ConfigError("cache_query task needs at least one query")
+
+    def __str__(self):
+        return f"{self.__class__.__name__}: {self.command_str=}, {self.trigger!s}"
+
+    def _run_query(self, cache: ReadingsCache, query: CacheQuery, now: float) -> list[CachedReading]:
+        keys = cache.keys(query.device) if query.reading == "*" else [query.reading]
+        start = None if query.window is None else now - query.window
+        readings = []
+        for key in keys:
+            series = cache.series(query.device, key)
+            if series is None or not len(series):
+                log.debug("no cached values for %s/%s", query.device, key)
+                continue
+            unit = series.unit or ""
+            name = f"{query.device}_{key}"
+            if query.function == "latest":
+                sample = series.latest()
+                if start is not None and sample.timestamp < start:
+                    continue
+                readings.append(CachedReading(name, sample.value, unit, sample.timestamp))
+                continue
+            aggregate = series.aggregate(start=start)
+            if aggregate is None:
+                continue
+            value = {"min": aggregate.minimum, "max": aggregate.maximum, "mean": aggregate.mean, "count": aggregate.count}[query.function]
+            readings.append(CachedReading(f"{name}_{query.function}", value, "" if query.function == "count" else unit, aggregate.last.timestamp))
+        return readings
+
+    def query(self, cache: Optional[ReadingsCache], now: Optional[float] = None) -> CacheQueryResult:
+        """ run the queries against the cache """
+        self.trigger.touch()
+        if cache is None:
+            return CacheQueryResult(error=True, error_messages=["no readings cache available"])
+        now = time.time() if now is None else now
+        readings = []
+        for query in self.queries:
+            readings.extend(self._run_query(cache, query, now))
+        return CacheQueryResult(readings=readings)
@@ -11,6 +11,7 @@ class TriggerSeconds(Trigger):
 
     def __init__(self, seconds):
         self.seconds = seconds
+        self.first_run : float | None = None
         self.last_run : float | None = None
         self.next_run : float = self.determine_next_run()
 
@@ -32,7 +33,12 @@ class TriggerSeconds(Trigger):
         # triggers every xx seconds
         # if hasnt run, run now
         if self.last_run is None:
-            next_run = time.time()
-        else:
-            next_run = self.last_run + self.seconds
-        return next_run
+            return time.time()
+        if self.first_run is None:
+            self.first_run = self.last_run
+        if self.seconds <= 0:
+            return self.last_run
+        # fixed rate - next slot on the grid anchored at the first run, so command
+        # latency doesnt accumulate as drift (missed slots are skipped, not bunched up)
+        periods = int((self.last_run - self.first_run) // self.seconds) + 1
+        return self.first_run + periods * self.seconds
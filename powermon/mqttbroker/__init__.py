@@ -1,4 +1,5 @@
-from .mqtt_config import MQTTConfig
+from .mqtt_config import MQTTConfig, PublishQueueConfig
 from .mqttbroker import MqttBroker
+from .publishqueue import OverflowPolicy, PublishMetrics, PublishQueue
 
-__all__ = ['MqttBroker', 'MQTTConfig']
\ No newline at end of file
+__all__ = ['MqttBroker', 'MQTTConfig', 'OverflowPolicy', 'PublishMetrics', 'PublishQueue', 'PublishQueueConfig']
\ No newline at end of file
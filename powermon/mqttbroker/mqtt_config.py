@@ -1,7 +1,20 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from .publishqueue import OverflowPolicy
+
+
+class PublishQueueConfig(BaseModel):
+    """ model/allowed elements for the mqtt broker publish_queue section of config """
+    size: int = Field(default=1000, gt=0)          # max messages waiting to be published
+    batch_size: int = Field(default=50, gt=0)      # max messages handed to the client per batch
+    max_inflight: int = Field(default=100, gt=0)   # max messages published but not yet confirmed
+    overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+    qos: Literal[0, 1] = 0
+
+    model_config = ConfigDict(extra='forbid')
+
 
 class MQTTConfig(BaseModel):
     """ model/allowed elements for mqtt broker section of config """
@@ -11,5 +24,6 @@ class MQTTConfig(BaseModel):
     password: Optional[str] = Field(default=None, repr=False)
     adhoc_topic: Optional[str] = None
     adhoc_result_topic: Optional[str] = None
+    publish_queue: PublishQueueConfig = Field(default_factory=PublishQueueConfig)
 
     model_config = ConfigDict(extra='forbid')
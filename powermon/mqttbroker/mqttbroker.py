@@ -4,12 +4,11 @@
 
 """
 import logging
-from time import sleep
-from typing import Callable, Optional
-
-import paho.mqtt.client as mqtt_client
+from typing import Any, Callable, Iterable, Optional
 
 from . import MQTTConfig
+from .mqtt_config import PublishQueueConfig
+from .publishqueue import PublishQueue
 
 
 # Set-up logger
@@ -32,20 +31,36 @@ class MqttBroker():
 
     @classmethod
     def from_config(cls, config: MQTTConfig):
-        return cls(name=config.name, port=config.port, username=config.username, password=config.password)
+        return cls(name=config.name, port=config.port, username=config.username, password=config.password, publish_queue=config.publish_queue)
 
 
-    def __init__(self, name: str, port: int, username: Optional[str] = None, password: Optional[str] = None):
+    def __init__(self, name: str, port: int, username: Optional[str] = None, password: Optional[str] = None,
+                 publish_queue: Optional[PublishQueueConfig] = None):
         self.name = name
         self.port = port
         self.username = username
         self.password = password
         self.is_connected = False
+        self.is_connecting = False  # the client's network thread is (re)connecting in the background
+        self.subscriptions: dict[str, Callable] = {}
+        self.connect_callbacks: list[Callable[[], None]] = []
+
+        # messages are queued and published in batches by an asyncio task (see start_publisher)
+        queue_config = publish_queue or PublishQueueConfig()
+        self.publish_queue = PublishQueue(
+            self._publish_now,
+            maxsize=queue_config.size,
+            batch_size=queue_config.batch_size,
+            overflow=queue_config.overflow,
+            max_inflight=queue_config.max_inflight,
+            default_qos=queue_config.qos,
+        )
 
         if self.name is None:
             self.disabled = True
         else:
             self.disabled = False
+            import paho.mqtt.client as mqtt_client  # only needed if a broker is configured
             self.mqttc = mqtt_client.Client()
 
 
@@ -95,18 +110,27 @@ class MqttBroker():
         log.debug("MqttBroker connection returned result: %s %s", rc, connection_result[rc if rc <= 6 else 6])
         if rc == 0:
             self.is_connected = True
+            # (re)subscribe - subscriptions do not survive a reconnect with a clean session
+            for topic in self.subscriptions:
+                client.subscribe(topic, qos=0)
+            for callback in self.connect_callbacks:
+                callback()
+            self.publish_queue.set_connected(True)
             return
         self.is_connected = False
 
 
     def on_disconnect(self, client, userdata, rc):
-        """ callback for disconnect """
+        """ callback for disconnect - the client's network thread reconnects, queued messages are held until it does """
         log.debug("on_disconnect called - client: %s, userdata: %s, rc: %s", client, userdata, rc)
         self.is_connected = False
+        self.publish_queue.set_connected(False)
 
 
     def connect(self) -> None:
-        """ connect to mqtt broker """
+        """ start connecting to the mqtt broker - does not wait, the client's network thread
+            connects (and reconnects after any disconnect) in the background
+        """
         if self.disabled:
             log.info("MQTT broker not enabled, was a broker name defined? '%s'", self.name)
             return
@@ -115,10 +139,13 @@ class MqttBroker():
             return
         self.mqttc.on_connect = self.on_connect
         self.mqttc.on_disconnect = self.on_disconnect
+        self.mqttc.on_publish = self.publish_queue.on_publish
         # if name is screen just return without connecting
         if self.name == "screen":
             # allows checking of message formats
             return
+        if self.is_connecting:
+            return
         try:
             log.debug("Connecting to %s on port %s", self.name, self.port)
             if self.username:
@@ -129,11 +156,11 @@ class MqttBroker():
             else:
                 log.debug("No mqtt authentication used")
                 # auth = None
-            self.mqttc.connect(self.name, port=self.port, keepalive=60)
+            self.mqttc.connect_async(self.name, port=self.port, keepalive=60)
             self.mqttc.loop_start()
-            sleep(1)
-        except ConnectionRefusedError as ex:
-            log.warning("%s refused connection with error: '%s'", self.name, ex)
+            self.is_connecting = True
+        except (OSError, ValueError) as ex:
+            log.warning("could not start connecting to %s: '%s'", self.name, ex)
 
 
     def start(self) -> None:
@@ -150,6 +177,7 @@ class MqttBroker():
         if self.disabled:
             return
         self.mqttc.loop_stop()
+        self.is_connecting = False
 
 
     def subscribe(self, topic: str, callback: Callable) -> None:
@@ -157,24 +185,31 @@ class MqttBroker():
 
         Args:
             topic (str): topic to subscribe to
-            callback (Callable): function to call when a message is received
+            callback (Callable): function to call when a message is received on this topic
         """
         if not self.name:
             return
-        if self.disabled:
+        if self.disabled or self.name == "screen":
             return
         # check if connected, connect if not
         if not self.is_connected:
             log.debug("Not connected, connecting")
             self.connect()
-        # Register callback
-        self.mqttc.on_message = callback
+        # Register callback for this topic only (so subscriptions do not replace each other's callback)
+        self.mqttc.message_callback_add(topic, callback)
+        self.subscriptions[topic] = callback
         if self.is_connected:
             # Subscribe to command topic
             log.debug("Subscribing to topic: %s", topic)
             self.mqttc.subscribe(topic, qos=0)
         else:
-            log.warning("Did not subscribe to topic: %s as not connected to broker", topic)
+            log.debug("will subscribe to topic: %s once connected to broker", topic)
+
+
+    def add_connect_callback(self, callback: Callable[[], None]) -> None:
+        """ call callback (from the client's network thread) each time a connection to the broker is made """
+        if callback not in self.connect_callbacks:
+            self.connect_callbacks.append(callback)
 
 
     def post_adhoc_command(self, command_code: str) -> None:
@@ -187,38 +222,77 @@ class MqttBroker():
         self.publish(topic=self.adhoc_result_topic, payload=payload)
 
 
-    def publish(self, topic: str, payload: str) -> None:
+    def start_publisher(self) -> None:
+        """ start the publish queue task (call from within the running event loop) """
+        if self.disabled or self.name == "screen":
+            return
+        self.publish_queue.set_connected(self.is_connected)
+        self.publish_queue.start()
+        if not self.is_connected:
+            self.connect()
+
+
+    async def stop_publisher(self, timeout: float = 5.0) -> None:
+        """ publish anything still queued (waiting up to timeout seconds) and stop the publish queue task """
+        if self.publish_queue.is_running:
+            await self.publish_queue.stop(timeout=timeout)
+
+
+    def publish(self, topic: str, payload: str, qos: Optional[int] = None, retain: bool = False) -> None:
         """ publish messages to the defined mqtt broker
             - if broker name is 'screen' will write to stdout instead
+            - if the publish queue is running the message is queued (the call does not block)
 
         Args:
             topic (str): topic to publish to.
             payload (str): content to publish.
         """
+        self.publish_many([(topic, payload)], qos=qos, retain=retain)
+
+
+    def publish_many(self, messages: Iterable[tuple[str, Any]], qos: Optional[int] = None, retain: bool = False) -> None:
+        """ publish a batch of (topic, payload) messages """
         if self.disabled:
             log.debug("Cannot publish msg as mqttbroker disabled")
             return
-        # log.debug("Publishing '%s' to '%s'", payload, topic)
+        to_publish = []
+        for topic, payload in messages:
+            if topic is None:
+                log.warning('no topic supplied to publish to')
+                continue
+            to_publish.append((self._normalise(topic), self._normalise(payload)))
+        messages = to_publish
         if self.name == "screen":
-            print(f"mqtt debug - topic: '{topic}', payload: '{payload}'")
+            for topic, payload in messages:
+                print(f"mqtt debug - topic: '{topic}', payload: '{payload}'")
             return
-        # check if connected, connect if not
+        if self.publish_queue.is_running:
+            self.publish_queue.put_many(messages, qos=qos, retain=retain)
+            return
+        # no publisher task (eg one-shot use outside the runtime) - hand straight to the client
         if not self.is_connected:
-            log.debug("Not connected, connecting")
+            log.warning("not connected to mqtt broker %s, dropping %i messages", self.name, len(messages))
             self.connect()
-            sleep(1)
-            if not self.is_connected:
-                log.warning("mqtt broker did not connect")
-                return
-        if topic is None:
-            log.warning('no topic supplied to publish to')
             return
-        if isinstance(topic, bytes):
-            topic = topic.decode('utf-8')
-        if isinstance(payload, bytes):
-            payload = payload.decode('utf-8')
+        for topic, payload in messages:
+            self._publish_now(topic, payload, self.publish_queue.default_qos if qos is None else qos, retain)
+
+
+    @staticmethod
+    def _normalise(value):
+        """ mqtt topics and payloads are sent as str """
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return bytes(value).decode('utf-8')
+        return value
+
+
+    def _publish_now(self, topic: str, payload: str, qos: int = 0, retain: bool = False):
+        """ hand a message to the mqtt client - does not wait for it to be sent (or connect) """
+        if not self.is_connected:
+            # only if the connection dropped after the publish queue checked (it holds messages while disconnected)
+            raise ConnectionError(f"Not connected to mqtt broker {self.name}")
         try:
-            infot = self.mqttc.publish(topic, payload)
-            infot.wait_for_publish(5)
+            return self.mqttc.publish(topic, payload, qos=qos, retain=retain)
         except Exception as e:  # pylint: disable=W0718
             log.warning(str(e))
+            raise
@@ -0,0 +1,305 @@
+"""mqtt publish queue
+
+   - provides PublishQueue class - bounded, batching, async publisher used by MqttBroker
+
+   Messages are queued without blocking the caller and drained by an asyncio task
+   that hands them to the mqtt client in batches - held in the queue (subject to
+   the overflow policy) while the client is disconnected. Delivery is tracked from the
+   client's on_publish callback (written to the socket for QoS 0, PUBACK for QoS 1)
+   rather than waiting on each message in turn.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any, Callable, Iterable, Optional
+
+log = logging.getLogger("publishqueue")
+
+
+class OverflowPolicy(StrEnum):
+    """ what to do with a new message when the queue is full """
+    DROP_OLDEST = "drop_oldest"  # discard the oldest queued message to make room
+    DROP_NEWEST = "drop_newest"  # discard the new message
+    COALESCE = "coalesce"        # replace a queued message for the same topic (else drop oldest)
+
+
+@dataclass
+class PublishMetrics:
+    """ counters and gauges for a PublishQueue """
+    enqueued: int = 0
+    published: int = 0       # handed to the mqtt client
+    delivered: int = 0       # confirmed by on_publish
+    dropped: int = 0
+    coalesced: int = 0
+    failed: int = 0
+    depth: int = 0
+    max_depth: int = 0
+    inflight: int = 0
+    last_latency: float = 0.0  # seconds from enqueue to delivery confirmation
+    avg_latency: float = 0.0   # exponentially weighted
+    max_latency: float = 0.0
+
+
+@dataclass
+class _Message:
+    topic: str
+    payload: Any
+    qos: int
+    retain: bool
+    enqueued: float
+
+
+class PublishQueue:
+    """ bounded async publish queue
+
+    publish_func(topic, payload, qos, retain) must not block - it is expected to be
+    paho's Client.publish (or similar) returning an object with .mid and .rc
+    """
+    LATENCY_WEIGHT = 0.1  # smoothing factor for avg_latency
+
+    def __str__(self):
+        return f"PublishQueue: {self.maxsize=}, {self.batch_size=}, {self.overflow=}, {self.max_inflight=}, {self.metrics}"
+
+    def __init__(
+        self,
+        publish_func: Callable[[str, Any, int, bool], Any],
+        *,
+        maxsize: int = 1000,
+        batch_size: int = 50,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        max_inflight: int = 100,
+        inflight_timeout: float = 30.0,
+        default_qos: int = 0,
+    ) -> None:
+        self.publish_func = publish_func
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.overflow = OverflowPolicy(overflow)
+        self.max_inflight = max_inflight
+        self.inflight_timeout = inflight_timeout
+        self.default_qos = default_qos
+        self.metrics = PublishMetrics()
+
+        # queued messages in order - keyed by topic when coalescing (so a newer value replaces an older one in place)
+        self._pending: OrderedDict[Any, _Message] = OrderedDict()
+        self._seq = 0
+        self._inflight: dict[int, _Message] = {}
+        self._early_acks: set[int] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._has_messages = asyncio.Event()
+        self._connected = asyncio.Event()
+        self._connected.set()
+        self._inflight_room = asyncio.Event()
+        self._inflight_room.set()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def _key(self, topic: str) -> Any:
+        if self.overflow is OverflowPolicy.COALESCE:
+            return topic
+        self._seq += 1
+        return self._seq
+
+    def put_nowait(self, topic: str, payload: Any, qos: Optional[int] = None, retain: bool = False) -> bool:
+        """ queue a message without waiting, returns False if it was dropped """
+        message = _Message(topic, payload, self.default_qos if qos is None else qos, retain, time.monotonic())
+        key = self._key(topic)
+        if key in self._pending:
+            # coalesce - keep the queue position of the older message, with the newer content
+            self._pending[key] = message
+            self.metrics.coalesced += 1
+            self.metrics.enqueued += 1
+            return True
+        if len(self._pending) >= self.maxsize:
+            if self.overflow is OverflowPolicy.DROP_NEWEST:
+                self.metrics.dropped += 1
+                log.debug("publish queue full, dropping new message for: %s", topic)
+                return False
+            _key, dropped = self._pending.popitem(last=False)
+            self.metrics.dropped += 1
+            log.debug("publish queue full, dropping oldest message for: %s", dropped.topic)
+        self._pending[key] = message
+        self.metrics.enqueued += 1
+        self._update_depth()
+        self._has_messages.set()
+        return True
+
+    def put_many(self, messages: Iterable[tuple[str, Any]], qos: Optional[int] = None, retain: bool = False) -> int:
+        """ queue (topic, payload) pairs, returns the number queued """
+        return sum(self.put_nowait(topic, payload, qos=qos, retain=retain) for topic, payload in messages)
+
+    def _update_depth(self) -> None:
+        depth = len(self._pending)
+        self.metrics.depth = depth
+        if depth > self.metrics.max_depth:
+            self.metrics.max_depth = depth
+        if not depth:
+            self._has_messages.clear()
+
+    # ------------------------------------------------------------------
+    # Delivery tracking
+    # ------------------------------------------------------------------
+
+    def _call_in_loop(self, func: Callable, *args) -> None:
+        """ call func in the queue's event loop - callbacks may come from the client's network thread """
+        loop = self._loop
+        try:
+            if asyncio.get_running_loop() is loop:
+                func(*args)
+                return
+        except RuntimeError:
+            pass
+        loop.call_soon_threadsafe(func, *args)
+
+    def on_publish(self, client=None, userdata=None, mid: int = 0) -> None:
+        """ mqtt client on_publish callback - may be called from the client's network thread """
+        if self._loop is None or self._loop.is_closed():
+            # not started - nothing is being tracked
+            return
+        self._call_in_loop(self._delivered, mid)
+
+    def set_connected(self, connected: bool) -> None:
+        """ the client has (dis)connected - queued messages are held while it is disconnected """
+        if self._loop is None or self._loop.is_closed():
+            self._set_connected(connected)
+            return
+        self._call_in_loop(self._set_connected, connected)
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected:
+            self._connected.set()
+        else:
+            self._connected.clear()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected.is_set()
+
+    def _delivered(self, mid: int) -> None:
+        message = self._inflight.pop(mid, None)
+        if message is None:
+            # acknowledged before publish_func returned the mid
+            if len(self._early_acks) > self.max_inflight:
+                self._early_acks.clear()
+            self._early_acks.add(mid)
+            return
+        self._record_delivery(message)
+
+    def _record_delivery(self, message: _Message) -> None:
+        latency = time.monotonic() - message.enqueued
+        metrics = self.metrics
+        metrics.delivered += 1
+        metrics.last_latency = latency
+        metrics.max_latency = max(metrics.max_latency, latency)
+        metrics.avg_latency = latency if metrics.delivered == 1 else (
+            metrics.avg_latency + self.LATENCY_WEIGHT * (latency - metrics.avg_latency)
+        )
+        metrics.inflight = len(self._inflight)
+        if len(self._inflight) < self.max_inflight:
+            self._inflight_room.set()
+
+    def _expire_inflight(self) -> None:
+        """ give up on messages never confirmed (eg QoS 0 sent as the connection dropped) """
+        cutoff = time.monotonic() - self.inflight_timeout
+        expired = [mid for mid, message in self._inflight.items() if message.enqueued < cutoff]
+        for mid in expired:
+            message = self._inflight.pop(mid)
+            self.metrics.failed += 1
+            log.warning("no delivery confirmation for message to %s (mid: %s)", message.topic, mid)
+        if expired:
+            self.metrics.inflight = len(self._inflight)
+            self._inflight_room.set()
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """ start draining the queue (must be called from within the running event loop) """
+        if self.is_running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._task = self._loop.create_task(self._drain(), name="mqtt-publish-queue")
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """ flush (for up to timeout seconds) then stop draining """
+        try:
+            await self.flush(timeout=timeout)
+        finally:
+            if self._task is not None:
+                self._task.cancel()
+                await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            log.info("publish queue stopped, metrics: %s", self.metrics)
+
+    async def flush(self, timeout: float = 5.0) -> bool:
+        """ wait until everything queued has been handed to the client and delivery confirmed """
+        deadline = time.monotonic() + timeout
+        while (self._pending or self._inflight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        return not (self._pending or self._inflight)
+
+    def _next_batch(self) -> list[_Message]:
+        batch = []
+        room = self.max_inflight - len(self._inflight)
+        while self._pending and len(batch) < min(self.batch_size, room):
+            _key, message = self._pending.popitem(last=False)
+            batch.append(message)
+        self._update_depth()
+        return batch
+
+    def _publish(self, message: _Message) -> None:
+        try:
+            info = self.publish_func(message.topic, message.payload, message.qos, message.retain)
+        except Exception as exc:  # pylint: disable=W0718
+            self.metrics.failed += 1
+            log.warning("publish to %s failed: %s", message.topic, exc)
+            return
+        rc = getattr(info, "rc", 0)
+        if rc:
+            self.metrics.failed += 1
+            log.warning("publish to %s failed, rc: %s", message.topic, rc)
+            return
+        self.metrics.published += 1
+        mid = getattr(info, "mid", None)
+        if mid is None:
+            # no delivery tracking available
+            self._record_delivery(message)
+        elif mid in self._early_acks:
+            self._early_acks.discard(mid)
+            self._record_delivery(message)
+        else:
+            self._inflight[mid] = message
+
+    async def _drain(self) -> None:
+        while True:
+            await self._has_messages.wait()
+            if not self._connected.is_set():
+                # hold the queue until the client reconnects
+                await self._connected.wait()
+                continue
+            if len(self._inflight) >= self.max_inflight:
+                self._inflight_room.clear()
+                try:
+                    await asyncio.wait_for(self._inflight_room.wait(), timeout=self.inflight_timeout)
+                except asyncio.TimeoutError:
+                    self._expire_inflight()
+                continue
+            for message in self._next_batch():
+                self._publish(message)
+            self.metrics.inflight = len(self._inflight)
+            # let producers and other tasks run between batches
+            await asyncio.sleep(0)
@@ -1,6 +1,7 @@
 """ outputs / __init__.py """
-from ._config import OutputConfig
+from ._config import OutputConfig, OutputFilterConfig, ReadingFilterConfig
 from ._types import OutputType
 from .output import Output
+from .outputfilter import OutputFilter
 
-__all__ = ['Output', 'OutputType', 'OutputConfig']
+__all__ = ['Output', 'OutputType', 'OutputConfig', 'OutputFilter', 'OutputFilterConfig', 'ReadingFilterConfig']
@@ -1,6 +1,6 @@
 from typing import Literal, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from .formatters import (
     BaseFormatConfig,
@@ -10,10 +10,25 @@ from .formatters import (
 )
 
 
+class ReadingFilterConfig(BaseModel):
+    """ model/allowed elements for the output filter rules of a reading """
+    deadband: Optional[float] = Field(default=None, ge=0)  # minimum absolute change of a numeric reading
+    deadband_percent: Optional[float] = Field(default=None, ge=0)  # minimum change as a % of the last sent value
+    heartbeat: Optional[float] = Field(default=None, gt=0)  # seconds - send anyway if nothing sent for this long
+
+    model_config = ConfigDict(extra='forbid')
+
+
+class OutputFilterConfig(ReadingFilterConfig):
+    """ model/allowed elements for output filter config - only send readings that have changed """
+    readings: dict[str, ReadingFilterConfig] = {}  # per reading (by formatted name) overrides
+
+
 class OutputConfig(BaseModel):
     """ model/allowed elements for output config """
     type: Literal['screen'] | Literal['mqtt']
     topic: Optional[str] = None
     format: Optional[BaseFormatConfig | HassFormatConfig  | JsonFormatConfig | BMSResponseFormatConfig] = BaseFormatConfig()
+    filter: Optional[OutputFilterConfig] = None
 
     model_config = ConfigDict(extra='forbid')
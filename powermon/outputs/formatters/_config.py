@@ -24,6 +24,8 @@ class HassFormatConfig(BaseFormatConfig):
     type: Literal['hass'] = 'hass'
     discovery_prefix: Optional[str] = 'homeassistant'
     entity_id_prefix: Optional[str] = None
+    discovery_cache: Optional[bool] = True  # only send config messages when new / changed / HA restarts
+    status_topic: Optional[str] = None  # HA birth message topic, defaults to <discovery_prefix>/status
 
 
 class JsonFormatConfig(BaseFormatConfig):
@@ -42,3 +44,5 @@ class BMSResponseFormatConfig(BaseFormatConfig):
     battery_cutoff_voltage: None | float = Field(default=None)
     battery_max_charge_current: None | int = Field(default=None)
     battery_max_discharge_current: None | int = Field(default=None)
+    cache_device: None | str = Field(default=None)  # device whose cached readings fill in values missing from the result
+    cache_max_age: None | float = Field(default=None)  # seconds - ignore cached readings older than this
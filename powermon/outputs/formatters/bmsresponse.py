@@ -33,6 +33,13 @@ class BMSResponse(AbstractFormat):
         self.data['battery_max_discharge_current'] = config.battery_max_discharge_current
         # todos
         self.data['battery_connected'] = True
+        # other device to read (cached) values from
+        self.cache_device = config.cache_device
+        self.cache_max_age = config.cache_max_age
+
+    # readings used from the result / cache
+    CACHE_KEYS = ('battery_voltage', 'battery_state_of_charge', 'discharge_mos_on', 'charge_mos_on',
+                  'battery_undervoltage_protection_setting', 'charge_current_protection_setting', 'discharge_current_protection_setting')
 
     def __str__(self):
         return f"{self.name}: generates the BMSResponse for a PI30 inverter"
@@ -45,16 +52,24 @@ class BMSResponse(AbstractFormat):
         if result.error:
             return _result
 
-        if len(result.readings) == 0:
-            return _result
-
-        display_data : list[Reading] = self.format_and_filter_data(result)
+        display_data : list[Reading] = self.format_and_filter_data(result) if result.readings else []
         # print(display_data)
+        values = {self.format_key(reading.data_name): reading.data_value for reading in display_data}
+
+        # add (without overriding) the latest values of the cache device, eg the BMS when this result is from the inverter
+        cache = getattr(device, "readings_cache", None)
+        if self.cache_device is not None and cache is not None:
+            for key in self.CACHE_KEYS:
+                if key not in values:
+                    value = cache.value(self.cache_device, key, max_age=self.cache_max_age)
+                    if value is not None:
+                        values[key] = value
+
+        if not values:
+            return _result
 
         # build data to display
-        for reading in display_data:
-            name = self.format_key(reading.data_name)
-            value = reading.data_value
+        for name, value in values.items():
             # unit = reading.data_unit
             match name:
                 case 'battery_voltage':
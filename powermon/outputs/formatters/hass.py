@@ -1,17 +1,17 @@
 """ powermon / outputformats / hass.py """
 import json as js
 import logging
+import sys
 # from datetime import datetime
 # from enum import Enum
 
-import construct as cs
-
 from powermon import __version__  # noqa: F401
-#from ....commands.command import Command
-from ....commands.reading import Reading
-from ....commands.result import Result
+from powermon.commands.reading import Reading
+from powermon.commands.result import Result
+
+from ._config import HassFormatConfig
 from .abstractformat import AbstractFormat
-from._config import HassFormatConfig
+from .hassdiscovery import DiscoveryRegistry
 
 log = logging.getLogger("hass")
 
@@ -25,13 +25,18 @@ class Hass(AbstractFormat):
         self.name = "hass"
         self.discovery_prefix = config.discovery_prefix
         self.entity_id_prefix = config.entity_id_prefix
+        # entities already announced to HA - None to send config messages every time
+        if config.discovery_cache is False:
+            self.discovery = None
+        else:
+            self.discovery = DiscoveryRegistry(status_topic=config.status_topic or f"{self.discovery_prefix}/status")
 
     def __str__(self):
         return f"{self.name}: generates Home Assistant auto config and update mqtt messages"
 
     def get_options(self):
         """ return a dict of all options and defaults """
-        extra_options = {"discovery_prefix": "homeassistant", "entity_id_prefix": None}
+        extra_options = {"discovery_prefix": "homeassistant", "entity_id_prefix": None, "discovery_cache": True, "status_topic": None}
         options = super().get_options()
         options.update(extra_options)
         return options
@@ -48,6 +53,11 @@ class Hass(AbstractFormat):
         display_data : list[Reading] = self.format_and_filter_data(result)
         log.debug("displayData: %s", display_data)
 
+        discovery = self.discovery
+        if discovery is not None:
+            discovery.subscribe(getattr(device, "mqtt_broker", None))
+        device_info = (device.name, device.serial_number, device.model, device.manufacturer)
+
         # build data to display
         for response in display_data:
             # Get key data
@@ -61,7 +71,7 @@ class Hass(AbstractFormat):
 
             # Set component type
             if unit == "bool" or value == "enabled" or value == "disabled":
-                print(f'updating sensor to binary sensor for {data_name}')
+                log.debug("updating sensor to binary sensor for %s", data_name)
                 component = "binary_sensor"
             # else:
             #     component = "sensor"
@@ -92,6 +102,23 @@ class Hass(AbstractFormat):
             topic = f"{topic_base}/config"
             state_topic = f"{topic_base}/state"
 
+            # State message - always sent
+            # convert construct EnumIntegerStrings to a str (construct is only imported by protocols that use it)
+            cs = sys.modules.get("construct")
+            if cs is not None and isinstance(value, cs.EnumIntegerString):
+                value = str(value)
+            value_msgs.append({"topic": state_topic, "payload": value})
+
+            # Config message - only sent if HA has not seen this version of the entity
+            options = response.definition.options if device_class == "enum" else None
+            if isinstance(options, dict):
+                options = tuple(options.values())
+            elif options is not None:
+                options = tuple(options)
+            content = (name, object_id, device_info, unit, icon, device_class, state_class, options)
+            if discovery is not None and not discovery.needs_config(topic, content):
+                continue
+
             # Payload
             # msg '{"name": "garden", "device_class": "motion", "state_topic": "homeassistant/binary_sensor/garden/state", "unit_of_measurement": "°C", "icon": "power-plug"}'
             payload = {
@@ -135,23 +162,15 @@ class Hass(AbstractFormat):
                 payload["state_class"] = state_class
 
             # Add options
-            if response.definition.options is not None and device_class == "enum":
-                if isinstance(response.definition.options, dict):
-                    payload["options"] = list(response.definition.options.values())
-                else:
-                    payload["options"] = response.definition.options
+            if options is not None:
+                payload["options"] = list(options)
 
             payloads = js.dumps(payload)
             # print(payloads)
             msg = {"topic": topic, "payload": payloads}
             config_msgs.append(msg)
-
-            # VALUE SETTING
-            # convert construct EnumIntegerStrings to a str
-            if isinstance(value, cs.EnumIntegerString):
-                value = str(value)
-            msg = {"topic": state_topic, "payload": value}
-            value_msgs.append(msg)
+            if discovery is not None:
+                discovery.announced(topic, content)
 
         # order value msgs after config to allow HA time to build entity before state data arrives
         return config_msgs + value_msgs
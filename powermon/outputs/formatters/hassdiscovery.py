@@ -0,0 +1,84 @@
+""" powermon / outputs / formatters / hassdiscovery.py
+
+Registry of the Home Assistant discovery (config) messages that have been sent.
+
+The config message for an entity only needs to be sent when HA has not seen it
+yet, when the entity definition changes, when HA restarts (it publishes
+'online' to <discovery_prefix>/status), or when the connection to the broker
+is (re)made - a config message formatted while disconnected may never have been
+delivered. Each announced config topic is stored
+with a hash of the values its payload is built from, so an unchanged entity
+costs a tuple hash rather than a payload build and json.dumps.
+"""
+import logging
+import threading
+from typing import Hashable
+
+log = logging.getLogger("hassdiscovery")
+
+HASS_ONLINE = "online"
+
+
+class DiscoveryRegistry:
+    """ remembers which entities have been announced (config topic -> content hash) """
+
+    def __str__(self):
+        return f"DiscoveryRegistry: {len(self)} entities announced, {self.status_topic=}, {self.subscribed=}"
+
+    def __init__(self, status_topic: str = "homeassistant/status") -> None:
+        self.status_topic = status_topic
+        self.subscribed = False
+        self._announced: dict[str, int] = {}
+        # reset() is called from the mqtt client's network thread
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._announced)
+
+    def __contains__(self, config_topic: str) -> bool:
+        return config_topic in self._announced
+
+    @staticmethod
+    def content_hash(content: Hashable) -> int:
+        """ hash of the values a config payload is built from """
+        return hash(content)
+
+    def needs_config(self, config_topic: str, content: Hashable) -> bool:
+        """ True if the config message for config_topic has not been sent with this content """
+        return self._announced.get(config_topic) != self.content_hash(content)
+
+    def announced(self, config_topic: str, content: Hashable) -> None:
+        """ record that the config message for config_topic has been sent """
+        with self._lock:
+            self._announced[config_topic] = self.content_hash(content)
+
+    def forget(self, config_topic: str) -> None:
+        """ resend the config for config_topic next time """
+        with self._lock:
+            self._announced.pop(config_topic, None)
+
+    def reset(self) -> None:
+        """ resend the config for every entity next time """
+        with self._lock:
+            self._announced.clear()
+
+    def subscribe(self, mqtt_broker) -> None:
+        """ listen for HA status messages and broker (re)connects (once) so either triggers rediscovery """
+        if self.subscribed or mqtt_broker is None:
+            return
+        self.subscribed = True
+        mqtt_broker.subscribe(topic=self.status_topic, callback=self.on_status)
+        mqtt_broker.add_connect_callback(self.on_connect)
+
+    def on_connect(self) -> None:
+        """ broker (re)connected - config sent while disconnected may have been lost """
+        log.debug("connected to mqtt broker, will resend discovery config for %i entities", len(self))
+        self.reset()
+
+    def on_status(self, client, userdata, msg) -> None:
+        """ mqtt callback for <discovery_prefix>/status """
+        status = msg.payload.decode("utf-8", errors="replace").strip().lower()
+        log.debug("home assistant status: %s", status)
+        if status == HASS_ONLINE:
+            log.info("home assistant came online, will resend discovery config for %i entities", len(self))
+            self.reset()
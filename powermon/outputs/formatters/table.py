@@ -134,7 +134,7 @@ class Table(AbstractFormat):
                     icon = reading.icon
                     state_class = reading.state_class
                     device_class = reading.device_class
-                    component = reading.definition.component
+                    component = reading.component
                     extra_info = ''
                     if icon:
                         extra_info += f"icon:{icon}, "
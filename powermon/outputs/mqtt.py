@@ -35,7 +35,8 @@ class MQTT(Output):
         log.info("Using output processor: MQTT, topic: %s", self.topic)
         log.debug("formatter: %s, result: %s, device: %s", self.formatter, result, device)
 
-        # exit if no data
+        # exit if no data (or nothing changed)
+        result = self.filter_result(result, device)
         if result is None:
             log.debug("No result to output")
             return
@@ -53,23 +54,26 @@ class MQTT(Output):
         formatted_data = self.formatter.format(command=command, result=result, device=device)
         log.debug("mqtt.output msgs %s", formatted_data)
 
-        # publish
+        # publish - as one batch so the messages are queued together
+        messages = []
         if isinstance(formatted_data, (str, bytes)):
             # simple payload, so publish as payload
-            device.mqtt_broker.publish(topic=self.topic, payload=formatted_data)
+            messages.append((self.topic, formatted_data))
         elif isinstance(formatted_data, list):
             # iterate list
             for item in formatted_data:
                 if isinstance(item, (str, bytes)):
-                    device.mqtt_broker.publish(topic=self.topic, payload=item)
+                    messages.append((self.topic, item))
                 elif isinstance(item, dict) and 'topic' in item and 'payload' in item:
-                    device.mqtt_broker.publish(topic=item['topic'], payload=item['payload'])
+                    messages.append((item['topic'], item['payload']))
                 elif isinstance(item, dict) and 'payload' in item:
-                    device.mqtt_broker.publish(topic=self.topic, payload=item['payload'])
+                    messages.append((self.topic, item['payload']))
                 else:
                     log.warning('Unknown mqtt data to publish, type: %s, data: %s', type(item), item)
         else:
             log.warning('Unknown mqtt data to publish, type: %s, data: %s', type(formatted_data), formatted_data)
+        if messages:
+            device.mqtt_broker.publish_many(messages)
 
     @classmethod
     def from_config(cls, output_config) -> "MQTT":
@@ -9,6 +9,7 @@ from powermon.commands.result import Result
 from ._types import OutputType
 from .formatters import Formatter
 from .formatters.abstractformat import AbstractFormat
+from .outputfilter import OutputFilter
 
 # Set-up logger
 log = logging.getLogger("outputs")
@@ -59,6 +60,7 @@ class Output():
         _format = Formatter.from_config(format_config)
         log.debug("got format: %s", (_format))
         _output = Output.get_output_class(output_type, formatter=_format, output_config=output_config)
+        _output.output_filter = OutputFilter.from_config(getattr(output_config, "filter", None))
         log.debug("got output: %s", _output) 
 
         return _output
@@ -75,6 +77,25 @@ class Output():
     def formatter(self, formatter : AbstractFormat):
         self._formatter = formatter
 
+    @property
+    def output_filter(self) -> OutputFilter | None:
+        """ the only-on-change filter for this output - or None to output every reading """
+        return getattr(self, "_output_filter", None)
+
+    @output_filter.setter
+    def output_filter(self, output_filter: OutputFilter | None):
+        self._output_filter = output_filter
+
+    def filter_result(self, result: Result, device=None) -> Result | None:
+        """ apply the output filter - returns None if there is nothing left to output """
+        if self.output_filter is None or result is None or not result.readings:
+            return result
+        readings = self.output_filter.filter(result.readings, device_name=getattr(device, "name", ""))
+        if not readings and not result.error:
+            log.debug("all readings unchanged, nothing to output")
+            return None
+        return result.with_readings(readings)
+
     @abstractmethod
     def process(self, command=None, result: Result = None, device=None):
         """ entry point of any output class """
@@ -0,0 +1,131 @@
+""" powermon / outputs / outputfilter.py
+
+Only-on-change filter for outputs.
+
+Drops readings that have not changed enough since they were last sent, so
+slow moving values (frequency, battery settings etc) are not republished on
+every poll:
+
+   - numeric readings are sent when they move by at least the deadband
+     (absolute and / or percent of the last sent value - whichever is larger)
+   - other readings (strings, enums, bools) are sent when they change
+   - anything is resent once heartbeat seconds have passed since it was last sent
+   - invalid readings are always sent
+
+The last sent value and time of each device + reading are kept in a compact
+store - a slot index per key into arrays of floats (numeric values and send
+times), with non numeric values in a parallel list.
+"""
+import logging
+import time
+from array import array
+from typing import Optional
+
+from ._config import OutputFilterConfig, ReadingFilterConfig
+
+log = logging.getLogger("outputfilter")
+
+# marks a slot whose last sent value is in the numbers array
+_NUMERIC = object()
+
+
+def _reading_key(name: str) -> str:
+    return name.lower().replace(" ", "_")
+
+
+class OutputFilter:
+    """ per output filter that suppresses unchanged readings """
+
+    def __str__(self):
+        return f"OutputFilter: {self.default=}, {len(self.rules)} reading rules, {len(self._slots)} readings tracked"
+
+    @classmethod
+    def from_config(cls, config: Optional[OutputFilterConfig]) -> Optional["OutputFilter"]:
+        """ build from config - None if no filter is configured """
+        if config is None:
+            return None
+        return cls(default=config, rules=config.readings)
+
+    def __init__(self, default: Optional[ReadingFilterConfig] = None, rules: Optional[dict[str, ReadingFilterConfig]] = None) -> None:
+        self.default = default or ReadingFilterConfig()
+        self.rules = {_reading_key(name): rule for name, rule in (rules or {}).items()}
+        self.passed = 0
+        self.suppressed = 0
+
+        self._slots: dict[tuple[str, str], int] = {}
+        self._sent_at = array("d")
+        self._numbers = array("d")  # last sent value of numeric readings
+        self._values: list = []     # last sent value of other readings (_NUMERIC for numeric)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def clear(self) -> None:
+        """ forget all last sent values (everything is sent next time) """
+        self._slots.clear()
+        del self._sent_at[:]
+        del self._numbers[:]
+        self._values.clear()
+
+    def rule_for(self, name: str) -> ReadingFilterConfig:
+        return self.rules.get(_reading_key(name), self.default)
+
+    @staticmethod
+    def _is_number(value) -> bool:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    def _changed(self, rule: ReadingFilterConfig, slot: int, value) -> bool:
+        if not self._is_number(value):
+            return self._values[slot] != value
+        if self._values[slot] is not _NUMERIC:
+            # was not numeric last time
+            return True
+        change = abs(value - self._numbers[slot])
+        deadband = max(
+            rule.deadband or 0.0,
+            (rule.deadband_percent or 0.0) * abs(self._numbers[slot]) / 100,
+        )
+        if deadband:
+            return change >= deadband
+        return change != 0
+
+    def _store(self, slot: int, value, now: float) -> None:
+        self._sent_at[slot] = now
+        if self._is_number(value):
+            self._numbers[slot] = value
+            self._values[slot] = _NUMERIC
+        else:
+            self._numbers[slot] = 0.0
+            self._values[slot] = value
+
+    def wanted(self, device_name: str, name: str, value, now: Optional[float] = None, is_valid: bool = True) -> bool:
+        """ should this reading be sent, if so it is recorded as sent """
+        now = time.time() if now is None else now
+        key = (device_name, name)
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = len(self._sent_at)
+            self._sent_at.append(now)
+            self._numbers.append(0.0)
+            self._values.append(_NUMERIC)
+        else:
+            rule = self.rule_for(name)
+            send = (
+                not is_valid
+                or (rule.heartbeat is not None and now - self._sent_at[slot] >= rule.heartbeat)
+                or self._changed(rule, slot, value)
+            )
+            if not send:
+                self.suppressed += 1
+                return False
+        self._store(slot, value, now)
+        self.passed += 1
+        return True
+
+    def filter(self, readings: list, device_name: str, now: Optional[float] = None) -> list:
+        """ the readings that should be sent """
+        now = time.time() if now is None else now
+        return [
+            reading for reading in readings
+            if self.wanted(device_name, reading.data_name, reading.data_value, now=now, is_valid=reading.is_valid)
+        ]
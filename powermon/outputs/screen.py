@@ -27,6 +27,10 @@ class Screen(Output):
             print("Configured formatter not found or invalid")
             return
 
+        result = self.filter_result(result, device)
+        if result is None:
+            return
+
         formatted_data = self.formatter.format(command=command, result=result, device=device)
         if formatted_data is None:
             print("Nothing returned from data formatting")
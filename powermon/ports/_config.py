@@ -12,7 +12,8 @@ class BlePortConfig(BaseModel):
     type: Literal["ble"] = 'ble'
     mac: str
     protocol: ProtocolType = ProtocolType.DEFAULT
-    victron_key: Optional[str] = Field(default=None, repr=False)
+    victron_key: Optional[str] = Field(default=None, repr=False)  # Instant Readout key - the device is read from its advertisements, no connection
+    keepalive: Optional[float] = Field(default=30.0, gt=0)  # seconds between link checks (reconnects a dropped link), None to disable
 
     model_config = ConfigDict(extra='forbid')
 
@@ -23,6 +24,7 @@ class SerialPortConfig(BaseModel):
     path: str = "/dev/ttyUSB0"
     baud: int = 2400
     protocol: ProtocolType = ProtocolType.DEFAULT
+    address: Optional[int] = Field(default=None, ge=0, le=0xFF)  # unit address on an RS485 bus - devices with the same path share one open port
 
     model_config = ConfigDict(extra='forbid')
 
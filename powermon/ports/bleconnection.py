@@ -0,0 +1,255 @@
+"""
+bleconnection module
+- BleDeviceLocator: finds BLEDevice handles in the shared BleScanner's index
+- BleConnection: a persistent link to one BLE device, reconnecting with backoff
+- BleConnectionManager: the locator and connections shared by all the BLE ports
+
+Finding a device (scanning) and connecting are the slow parts of talking to a
+BLE BMS, so the device handle is cached and the link is kept open between
+polls. A failed connect is not retried until a backoff delay (exponential,
+with jitter so several devices do not retry in lock step) has passed.
+
+bleak is only imported when a client is first needed.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from .blescanner import DEVICE_MAX_AGE, BleScanner
+
+log = logging.getLogger("BleConnection")
+
+SCAN_TIMEOUT = 10.0        # seconds to scan for devices not yet seen
+CONNECT_TIMEOUT = 15.0     # seconds allowed for client.connect()
+DISCONNECT_TIMEOUT = 5.0   # seconds allowed for client.disconnect()
+
+
+def _address(address: str) -> str:
+    return address.upper()
+
+
+def _bleak_client_factory(device, disconnected_callback):
+    from bleak import BleakClient
+    return BleakClient(device, disconnected_callback=disconnected_callback)
+
+
+class Backoff:
+    """ exponential backoff with proportional jitter """
+
+    def __str__(self):
+        return f"Backoff: {self.attempts=}, {self.initial=}, {self.maximum=}, {self.factor=}, {self.jitter=}"
+
+    def __init__(self, initial: float = 1.0, maximum: float = 120.0, factor: float = 2.0, jitter: float = 0.25) -> None:
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.attempts = 0
+
+    def next_delay(self) -> float:
+        """ delay before the next attempt (increases with every call until reset) """
+        delay = min(self.maximum, self.initial * self.factor ** self.attempts)
+        self.attempts += 1
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def reset(self) -> None:
+        self.attempts = 0
+
+
+class BleDeviceLocator:
+    """ finds BLEDevice handles by address - looked up in the continuously running BleScanner's index """
+
+    def __str__(self):
+        return f"BleDeviceLocator: {self.scanner}"
+
+    def __init__(self, scanner: Optional[BleScanner] = None, scanner_factory: Optional[Callable] = None,
+                 scan_timeout: float = SCAN_TIMEOUT, max_age: float = DEVICE_MAX_AGE) -> None:
+        if scanner is None:
+            scanner = BleScanner(scanner_factory=scanner_factory) if scanner_factory else BleScanner.shared()
+        self.scanner = scanner
+        self.scan_timeout = scan_timeout
+        self.max_age = max_age
+
+    @property
+    def scans(self) -> int:
+        return self.scanner.scans
+
+    def cached(self, address: str) -> Optional[Any]:
+        """ the BLEDevice for address if it was seen recently enough """
+        return self.scanner.device(address, max_age=self.max_age)
+
+    def seen(self, device, advertisement_data=None) -> None:
+        """ record a device """
+        self.scanner.seen(device, advertisement_data)
+
+    def forget(self, address: str) -> None:
+        """ drop the cached handle (eg it failed to connect) so the next find waits for a fresh advertisement """
+        self.scanner.forget(address)
+
+    async def find(self, address: str) -> Optional[Any]:
+        """ the BLEDevice for address - starts the shared scan if it is not already running """
+        return await self.scanner.find(address, timeout=self.scan_timeout, max_age=self.max_age)
+
+
+class BleConnection:
+    """ persistent link to a single BLE device """
+
+    def __str__(self):
+        return f"BleConnection: {self.address=}, connected={self.is_connected}, {self.error_message=}"
+
+    def __init__(self, address: str, locator: BleDeviceLocator, client_factory: Optional[Callable] = None,
+                 backoff: Optional[Backoff] = None, connect_timeout: float = CONNECT_TIMEOUT) -> None:
+        self.address = _address(address)
+        self.locator = locator
+        self.client_factory = client_factory or _bleak_client_factory
+        self.backoff = backoff or Backoff()
+        self.connect_timeout = connect_timeout
+        self.client = None
+        self.error_message: Optional[str] = None
+        self.connects = 0
+        self._retry_at = 0.0
+        self._lock = asyncio.Lock()
+        self._keepalive: Optional[asyncio.Task] = None
+        # awaited with the client after every (re)connect - one per user of the link (eg each BlePort on this mac)
+        self._on_connect: list[Callable[[Any], Awaitable[None]]] = []
+
+    @property
+    def is_connected(self) -> bool:
+        return self.client is not None and self.client.is_connected
+
+    def _on_disconnect(self, client) -> None:
+        log.info("BLE device %s disconnected", self.address)
+
+    async def connect(self, on_connect: Optional[Callable[[Any], Awaitable[None]]] = None):
+        """ return a connected client - connecting if needed, None if that failed (or is backing off)
+
+            on_connect(client) is awaited after every (re)connect, eg to start notifications -
+            and straight away if it is new and the link is already up
+        """
+        async with self._lock:
+            added = on_connect is not None and on_connect not in self._on_connect
+            if added:
+                self._on_connect.append(on_connect)
+            if self.is_connected:
+                if added:
+                    try:
+                        await on_connect(self.client)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as exc:  # pylint: disable=W0718
+                        self._on_connect.remove(on_connect)
+                        self.error_message = f"{exc.__class__.__name__}: {exc}"
+                        log.warning("BLE setup of %s failed: %s", self.address, self.error_message)
+                        return None
+                return self.client
+            now = time.monotonic()
+            if now < self._retry_at:
+                self.error_message = f"waiting {self._retry_at - now:.1f}s before reconnecting to {self.address}"
+                log.debug(self.error_message)
+                return None
+            client = None
+            try:
+                device = await self.locator.find(self.address)
+                if device is None:
+                    raise ConnectionError(f"Device with address: {self.address} was not found")
+                client = self.client_factory(device, self._on_disconnect)
+                await asyncio.wait_for(client.connect(), timeout=self.connect_timeout)
+                for callback in self._on_connect:
+                    await callback(client)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # pylint: disable=W0718
+                delay = self.backoff.next_delay()
+                self._retry_at = time.monotonic() + delay
+                self.error_message = f"{exc.__class__.__name__}: {exc}"
+                log.warning("BLE connect to %s failed (%s), retrying in %.1fs", self.address, self.error_message, delay)
+                # the cached handle may be stale (eg device restarted)
+                self.locator.forget(self.address)
+                if client is not None:
+                    # may be (part) connected - a timed out connect or a failed on_connect
+                    await self._disconnect(client)
+                return None
+            self.backoff.reset()
+            self._retry_at = 0.0
+            self.error_message = None
+            self.client = client
+            self.connects += 1
+            log.info("BLE device %s connected", self.address)
+            return client
+
+    def start_keepalive(self, interval: float, on_connect: Optional[Callable[[Any], Awaitable[None]]] = None) -> None:
+        """ check the link every interval seconds and reconnect it if it has dropped """
+        if self._keepalive is not None and not self._keepalive.done():
+            return
+
+        async def _keepalive():
+            while True:
+                await asyncio.sleep(interval)
+                if not self.is_connected:
+                    await self.connect(on_connect)
+
+        self._keepalive = asyncio.create_task(_keepalive(), name=f"ble-keepalive:{self.address}")
+
+    async def close(self, timeout: float = DISCONNECT_TIMEOUT) -> None:
+        """ disconnect (without blocking the event loop for more than timeout seconds) """
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+            await asyncio.gather(self._keepalive, return_exceptions=True)
+            self._keepalive = None
+        client, self.client = self.client, None
+        if client is None or not client.is_connected:
+            return
+        await self._disconnect(client, timeout)
+
+    async def _disconnect(self, client, timeout: float = DISCONNECT_TIMEOUT) -> None:
+        """ disconnect client (without blocking the event loop for more than timeout seconds) """
+        try:
+            await asyncio.wait_for(client.disconnect(), timeout=timeout)
+        except asyncio.TimeoutError:
+            log.warning("BLE disconnect from %s timed out after %ss", self.address, timeout)
+        except Exception as exc:  # pylint: disable=W0718
+            log.warning("BLE disconnect from %s failed: %s", self.address, exc)
+
+
+class BleConnectionManager:
+    """ one locator (on the shared scan) and one connection per address, shared by the BLE ports """
+    _shared: Optional["BleConnectionManager"] = None
+
+    def __str__(self):
+        return f"BleConnectionManager: {len(self.connections)} connections, {self.locator}"
+
+    @classmethod
+    def shared(cls) -> "BleConnectionManager":
+        """ the manager used by all BlePorts """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, scanner_factory: Optional[Callable] = None, client_factory: Optional[Callable] = None,
+                 backoff_initial: float = 1.0, backoff_maximum: float = 120.0) -> None:
+        self.locator = BleDeviceLocator(scanner_factory=scanner_factory)
+        self.client_factory = client_factory
+        self.backoff_initial = backoff_initial
+        self.backoff_maximum = backoff_maximum
+        self.connections: dict[str, BleConnection] = {}
+
+    def connection(self, address: str) -> BleConnection:
+        """ the (single) connection for address """
+        address = _address(address)
+        connection = self.connections.get(address)
+        if connection is None:
+            connection = self.connections[address] = BleConnection(
+                address,
+                self.locator,
+                client_factory=self.client_factory,
+                backoff=Backoff(initial=self.backoff_initial, maximum=self.backoff_maximum),
+            )
+        return connection
+
+    async def close_all(self) -> None:
+        await asyncio.gather(*(connection.close() for connection in self.connections.values()))
+        await self.locator.scanner.stop()
@@ -12,11 +12,10 @@ import logging
 import subprocess
 from sys import stdout
 from time import sleep
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 try:
-    from bleak import BleakClient, BleakScanner
-    from bleak.exc import BleakDeviceNotFoundError
+    from bleak import BleakClient
 except ImportError:
     print("You are missing a python library - 'bleak'")
     print("To install it, use the below command:")
@@ -27,21 +26,28 @@ except ImportError:
 
 from ruamel.yaml import YAML
 
-from powermon.commands.command import Command
-from powermon.commands.result import Result
 from powermon.exceptions import (
     BLEResponseError,
     ConfigError,
     PowermonProtocolError,
-    PowermonWIP,
 )
-from powermon.protocols.abstractprotocol import AbstractProtocol
 
 from ._types import PortType
+from .bleconnection import BleConnectionManager
+from .blescanner import BleScanner
+from .framereader import FrameReader, FrameTimeout, MinimumLength
 from .port import Port
 
+if TYPE_CHECKING:
+    from powermon.commands.command import Command
+    from powermon.commands.result import Result
+    from powermon.protocols.abstractprotocol import AbstractProtocol
+
 log = logging.getLogger("BlePort")
 
+KEEPALIVE_SECONDS = 30.0
+RESPONSE_TIMEOUT = 5.0  # maximum time to wait for a complete response (unless the command sets its own)
+
 
 # -----------------------------------------------------------------------------
 # BLE helper functions used by CLI tooling
@@ -89,6 +95,8 @@ def ble_scan(
             return
 
         print(f"Name: {bledevice.name}\tAddress: {bledevice.address}")
+        if adv_data and advertisementdata is not None:
+            print(f"  AdvertisementData: {advertisementdata}")
 
         if not get_chars:
             return
@@ -143,14 +151,9 @@ def ble_scan(
 
     async def _scan():
         print(f"Scanning for BLE devices ({timeout}s)…")
-        devices = await BleakScanner.discover(timeout=timeout, return_adv=adv_data)
-
-        if isinstance(devices, dict):
-            for bledevice, adv in devices.values():
-                await _print_device(bledevice, adv)
-        else:
-            for bledevice in devices:
-                await _print_device(bledevice)
+        # the shared scanner - reuses the running scan if there is one, otherwise does a one off discovery
+        for advertisement in await BleScanner.shared().scan(timeout):
+            await _print_device(advertisement.device, advertisement.data)
 
     try:
         asyncio.run(_scan())
@@ -173,7 +176,7 @@ class BlePort(Port):
         Build the BlePort object from a config dict.
 
         Args:
-            config (dict): must include 'mac'
+            config (BlePortConfig): must include 'mac'
             protocol: protocol handler instance
             serial_number: unused for BLE (kept for signature consistency)
 
@@ -183,16 +186,14 @@ class BlePort(Port):
         log.debug("building ble port. config:%s", config)
         if config is None:
             raise ConfigError("BLE port config missing")
-        mac = config.get("mac")
+        mac = getattr(config, "mac", None)
         if mac is None:
             raise ConfigError("BLE port config must include the 'mac' item")
-        return cls(mac=mac, protocol=protocol)
+        return cls(mac=mac, protocol=protocol, keepalive=getattr(config, "keepalive", KEEPALIVE_SECONDS))
 
-    def __init__(self, mac: str, protocol: AbstractProtocol) -> None:
+    def __init__(self, mac: str, protocol: AbstractProtocol, keepalive: Optional[float] = KEEPALIVE_SECONDS) -> None:
         self.port_type = PortType.BLE
         super().__init__(protocol=protocol)
-
-        self.protocol.port_type = self.port_type
         self.mac = mac
 
         # set handles (from protocol; may be overridden by config in future)
@@ -210,109 +211,81 @@ class BlePort(Port):
                 f"command_handle needs to be defined in protocol: {getattr(self.protocol, 'protocol_id', self.protocol)}"
             )
 
-        self.response = bytearray()
+        # notifications are fed to the frame reader, which completes a read as soon as the framing says the frame is whole
+        framing = getattr(self.protocol, "framing", None)
+        self.frame_reader = FrameReader(framing=framing if hasattr(framing, "frame_length") else None)
         self.client: BleakClient | None = None
+        self.connection = BleConnectionManager.shared().connection(mac)
+        self.keepalive = keepalive  # seconds between link checks, None to only reconnect when polled
         self.error_message: str | None = None
 
+    @property
+    def response(self):
+        """ the bytes received (by notification) since the last command was sent """
+        return self.frame_reader.buffer
+
     def _notification_callback(self, handle: int, data: bytearray) -> None:
         log.debug("%s %s %s", handle, repr(data), len(data))
-        self.response += data
+        self.frame_reader.feed(data)
 
     def is_connected(self) -> bool:
         """Return True if connected to a BLE device."""
-        return self.client is not None and self.client.is_connected
+        return self.client is not None and self.connection.is_connected
+
+    async def _on_connect(self, client) -> None:
+        """ set up a (re)connected client - enable notifications and flush the initializing characteristic """
+        await client.start_notify(self.notifier_handle, self._notification_callback)
+        if self.intializing_handle:
+            await client.write_gatt_char(self.intializing_handle, bytearray(b""))
 
     async def connect(self) -> bool:
         """
-        Find and connect to the device identified by self.mac.
+        Connect to the device identified by self.mac.
 
-        Raises:
-            PowermonWIP: unexpected error; indicates more robust error handling needed
+        The link is kept open between polls and shared via the BleConnectionManager -
+        the device is only looked for (scanned) when its handle is not already known,
+        and a failed connect is not retried until the backoff delay has passed.
         """
         log.info("bleport connecting. mac:%s", self.mac)
-        try:
-            bledevice = await BleakScanner.find_device_by_address(
-                device_identifier=self.mac,
-                timeout=10.0,
-            )
-            if bledevice is None:
-                raise BleakDeviceNotFoundError(f"Device with address: {self.mac} was not found.")
-
-            log.info("got bledevice: %s", bledevice)
-
-            self.client = BleakClient(bledevice)
-            log.info("got bleclient: %s", self.client)
-
-            await self.client.connect()
-            log.info("bleclient connected")
-
-            # enable notifications
-            await self.client.start_notify(self.notifier_handle, self._notification_callback)
-
-            # flush initializing characteristic (if provided)
-            if self.intializing_handle:
-                await self.client.write_gatt_char(self.intializing_handle, bytearray(b""))
-
-        except BleakDeviceNotFoundError as exc:
-            self.error_message = str(exc)
-            log.error("BLE device not found: %s", exc)
-            self.client = None
+        self.client = await self.connection.connect(on_connect=self._on_connect)
+        if self.client is None:
+            self.error_message = self.connection.error_message
             return False
-        except Exception as exc:
-            self.error_message = str(exc)
-            self.client = None
-            raise PowermonWIP("connect failed") from exc
-
+        if self.keepalive:
+            self.connection.start_keepalive(self.keepalive, on_connect=self._on_connect)
         return self.is_connected()
 
     async def disconnect(self) -> None:
         log.info("ble port disconnecting, %s %s", self.client, self.is_connected())
-        if self.client is not None and self.client.is_connected:
-            # client.disconnect can hang on some platforms; use bluetoothctl fallback
-            try:
-                open_blue = subprocess.Popen(
-                    ["bluetoothctl"],
-                    shell=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    stdin=subprocess.PIPE,
-                )
-                outs, errs = open_blue.communicate(
-                    b"disconnect %s\n" % self.mac.encode("utf-8"),
-                    timeout=15,
-                )
-                log.info("bluetoothctl communicate - outs: %s, errs: %s", outs, errs)
-            except subprocess.TimeoutExpired:
-                outs, errs = open_blue.communicate()
-                log.info("TimeoutExpired - outs: %s, errs: %s", outs, errs)
-            finally:
-                open_blue.kill()
-
+        await self.connection.close()
         log.info("ble port disconnect result, %s", self.is_connected())
         self.client = None
 
-    async def send_and_receive(self, command: Command) -> Result:
-        full_command = command.full_command
+    async def get_response(self, action) -> memoryview:
+        """ send the action's full_command and return the response frame
+            (a view of the port's receive buffer, valid until the next get_response)
+        """
+        full_command = action.full_command
         log.debug("port: %s, full_command: %s", self.client, full_command)
         if not self.is_connected():
             raise RuntimeError("Ble port not open")
 
+        reader = self.frame_reader
+        if reader.framing is None or isinstance(reader.framing, MinimumLength):
+            # protocol framing can not tell when a frame is complete - wait for the minimum response length
+            reader.framing = MinimumLength(getattr(action.command_definition, "construct_min_response", 1) or 1)
+
         log.info("Executing command via ble: %s", full_command)
+        reader.reset()
         await self.client.write_gatt_char(self.command_handle, full_command)
+        timeout = self.response_timeout(action, RESPONSE_TIMEOUT)
+        try:
+            response = await reader.read_frame(timeout=timeout)
+        except FrameTimeout as exc:
+            raise BLEResponseError(f"BLE response not complete in {timeout}s - got {len(exc.partial)} bytes") from exc
+        log.debug("ble response was: %s", response)
+        return response
 
-        required_response_length = command.command_definition.construct_min_response
-        timeout_ticks = 0
-
-        while len(self.response) < required_response_length:
-            timeout_ticks += 1
-            if timeout_ticks >= 50:
-                raise BLEResponseError(
-                    f"BLE response didn't reach len {required_response_length} in 5 seconds - got {len(self.response)}"
-                )
-            await asyncio.sleep(0.1)
-
-        log.debug("ble response was: %s", self.response)
-
-        result = command.build_result(raw_response=self.response, protocol=self.protocol)
-        self.response = bytearray()
-        return result
\ No newline at end of file
+    async def send_and_receive(self, command: Command) -> Result:
+        raw_response = await self.get_response(command)
+        return command.build_result(raw_response=raw_response, protocol=self.protocol)
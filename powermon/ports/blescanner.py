@@ -0,0 +1,221 @@
+"""
+blescanner module
+- Advertisement: the latest advertisement seen from a device
+- BleScanner: the process-wide BLE scanner - one continuous (passive where supported) scan
+  that keeps an address -> device / advertisement index for every BLE port and the CLI
+
+Devices are looked up in the index rather than each port running its own scan,
+and advertisement-only devices (eg Victron Instant Readout) are read from the
+advertisements without connecting at all.
+
+bleak is only imported when the scan is first started.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+log = logging.getLogger("BleScanner")
+
+DEVICE_MAX_AGE = 600.0  # seconds a device is considered present after it was last seen
+PRUNE_INTERVAL = 60.0   # at most this many seconds between dropping devices not seen within max_age from the index
+
+
+def _address(address: str) -> str:
+    return address.upper()
+
+
+def _bleak_scanner_factory(detection_callback, passive: bool):
+    from bleak import BleakScanner
+    if passive:
+        return BleakScanner(detection_callback=detection_callback, scanning_mode="passive")
+    return BleakScanner(detection_callback=detection_callback)
+
+
+async def _bleak_discover(timeout: float):
+    from bleak import BleakScanner
+    return await BleakScanner.discover(timeout=timeout, return_adv=True)
+
+
+class Advertisement(NamedTuple):
+    device: Any              # BLEDevice
+    data: Any                # AdvertisementData (None if the scanner did not supply any)
+    last_seen: float         # time.monotonic() when received
+
+    @property
+    def address(self) -> str:
+        return _address(self.device.address)
+
+    @property
+    def rssi(self) -> Optional[int]:
+        return getattr(self.data, "rssi", None)
+
+    def manufacturer_data(self, company_id: int) -> Optional[bytes]:
+        """ the manufacturer specific payload for company_id, if advertised """
+        data = getattr(self.data, "manufacturer_data", None) or {}
+        payload = data.get(company_id)
+        return None if payload is None else bytes(payload)
+
+
+class BleScanner:
+    """ one scan shared by everything that needs to find BLE devices or read their advertisements """
+    _shared: Optional["BleScanner"] = None
+
+    def __str__(self):
+        return f"BleScanner: running={self.running}, {self.passive=}, {len(self._index)} devices seen, {self.scans=}"
+
+    @classmethod
+    def shared(cls) -> "BleScanner":
+        """ the scanner used by all BlePorts (and the CLI) """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, scanner_factory: Optional[Callable] = None, passive: bool = True, max_age: float = DEVICE_MAX_AGE,
+                 discover: Optional[Callable] = None) -> None:
+        self.scanner_factory = scanner_factory or _bleak_scanner_factory
+        self.discover = discover or _bleak_discover
+        self.passive = passive
+        self.max_age = max_age
+        self.scans = 0  # number of times the scan has been started
+        self._scanner = None
+        self._index: dict[str, Advertisement] = {}
+        self._pruned_at = time.monotonic()
+        self._waiters: dict[str, list[asyncio.Future]] = {}
+        self._listeners: dict[str, list[Callable[[Advertisement], None]]] = {}
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._scanner is not None
+
+    async def start(self) -> None:
+        """ start the continuous scan (if not already running) """
+        async with self._start_lock:
+            if self._scanner is not None:
+                return
+            scanner = self.scanner_factory(self.seen, self.passive)
+            try:
+                await scanner.start()
+            except Exception as exc:  # pylint: disable=W0718
+                if not self.passive:
+                    raise
+                # passive scanning needs platform support (eg BlueZ advertisement monitor) - fall back to active
+                log.info("passive BLE scan not available (%s), using active scanning", exc)
+                self.passive = False
+                scanner = self.scanner_factory(self.seen, False)
+                await scanner.start()
+            self._scanner = scanner
+            self.scans += 1
+            log.info("BLE scan started (passive=%s)", self.passive)
+
+    async def stop(self) -> None:
+        scanner, self._scanner = self._scanner, None
+        if scanner is not None:
+            await scanner.stop()
+            log.info("BLE scan stopped")
+
+    def seen(self, device, advertisement_data=None) -> None:
+        """ record an advertisement (scanner detection callback) """
+        now = time.monotonic()
+        advertisement = Advertisement(device, advertisement_data, now)
+        address = advertisement.address
+        self._index[address] = advertisement
+        if now - self._pruned_at >= min(PRUNE_INTERVAL, self.max_age):
+            self.prune(now)
+        for waiter in self._waiters.pop(address, ()):
+            if not waiter.done():
+                waiter.set_result(advertisement)
+        for listener in self._listeners.get(address, ()):
+            try:
+                listener(advertisement)
+            except Exception:  # pylint: disable=W0718
+                log.exception("BLE advertisement listener failed for %s", address)
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def advertisement(self, address: str, max_age: Optional[float] = None) -> Optional[Advertisement]:
+        """ the latest advertisement from address, if seen within max_age seconds """
+        advertisement = self._index.get(_address(address))
+        max_age = self.max_age if max_age is None else max_age
+        if advertisement is None or time.monotonic() - advertisement.last_seen > max_age:
+            return None
+        return advertisement
+
+    def device(self, address: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """ the BLEDevice for address, if seen within max_age seconds """
+        advertisement = self.advertisement(address, max_age)
+        return None if advertisement is None else advertisement.device
+
+    def devices(self, max_age: Optional[float] = None) -> list[Advertisement]:
+        """ the latest advertisement of every device seen within max_age seconds """
+        max_age = self.max_age if max_age is None else max_age
+        now = time.monotonic()
+        return [advertisement for advertisement in self._index.values() if now - advertisement.last_seen <= max_age]
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """ drop the devices not seen within max_age seconds (passing devices would otherwise be kept forever) """
+        now = time.monotonic() if now is None else now
+        self._pruned_at = now
+        stale = [address for address, advertisement in self._index.items() if now - advertisement.last_seen > self.max_age]
+        for address in stale:
+            del self._index[address]
+        if stale:
+            log.debug("dropped %i BLE devices not seen for %ss", len(stale), self.max_age)
+        return len(stale)
+
+    def forget(self, address: str) -> None:
+        """ drop a device from the index (eg its handle failed to connect) """
+        self._index.pop(_address(address), None)
+
+    def add_listener(self, address: str, callback: Callable[[Advertisement], None]) -> None:
+        """ call callback(advertisement) for every advertisement received from address """
+        self._listeners.setdefault(_address(address), []).append(callback)
+
+    def remove_listener(self, address: str, callback: Callable[[Advertisement], None]) -> None:
+        listeners = self._listeners.get(_address(address), [])
+        if callback in listeners:
+            listeners.remove(callback)
+
+    # ------------------------------------------------------------------
+    # Waiting for devices / advertisements
+    # ------------------------------------------------------------------
+
+    async def wait_for_advertisement(self, address: str, timeout: float, newer_than: Optional[float] = None) -> Optional[Advertisement]:
+        """ an advertisement from address received after newer_than (monotonic time) - waits up to timeout seconds """
+        advertisement = self._index.get(_address(address))
+        if advertisement is not None and (newer_than is None or advertisement.last_seen > newer_than):
+            return advertisement
+        await self.start()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(_address(address), []).append(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(_address(address), [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+
+    async def find(self, address: str, timeout: float, max_age: Optional[float] = None) -> Optional[Any]:
+        """ the BLEDevice for address - from the index, or waiting up to timeout seconds for it to advertise """
+        max_age = self.max_age if max_age is None else max_age
+        advertisement = await self.wait_for_advertisement(address, timeout, newer_than=time.monotonic() - max_age)
+        return None if advertisement is None else advertisement.device
+
+    async def scan(self, timeout: float) -> list[Advertisement]:
+        """ everything advertising in the next timeout seconds - from the running scan, or a one off discovery if it is not running """
+        started = time.monotonic()
+        if self.running:
+            await asyncio.sleep(timeout)
+        else:
+            found = await self.discover(timeout)
+            for entry in (found.values() if isinstance(found, dict) else found):
+                device, advertisement_data = entry if isinstance(entry, tuple) else (entry, None)
+                self.seen(device, advertisement_data)
+        return [advertisement for advertisement in self._index.values() if advertisement.last_seen >= started]
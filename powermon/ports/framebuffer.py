@@ -0,0 +1,106 @@
+""" powermon / ports / framebuffer.py
+
+Reusable receive buffer for the ports.
+
+Bytes are accumulated into a preallocated bytearray (read straight into it
+from a file descriptor where possible) and handed on as memoryview slices,
+so a response is not copied on its way from the port through
+validate / verify_crc / strip to the parser.
+
+A view returned by view() / consume() is only valid until clear() is called
+(the storage is then reused) - use bytes(view) to keep a copy beyond that.
+"""
+import os
+
+DEFAULT_CAPACITY = 4096
+
+
+class FrameBuffer:
+    """ growable byte buffer with a read offset - supports len(), [] (as memoryview) and find() """
+
+    def __str__(self):
+        return f"FrameBuffer: {len(self)} bytes buffered, capacity={len(self._data)}"
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self._data = bytearray(capacity)
+        self._start = 0  # offset of the first unconsumed byte
+        self._end = 0    # offset after the last buffered byte
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __bool__(self) -> bool:
+        return self._end > self._start
+
+    def __getitem__(self, item) -> memoryview | int:
+        return self.view()[item]
+
+    def __bytes__(self) -> bytes:
+        return bytes(self._data[self._start:self._end])
+
+    def __eq__(self, other) -> bool:
+        return self.view() == other
+
+    __hash__ = None  # mutable
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        """ discard everything buffered (the storage is kept for reuse) """
+        self._start = self._end = 0
+
+    def view(self) -> memoryview:
+        """ memoryview of the unconsumed bytes """
+        return memoryview(self._data)[self._start:self._end]
+
+    def find(self, sub: bytes, start: int = 0) -> int:
+        """ offset (relative to the unconsumed bytes) of sub, or -1 """
+        pos = self._data.find(sub, self._start + start, self._end)
+        return pos if pos < 0 else pos - self._start
+
+    def count(self, sub: bytes) -> int:
+        return self._data.count(sub, self._start, self._end)
+
+    def consume(self, length: int) -> memoryview:
+        """ remove and return (as a view) the first length bytes """
+        length = min(length, len(self))
+        view = memoryview(self._data)[self._start:self._start + length]
+        self._start += length
+        return view
+
+    def _reserve(self, length: int) -> None:
+        """ make room for length more bytes at the end """
+        if self._end + length <= len(self._data):
+            return
+        # move the unconsumed bytes to a new (larger if needed) bytearray - rather than
+        # compacting / resizing in place - so views already handed out stay intact
+        buffered = len(self)
+        capacity = len(self._data) or DEFAULT_CAPACITY
+        while capacity < buffered + length:
+            capacity *= 2
+        data = bytearray(capacity)
+        data[:buffered] = memoryview(self._data)[self._start:self._end]
+        self._data = data
+        self._start, self._end = 0, buffered
+
+    def append(self, data) -> None:
+        """ copy bytes-like data onto the end of the buffer """
+        length = len(data)
+        self._reserve(length)
+        self._data[self._end:self._end + length] = data
+        self._end += length
+
+    def read_from_fd(self, fd: int, size: int) -> int:
+        """ read up to size bytes from fd directly into the buffer, returns the number read (0 at eof)
+
+            raises BlockingIOError if fd is non-blocking and has nothing to read
+        """
+        free = len(self._data) - self._end
+        if free <= 0:
+            self._reserve(size)
+            free = len(self._data) - self._end
+        count = os.readv(fd, [memoryview(self._data)[self._end:self._end + min(size, free)]])
+        self._end += count
+        return count
@@ -0,0 +1,128 @@
+""" powermon / ports / framereader.py
+
+Frame assembly driven by a protocol's FrameSpec.
+
+The FrameReader accumulates bytes as they arrive from a port and hands back
+a frame as soon as the FrameSpec says one is complete (terminator seen or the
+length from the frame header is buffered), instead of waiting for fixed delays.
+
+Frames are returned as memoryview slices of the reader's FrameBuffer, valid
+until the next reset().
+"""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from .framebuffer import FrameBuffer
+
+log = logging.getLogger("FrameReader")
+
+READ_CHUNK_SIZE = 4096
+
+
+class FrameTimeout(TimeoutError):
+    """ Exception for a frame that did not complete before the timeout """
+    def __init__(self, message: str, partial: bytes = b""):
+        super().__init__(message)
+        self.partial = partial
+
+
+class MinimumLength:
+    """ stand-in FrameSpec for framings without frame_length - complete once length bytes have arrived """
+
+    def __init__(self, length: int) -> None:
+        self.length = length
+
+    def __repr__(self):
+        return f"MinimumLength({self.length})"
+
+    def frame_length(self, buffer) -> Optional[int]:
+        return len(buffer) if len(buffer) >= self.length else None
+
+
+class FrameReader:
+    """ assembles frames from a byte stream using a FrameSpec (anything with frame_length(buffer)) """
+
+    def __str__(self):
+        return f"FrameReader: framing={self.framing}, buffered={len(self.buffer)}, {self.latency=}"
+
+    def __init__(self, framing) -> None:
+        self.framing = framing
+        self.buffer = FrameBuffer()
+        self.latency: Optional[float] = None  # seconds from reset() to the last completed frame
+        self._started: float = time.perf_counter()
+        self._waiter: Optional[asyncio.Future] = None
+
+    def reset(self) -> None:
+        """ discard any buffered bytes and restart the latency clock (call before sending a request) """
+        self.buffer.clear()
+        self.latency = None
+        self._started = time.perf_counter()
+
+    def feed(self, data: bytes) -> None:
+        """ add received bytes, completing any pending read_frame() if a frame is now available """
+        self.buffer.append(data)
+        self._check_waiter()
+
+    def _check_waiter(self) -> None:
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            frame = self.pop_frame()
+            if frame is not None:
+                waiter.set_result(frame)
+
+    def fail(self, exc: BaseException) -> None:
+        """ abort a pending read_frame() with exc """
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_exception(exc)
+
+    def pop_frame(self) -> Optional[memoryview]:
+        """ remove and return the first complete frame from the buffer, or None if incomplete """
+        length = self.framing.frame_length(self.buffer)
+        if length is None:
+            return None
+        frame = self.buffer.consume(length)
+        self.latency = time.perf_counter() - self._started
+        log.debug("frame complete: %i bytes in %.4fs", length, self.latency)
+        return frame
+
+    async def read_frame(self, timeout: float) -> memoryview:
+        """ wait until feed() has delivered a complete frame """
+        frame = self.pop_frame()
+        if frame is not None:
+            return frame
+        self._waiter = asyncio.get_running_loop().create_future()
+        try:
+            return await asyncio.wait_for(self._waiter, timeout=timeout)
+        except asyncio.TimeoutError as exc:
+            raise FrameTimeout(
+                f"no complete frame within {timeout}s (got {len(self.buffer)} bytes)",
+                partial=bytes(self.buffer),
+            ) from exc
+        finally:
+            self._waiter = None
+
+    async def read_frame_from_fd(self, fd: int, timeout: float) -> memoryview:
+        """ read from a non-blocking file descriptor (using loop.add_reader) until a frame is complete """
+        loop = asyncio.get_running_loop()
+
+        def _on_readable():
+            try:
+                count = self.buffer.read_from_fd(fd, READ_CHUNK_SIZE)
+            except BlockingIOError:
+                return
+            except OSError as exc:
+                self.fail(exc)
+                return
+            if not count:
+                self.fail(EOFError(f"end of file reading fd {fd}"))
+                return
+            self._check_waiter()
+
+        loop.add_reader(fd, _on_readable)
+        try:
+            return await self.read_frame(timeout=timeout)
+        finally:
+            loop.remove_reader(fd)
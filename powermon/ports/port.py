@@ -1,6 +1,9 @@
 """ powermon / ports / __init__.py """
+import asyncio
 import logging
+import time
 from abc import abstractmethod
+from types import SimpleNamespace
 
 from powermon.exceptions import ConfigError, PowermonProtocolError
 
@@ -55,12 +58,20 @@ class Port():
             case PortType.TEST:
                 from .testport import TestPort
                 port_object: TestPort = await TestPort.from_config(config=config, protocol=protocol, serial_number=serial_number)
+            case PortType.SERIAL if getattr(config, "address", None) is not None:
+                # addressed unit on a bus shared with other devices
+                from .rs485port import RS485Port
+                port_object: RS485Port = await RS485Port.from_config(config=config, protocol=protocol, serial_number=serial_number)
             case PortType.SERIAL:
                 from .serialport import SerialPort
                 port_object: SerialPort = await SerialPort.from_config(config=config, protocol=protocol, serial_number=serial_number)
             case PortType.USB:
                 from .usbport import USBPort
                 port_object: USBPort = await USBPort.from_config(config=config, protocol=protocol, serial_number=serial_number)
+            case PortType.BLE if getattr(config, "victron_key", None):
+                # advertisement-only device - read without connecting
+                from .victronbleport import VictronBlePort
+                port_object: VictronBlePort = await VictronBlePort.from_config(config=config, protocol=protocol, serial_number=serial_number)
             case PortType.BLE:
                 from .bleport import BlePort
                 port_object: BlePort = await BlePort.from_config(config=config, protocol=protocol, serial_number=serial_number)
@@ -75,6 +86,9 @@ class Port():
             protocol = Protocol.from_name(name=protocol)
         self.protocol = protocol
         self.error_message = None
+        self.latency: dict[str, float] = {}  # seconds taken by the last response, per command
+        # held for a whole connect / send / receive session so single commands and batches do not interleave
+        self.session_lock = asyncio.Lock()
         # self.port_type = None
         self.is_protocol_supported()
 
@@ -84,7 +98,7 @@ class Port():
         if port_type is None:
             raise PowermonProtocolError("Port type not defined")
         if port_type not in self.protocol.supported_ports:
-            raise PowermonProtocolError(f"Protocol {self.protocol.protocol_id.decode()} not supported by port type {port_type}")
+            raise PowermonProtocolError(f"Protocol {self.protocol.protocol_id} not supported by port type {port_type}")
 
     async def connect(self) -> bool:
         """ default port connect function """
@@ -136,32 +150,132 @@ class Port():
     #     log.debug("after send_and_receive: %s", result)
     #     return result
 
-    async def execute_action(self, action) -> 'Result':
-        """ takes an action, runs the command and returns a result object"""
-        log.debug("Action %s", action)
+    @property
+    def inter_frame_gap(self) -> float:
+        """ seconds to wait between the commands of a batch (the minimum the protocol allows) """
+        return getattr(self.protocol, "inter_frame_gap", 0.0) or 0.0
+
 
-        # open port if it is closed
+    @staticmethod
+    def response_timeout(action, default: float) -> float:
+        """ seconds to wait for the response to action - the command's own timeout if it has one """
+        timeout = getattr(getattr(action, "command_definition", None), "timeout", None)
+        return default if timeout is None else timeout
+
+
+    async def _ensure_connected(self) -> None:
+        """ open port if it is closed """
         if not self.is_connected():
             if not await self.connect():
                 raise ConnectionError(f"Unable to connect to port: {self.error_message}")
             # FIXME: what if still not connected....
             # should, log an error and wait to try to reconnect (increasing backoff times)
 
+
+    def encode_context(self) -> 'EncodeContext':
+        """ how requests are encoded for this port """
+        # imported here - the protocols package imports ports
+        from powermon.protocols.framing import EncodeContext
+        return EncodeContext(port_type=self.port_type)
+
+
+    def full_command(self, action) -> bytes:
+        """ the bytes to send for action - built once per command / parameters, then from the request frame cache """
+        command_index = getattr(self.protocol, "command_index", None)
+        if command_index is None:
+            # protocol objects without a ProtocolDefinition build their own
+            return self.protocol.get_full_command(action.get_command())
+        from powermon.protocols.requestcache import REQUEST_FRAMES
+        resolved = command_index.resolve(action.get_command())
+        return REQUEST_FRAMES.build(self.protocol, resolved.command, resolved.parameters, ctx=self.encode_context())
+
+
+    def serial_number_command(self):
+        """ the protocol's serial_number command (and the reading key of the serial number in its response) """
+        try:
+            resolved = self.protocol.resolve("serial_number")
+        except (AttributeError, KeyError) as ex:
+            raise ConfigError(f"No serial_number command in protocol: {self.protocol.protocol_id}") from ex
+        selector = resolved.selector
+        return resolved.command, (selector.reading_key if selector is not None and selector.reading_key else "serial_number")
+
+
+    async def read_serial_number(self):
+        """ send the protocol's serial_number command and return the decoded serial number (port must be connected) """
+        # imported here - the protocols package imports ports
+        from powermon.protocols.decoding import decode_response
+        command, reading_key = self.serial_number_command()
+        action = SimpleNamespace(command_definition=command, get_command=lambda: command.command_id, full_command=None)
+        action.full_command = self.full_command(action)
+        # a copy - the response is a view of the port's receive buffer
+        raw_response = bytes(await self.get_response(action))
+        return decode_response(self.protocol.framing, command, raw_response).get(reading_key)
+
+
+    async def find_path_for_serial_number(self, paths: list[str], serial_number) -> str:
+        """ the first of paths with a device that reports serial_number """
+        self.serial_number_command()  # fail early if the protocol cannot identify devices
+        for _path in paths:
+            log.debug("Checking path: %s for serial_number: %s", _path, serial_number)
+            self.path = _path
+            if not await self.connect():
+                continue
+            try:
+                found = await self.read_serial_number()
+            except Exception as exc:  # pylint: disable=W0718
+                log.info("no serial number from path: %s: %s", _path, exc)
+                found = None
+            finally:
+                await self.disconnect()
+            if found is not None and str(found).strip() == str(serial_number):
+                log.info("SUCCESS: path: %s matches serial_number: %s", _path, serial_number)
+                return _path
+        raise ConfigError(f"None of the paths match serial_number: {serial_number}")
+
+
+    async def _run_action(self, action):
+        """ send the command for a single action and return the raw response (port must be connected) """
         # update trigger times
         action.trigger.touch()
-        
+
         # update full_command - add crc etc
         # updates every run incase something has changed
-        action.full_command = self.protocol.get_full_command(action.get_command())
+        action.full_command = self.full_command(action)
 
-        # run the command via the 'send_and_receive port function
-        # result = await self.send_and_receive(action)
-        # log.debug("after send_and_receive: %s", result)
-        # return result
-        
+        started = time.perf_counter()
         raw_response = await self.get_response(action)
-        # print(f"raw_response: {raw_response}")  # TODO: remove this debug print
-        ## decoded_response = self.protocol.decode_response(raw_response, command.command_definition)
-        
+        self.latency[action.get_command()] = elapsed = time.perf_counter() - started
+        log.info("command: %s, response latency: %.4fs", action.get_command(), elapsed)
         return raw_response
-        
\ No newline at end of file
+
+
+    async def execute_action(self, action) -> 'Result':
+        """ takes an action, runs the command and returns a result object"""
+        log.debug("Action %s", action)
+        async with self.session_lock:
+            await self._ensure_connected()
+            return await self._run_action(action)
+
+
+    async def execute_batch(self, actions: list) -> list:
+        """ run several actions in one port session - connect once, send the commands back to back
+
+            returns a response per action, in order - an action that failed has its exception in place of the response
+        """
+        log.debug("Batch of %i actions: %s", len(actions), ", ".join(action.get_command() for action in actions))
+        responses = []
+        async with self.session_lock:
+            await self._ensure_connected()
+            gap = self.inter_frame_gap
+            for i, action in enumerate(actions):
+                if i and gap:
+                    await asyncio.sleep(gap)
+                try:
+                    # a copy - the response is a view of the port's receive buffer, reused by the next command
+                    responses.append(bytes(await self._run_action(action)))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:  # pylint: disable=W0718
+                    log.warning("command: %s failed in batch: %s", action.get_command(), exc)
+                    responses.append(exc)
+        return responses
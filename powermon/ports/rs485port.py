@@ -0,0 +1,217 @@
+""" powermon / ports / rs485port.py
+
+Several addressed devices (eg daisy-chained BMS units) on one RS485 adapter.
+
+Every device has its own RS485Port, but the ports for a path share a single
+SharedBus - the adapter is opened once (while any of its ports is connected)
+and each request / response exchange holds the bus lock, so the units never
+talk over each other. The lock is taken per exchange, not per batch, and
+asyncio locks are granted in request order: while one device sends a batch,
+the commands of the other devices on the bus are interleaved with it
+(round-robin) rather than waiting for the whole batch.
+
+Requests are encoded with the unit's address and a reply is only accepted
+from that address (framing.response_address) - stray or late replies from
+other units are discarded.
+"""
+import asyncio
+import logging
+from glob import glob
+from typing import Callable, Optional
+
+import serial
+
+from powermon.exceptions import ConfigError, InvalidResponse
+from powermon.protocols.framing import EncodeContext
+from powermon.protocols.model import CommandType
+
+from .framereader import FrameTimeout
+from .serialport import RESPONSE_TIMEOUT, SerialPort
+
+log = logging.getLogger("RS485Port")
+
+
+def _serial_factory(path: str, baud: int):
+    # timeout=0 puts pyserial in non-blocking mode, all waiting is done by the event loop
+    return serial.Serial(port=path, baudrate=baud, timeout=0, write_timeout=0)
+
+
+class SharedBus:
+    """ one open adapter shared by the ports of the units on it """
+    _buses: dict[str, "SharedBus"] = {}
+
+    def __str__(self):
+        return (f"SharedBus: {self.path=}, {self.baud=}, units={sorted(self.units)}, connected={sorted(self.connected)}, "
+                f"{self.transactions=}, {self.misrouted=}")
+
+    @classmethod
+    def for_path(cls, path: str, baud: int) -> "SharedBus":
+        """ the bus for path - created on first use """
+        bus = cls._buses.get(path)
+        if bus is None:
+            bus = cls._buses[path] = cls(path=path, baud=baud)
+        elif bus.baud != baud:
+            raise ConfigError(f"devices on {path} are configured with different bauds ({bus.baud} and {baud})")
+        return bus
+
+    @classmethod
+    def close_all(cls) -> None:
+        """ close (and forget) every bus """
+        for bus in cls._buses.values():
+            bus.close()
+        cls._buses.clear()
+
+    def __init__(self, path: str, baud: int, serial_factory: Optional[Callable] = None) -> None:
+        self.path = path
+        self.baud = baud
+        self.serial_factory = serial_factory or _serial_factory
+        self.serial_port = None
+        self.error_message = None
+        self.units: set[int] = set()      # addresses of the ports using the bus
+        self.connected: set[int] = set()  # addresses of the ports that are connected - the adapter is closed when none are
+        self.lock = asyncio.Lock()        # held for each exchange
+        self.transactions = 0
+        self.misrouted = 0  # replies discarded because they came from another address
+        self._idle_since = 0.0  # loop time the last exchange finished
+
+    def register(self, address: int) -> None:
+        if address in self.units:
+            raise ConfigError(f"more than one device with address {address:#04x} on {self.path}")
+        self.units.add(address)
+
+    def unregister(self, address: int) -> None:
+        """ the port with address is done with the bus - its address can be used again """
+        self.units.discard(address)
+        self.release(address)
+
+    def is_open(self) -> bool:
+        return self.serial_port is not None and self.serial_port.is_open
+
+    def open(self, address: int) -> bool:
+        """ open the adapter (if it is not already) for the port with address """
+        if not self.is_open():
+            log.debug("opening shared bus %s, baud:%s", self.path, self.baud)
+            try:
+                self.serial_port = self.serial_factory(self.path, self.baud)
+            except (ValueError, serial.SerialException) as exc:
+                log.error("Error opening shared bus %s: %s", self.path, exc)
+                self.error_message = str(exc)
+                self.serial_port = None
+                return False
+        self.connected.add(address)
+        return True
+
+    def release(self, address: int) -> None:
+        """ the port with address has disconnected - close the adapter once no port is connected """
+        self.connected.discard(address)
+        if not self.connected:
+            self.close()
+
+    def close(self) -> None:
+        self.connected.clear()
+        if self.serial_port is not None:
+            log.debug("closing shared bus %s", self.path)
+            self.serial_port.close()
+        self.serial_port = None
+
+    async def wait_turnaround(self, gap: float) -> None:
+        """ wait until gap seconds have passed since the last exchange on the bus (call holding the lock) """
+        if gap:
+            remaining = self._idle_since + gap - asyncio.get_running_loop().time()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+
+    def finished(self) -> None:
+        """ an exchange has finished (call holding the lock) """
+        self.transactions += 1
+        self._idle_since = asyncio.get_running_loop().time()
+
+
+class RS485Port(SerialPort):
+    """ serial port for one addressed unit on a bus shared with other devices """
+
+    def __str__(self):
+        return f"RS485Port: {self.path=}, {self.address=}, protocol:{self.protocol}, bus:{self.bus}, {self.error_message=}"
+
+    @classmethod
+    async def from_config(cls, config, protocol, serial_number):
+        log.debug("building rs485 port. config:%s", config)
+        paths = glob(config.path)
+        if len(paths) != 1:
+            # the devices on a bus must all resolve to the same adapter
+            raise ConfigError(f"RS485 port path {config.path} must match exactly one port, found: {paths}")
+        return cls(path=paths[0], baud=config.baud, protocol=protocol, address=config.address)
+
+    def __init__(self, path, baud, protocol, address: int, bus: Optional[SharedBus] = None) -> None:
+        super().__init__(path=path, baud=baud, protocol=protocol)
+        self.address = address
+        self.bus = SharedBus.for_path(path, baud) if bus is None else bus
+        self.bus.register(address)
+        self._registered = True
+
+    def is_connected(self):
+        return self.address in self.bus.connected and self.bus.is_open()
+
+    async def connect(self) -> bool:
+        log.debug("RS485Port connecting. path:%s, address:%#04x", self.path, self.address)
+        if not self._registered:
+            # reconnecting after a disconnect
+            self.bus.register(self.address)
+            self._registered = True
+        if not self.bus.open(self.address):
+            self.error_message = self.bus.error_message
+        self.serial_port = self.bus.serial_port
+        return self.is_connected()
+
+    async def disconnect(self) -> None:
+        log.debug("RS485Port disconnecting, address:%#04x", self.address)
+        if self._registered:
+            self.bus.unregister(self.address)
+            self._registered = False
+        self.serial_port = None
+
+    def encode_context(self) -> EncodeContext:
+        """ requests are addressed to this unit """
+        return EncodeContext(port_type=self.port_type, address=self.address)
+
+    async def get_response(self, action) -> memoryview:
+        """ send the action's full_command and return this unit's reply - waits its turn on the bus """
+        async with self.bus.lock:
+            if not self.is_connected():
+                raise RuntimeError(f"RS485 bus {self.path} not open")
+            # the adapter may have been reopened by another port
+            self.serial_port = self.bus.serial_port
+            await self.bus.wait_turnaround(self.inter_frame_gap)
+            try:
+                if action.command_definition.command_type != CommandType.DEFAULT:
+                    return await super().get_response(action)
+                return await self._exchange(action)
+            finally:
+                self.bus.finished()
+
+    async def _exchange(self, action) -> memoryview:
+        framing = self.protocol.framing
+        response_address = getattr(framing, "response_address", None)
+        loop = asyncio.get_running_loop()
+        timeout = self.response_timeout(action, RESPONSE_TIMEOUT)
+        deadline = loop.time() + timeout
+        self.serial_port.reset_input_buffer()
+        self.frame_reader.reset()
+        await self._write(action.full_command)
+        while True:
+            try:
+                frame = await self.frame_reader.read_frame_from_fd(
+                    self.serial_port.fileno(), timeout=max(0.0, deadline - loop.time()))
+            except FrameTimeout:
+                # the other units are still using the bus - do not close it
+                log.warning("no reply from address %#04x on %s in %ss", self.address, self.path, timeout)
+                raise
+            if response_address is None:
+                return frame
+            address = response_address(frame)
+            if address == self.address:
+                return frame
+            self.bus.misrouted += 1
+            log.debug("discarding reply from address %s on %s (expecting %#04x)", address, self.path, self.address)
+            if loop.time() >= deadline:
+                raise InvalidResponse(f"no reply from address {self.address:#04x} on {self.path}")
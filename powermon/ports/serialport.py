@@ -1,8 +1,9 @@
 """ powermon / ports / serialport.py """
 import asyncio
 import logging
-import time
+import os
 from glob import glob
+from typing import Callable, Optional
 
 import serial
 from tenacity import (  # https://tenacity.readthedocs.io/en/latest/
@@ -11,23 +12,30 @@ from tenacity import (  # https://tenacity.readthedocs.io/en/latest/
     wait_fixed,
 )
 
-from powermon.commands.command import Command, CommandType
-from powermon.commands.result import Result
-from powermon.exceptions import ConfigError, InvalidResponse, PowermonProtocolError
+from powermon.exceptions import ConfigError, InvalidResponse
+from powermon.protocols.model import CommandType
 
 from ._types import PortType
+from .framebuffer import FrameBuffer
+from .framereader import FrameReader
 from .port import Port
-
-# from powermon.protocols import get_protocol_definition
+from .vedirect import VEDirectReader
 
 log = logging.getLogger("SerialPort")
 
-VICTRON_LINES_TO_READ = 30
-READ_UNTIL_DONE_WAIT_TIME = 0.5
+READ_UNTIL_DONE_WAIT_TIME = 0.5   # line must be quiet this long before a read-until-done response is complete
+READONLY_WAIT_TIME = 0.2          # line must be quiet this long before a read-only response is complete
+RESPONSE_TIMEOUT = 2.0            # maximum time to wait for a complete response
+LISTEN_TIMEOUT = 5.0              # maximum time to listen for unsolicited (victron) output
+READ_CHUNK_SIZE = 4096
 
 
 class SerialPort(Port):
-    """ serial port object - normally a usb to serial adapter """
+    """ serial port object - normally a usb to serial adapter
+
+    All i/o is non-blocking: the port's file descriptor is registered with the
+    event loop so that waiting for a reply never blocks other devices.
+    """
 
     def __str__(self):
         return f"SerialPort: {self.path=}, {self.baud=}, protocol:{self.protocol}, {self.serial_port=}, {self.error_message=}"
@@ -49,6 +57,9 @@ class SerialPort(Port):
         self.path = path
         self.baud = baud
         self.serial_port = None
+        self.frame_reader = FrameReader(framing=self.protocol.framing)
+        self.rx_buffer = FrameBuffer()  # reused by the non-framed (read until quiet) reads
+        self.vedirect: Optional[VEDirectReader] = None  # streams VE.Direct output continuously once a listen command has run
 
 
     async def resolve_path(self, path, serial_number):
@@ -66,33 +77,18 @@ class SerialPort(Port):
         # check we have something to look for
         if serial_number is None:
             raise ConfigError("Wildcard paths require a serial_number in config.")
-        # Get the protocol's ID command
-        try:
-            command = self.protocol.get_id_command()
-        except PowermonProtocolError as ex:
-            raise ConfigError(f"No get_id in protocol: {self.protocol.protocol_id}") from ex
-
-        for _path in paths:
-            log.debug("Checking path: %s for serial_number: %s", _path, serial_number)
-            self.path = _path
-            await self.connect()
-            res = await self.send_and_receive(command=command)
-            await self.disconnect()
-
-            if res.is_valid and res.readings[0].data_value == serial_number:
-                log.info("SUCCESS: path: %s matches serial_number: %s", _path, serial_number)
-                return _path  # return the matching path
-        raise ConfigError(f"None of the paths match serial_number: {serial_number}")
+        return await self.find_path_for_serial_number(paths, serial_number)
 
 
     def is_connected(self):
         return self.serial_port is not None and self.serial_port.is_open
 
 
-    async def connect(self) -> int:
+    async def connect(self) -> bool:
         log.debug("SerialPort port connecting. path:%s, baud:%s", self.path, self.baud)
         try:
-            self.serial_port = serial.Serial(port=self.path, baudrate=self.baud, timeout=1, write_timeout=1)
+            # timeout=0 puts pyserial in non-blocking mode, all waiting is done by the event loop
+            self.serial_port = serial.Serial(port=self.path, baudrate=self.baud, timeout=0, write_timeout=0)
             log.debug(self.serial_port)
         except ValueError as e:
             log.error("Incorrect configuration for serial port: %s", e)
@@ -107,89 +103,83 @@ class SerialPort(Port):
 
     async def disconnect(self) -> None:
         log.debug("SerialPort disconnecting")
+        if self.vedirect is not None:
+            self.vedirect.detach()
+            self.vedirect.clear()
         if self.serial_port is not None:
             self.serial_port.close()
         self.serial_port = None
 
 
-    async def send_and_receive(self, command: Command) -> Result:
-        full_command = command.full_command
-        response_line = None
+    async def get_response(self, action) -> memoryview:
+        """ send the action's full_command (if needed) and return the raw response
+            (a view of the port's receive buffer, valid until the next get_response)
+        """
+        full_command = action.full_command
         log.info("port: %s, full_command: %s", self.serial_port, full_command)
         if not self.is_connected():
             raise RuntimeError("Serial port not open")
+        command_defn = action.command_definition
+        if command_defn.command_type == CommandType.VICTRON_LISTEN:
+            return await self._victron_listen(action)
+        streaming = self.vedirect is not None and self.vedirect.attached
         try:
             log.debug("Executing command via SerialPort...")
+            if streaming:
+                # the exchange below reads the fd itself - resume streaming afterwards
+                self.vedirect.detach()
             self.serial_port.reset_input_buffer()
-            self.serial_port.reset_output_buffer()
             # Process i/o differently depending on command type
-            command_defn = command.command_definition
             match command_defn.command_type:
-                case CommandType.VICTRON_LISTEN:
-                    # this command type doesnt need to send a command, it just listens on the serial port
-                    log.debug("case: CommandType.VICTRON_LISTEN, listening for %i lines", VICTRON_LINES_TO_READ)
-                    response_line = b""
-                    for _ in range(VICTRON_LINES_TO_READ):
-                        _response = self.serial_port.read_until(b"\n")
-                        response_line += _response
                 case CommandType.SERIAL_READONLY:
                     # read until no more data
                     log.debug("CommandType.SERIAL_READONLY")
-                    response_line = b""
-                    while True:
-                        await asyncio.sleep(0.2)  # give serial port time to receive the data
-                        to_read = self.serial_port.in_waiting
-                        log.debug("bytes waiting: %s", to_read)
-                        if to_read == 0:
-                            break
-                        # got some data to read
-                        response_line += self.serial_port.read(to_read)
+                    response_line = await self._read(timeout=RESPONSE_TIMEOUT, idle=READONLY_WAIT_TIME)
                 case CommandType.SERIAL_READ_UNTIL_DONE:
                     # this case reads until no more to read or timeout
                     response_line = await self._serial_read_until_done(full_command)
                 case _:
-                    # default processing
-                    self.serial_port.reset_input_buffer()
-                    self.serial_port.reset_output_buffer()
-                    c = self.serial_port.write(full_command)
+                    # default processing - response is complete as soon as the protocol framing says so
+                    self.frame_reader.reset()
+                    c = await self._write(full_command)
                     log.debug("Default serial s&r. Wrote %i bytes", c)
-                    self.serial_port.flush()
-                    time.sleep(0.3)  # give serial port time to receive the data
-                    response_line = self.serial_port.read_until(b"\r")
+                    response_line = await self.frame_reader.read_frame_from_fd(
+                        self.serial_port.fileno(), timeout=self.response_timeout(action, RESPONSE_TIMEOUT))
             log.info("serial response was: %s", response_line)
-            # response = self.get_protocol().check_response_and_trim(response_line)
-            result = command.build_result(raw_response=response_line, protocol=self.protocol)
-            return result
+            return response_line
         except Exception as e:
             log.warning("Serial read error: %s", e)
-            result.error = True
-            result.error_messages.append(f"Serial read error {e}")
-            self.disconnect()
-            return result
+            await self.disconnect()
+            raise
+        finally:
+            if streaming and self.is_connected():
+                self.vedirect.attach(self.serial_port.fileno())
+
+
+    async def _victron_listen(self, action) -> bytes:
+        """ the newest VE.Direct text block - the port is read continuously from the first listen until it is closed """
+        if self.vedirect is None:
+            self.vedirect = VEDirectReader()
+        if not self.vedirect.attached:
+            log.debug("streaming VE.Direct output from %s", self.path)
+            self.vedirect.attach(self.serial_port.fileno())
+        timeout = self.response_timeout(action, LISTEN_TIMEOUT)
+        try:
+            block = await self.vedirect.latest_block(timeout=timeout)
+        except asyncio.TimeoutError as exc:
+            raise InvalidResponse(f"no complete VE.Direct block in {timeout}s ({self.vedirect})") from exc
+        log.info("VE.Direct block: %s", block.fields)
+        return block.raw
 
 
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(2), reraise=True)
     async def _serial_read_until_done(self, full_command):
         log.debug("case: CommandType.SERIAL_READ_UNTIL_DONE")
-        response_line = b""
-        self.serial_port.timeout = 0.5
-        self.serial_port.write_timeout = 1
         self.serial_port.reset_input_buffer()
-        self.serial_port.reset_output_buffer()
-        c = self.serial_port.write(full_command)
+        c = await self._write(full_command)
         log.debug("wrote %s bytes", c)
-        self.serial_port.flush()
-        # read until no more data
-        time.sleep(READ_UNTIL_DONE_WAIT_TIME)
-        to_read = self.serial_port.in_waiting
-        log.debug("initial bytes waiting %s", to_read)
-        while to_read > 0:
-            # await asyncio.sleep(0.5)  # give serial port time to receive the data
-            # got some data to read
-            log.debug("bytes waiting %s", to_read)
-            response_line += self.serial_port.read(to_read)
-            time.sleep(READ_UNTIL_DONE_WAIT_TIME)
-            to_read = self.serial_port.in_waiting
+        # read until the line goes quiet
+        response_line = await self._read(timeout=RESPONSE_TIMEOUT, idle=READ_UNTIL_DONE_WAIT_TIME)
         if len(response_line) == 0:
             # maybe port has failed
             await self.disconnect()
@@ -197,4 +187,81 @@ class SerialPort(Port):
             log.info("response was empty")
             raise InvalidResponse("Response was empty")
         return response_line
-        
+
+
+    async def _wait_for_fd(self, writer: bool, timeout: float) -> bool:
+        """ wait (without blocking the event loop) until the port is readable / writable """
+        loop = asyncio.get_running_loop()
+        fd = self.serial_port.fileno()
+        ready = loop.create_future()
+
+        def _ready():
+            if not ready.done():
+                ready.set_result(True)
+
+        if writer:
+            loop.add_writer(fd, _ready)
+        else:
+            loop.add_reader(fd, _ready)
+        try:
+            await asyncio.wait_for(ready, timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if writer:
+                loop.remove_writer(fd)
+            else:
+                loop.remove_reader(fd)
+
+
+    async def _write(self, data: bytes) -> int:
+        """ write all of data to the port, waiting for the port to drain if the os buffer is full """
+        if not data:
+            return 0
+        fd = self.serial_port.fileno()
+        view = memoryview(data)
+        while view:
+            try:
+                written = os.write(fd, view)
+                view = view[written:]
+            except BlockingIOError:
+                written = 0
+            if view and not written and not await self._wait_for_fd(writer=True, timeout=RESPONSE_TIMEOUT):
+                raise TimeoutError(f"Timed out writing to serial port {self.path}")
+        return len(data)
+
+
+    async def _read(
+        self,
+        *,
+        timeout: float,
+        complete: Optional[Callable[[FrameBuffer], bool]] = None,
+        idle: Optional[float] = None,
+    ) -> memoryview:
+        """ read from the port until complete(buffer) is true, the line is idle for `idle` seconds
+            (once some data has arrived) or `timeout` seconds have passed
+        """
+        loop = asyncio.get_running_loop()
+        fd = self.serial_port.fileno()
+        deadline = loop.time() + timeout
+        buffer = self.rx_buffer
+        buffer.clear()
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                log.debug("serial read timed out after %ss with %i bytes", timeout, len(buffer))
+                break
+            wait_for = remaining if idle is None or not buffer else min(idle, remaining)
+            if not await self._wait_for_fd(writer=False, timeout=wait_for):
+                # timeout or line has gone quiet
+                break
+            try:
+                count = buffer.read_from_fd(fd, READ_CHUNK_SIZE)
+            except BlockingIOError:
+                continue
+            if not count:
+                raise serial.SerialException("device reports readiness to read but returned no data")
+            if complete is not None and complete(buffer):
+                break
+        return buffer.view()
@@ -1,21 +1,29 @@
 """ powermon / ports / usbport.py """
-# import asyncio
+import asyncio
 import logging
 import os
-import time
 from glob import glob
 
-from powermon.commands.command import Command
-from powermon.commands.result import Result, ResultType
-from powermon.exceptions import ConfigError, PowermonProtocolError
+from powermon.exceptions import ConfigError
 from ._types import PortType
+from .framereader import FrameReader
 from .port import Port
 
 log = logging.getLogger("USBPort")
 
+HID_REPORT_SIZE = 8     # hidraw devices take output reports of 8 bytes
+RESPONSE_TIMEOUT = 2.0  # maximum time to wait for a complete response
+
 
 class USBPort(Port):
-    """ usb port object """
+    """ usb (hidraw) port object
+
+    The device is opened non-blocking and its file descriptor registered with the
+    event loop, so waiting for a reply never blocks other devices.
+    """
+    def __str__(self):
+        return f"USBPort: {self.path=}, protocol:{self.protocol}, {self.port=}, {self.error_message=}"
+
     @classmethod
     async def from_config(cls, config, protocol, serial_number):
         log.debug("building usb port. config:%s", config)
@@ -29,8 +37,9 @@ class USBPort(Port):
         self.port_type = PortType.USB
         super().__init__(protocol=protocol)
 
-        self.path = None
+        self.path = path
         self.port = None
+        self.frame_reader = FrameReader(framing=self.protocol.framing)
 
 
     async def resolve_path(self, path, serial_number):
@@ -47,23 +56,7 @@ class USBPort(Port):
         # check we have something to look for
         if serial_number is None:
             raise ConfigError("Wildcard paths require a serial_number in config.")
-        # check we have get_id in this protocol
-        try:
-            command = self.protocol.get_id_command()
-        except PowermonProtocolError as ex:
-            raise ConfigError(f"No get_id in protocol: {self.protocol.protocol_id}") from ex
-
-        for _path in paths:
-            log.debug("Checking path: %s for serial_number: %s", _path, serial_number)
-            self.path = _path
-            await self.connect()
-            res = await self.send_and_receive(command=command)
-            await self.disconnect()
-
-            if res.is_valid and str(res.readings[0].data_value) == str(serial_number):
-                log.info("SUCCESS: path: %s matches serial_number: %s", _path, serial_number)
-                return _path  # return the matching path
-        raise ConfigError(f"None of the paths match serial_number: {serial_number}")
+        return await self.find_path_for_serial_number(paths, serial_number)
 
 
     def is_connected(self) -> bool:
@@ -84,57 +77,51 @@ class USBPort(Port):
         return self.is_connected()
 
     async def disconnect(self) -> None:
-        log.debug("USBPort disconnecting: %i", self.port)
+        log.debug("USBPort disconnecting: %s", self.port)
         if self.port is not None:
             os.close(self.port)
         self.port = None
 
-    async def send_and_receive(self, command: Command) -> Result:
+    async def get_response(self, action) -> bytes:
+        """ send the action's full_command and return the raw response bytes (up to and including the terminator) """
         if not self.is_connected():
-            log.warning("USBPort not connected")
-            return command.build_result(result_type=ResultType.ERROR, raw_response=b"USBPort not connected", protocol=self.protocol)
-        response_line = bytes()
-
-        # Send the command to the open usb connection
-        full_command = command.full_command
-        cmd_len = len(full_command)
-        log.debug("length of to_send: %i", cmd_len)
-        # for command of len < 8 it ok just to send
-        # otherwise need to pack to a multiple of 8 bytes and send 8 at a time
+            raise RuntimeError("USB port not open")
+        full_command = action.full_command
+        log.debug("length of to_send: %i", len(full_command))
         try:
-            if cmd_len <= 8:
-                # Send all at once
-                log.debug("sending full_command in on shot")
-                time.sleep(0.05)
-                os.write(self.port, full_command)
-            else:
-                log.debug("multiple chunk send")
-                chunks = [full_command[i:i + 8] for i in range(0, cmd_len, 8)]
-                for chunk in chunks:
-                    # pad chunk to 8 bytes
-                    if len(chunk) < 8:
-                        padding = 8 - len(chunk)
-                        chunk += b'\x00' * padding
-                    log.debug("sending chunk: %s", chunk)
-                    time.sleep(0.05)
-                    os.write(self.port, chunk)
-            time.sleep(0.25)
-            # Read from the usb connection
-            # try to a max of 100 times
-            for _ in range(100):
-                # attempt to deal with resource busy and other failures to read
-                time.sleep(0.15)
-                r = os.read(self.port, 256)
-                response_line += r
-                # Finished is \r is in byte_response
-                if bytes([13]) in response_line:
-                    # remove anything after the \r
-                    response_line = response_line[: response_line.find(bytes([13])) + 1]
-                    break
-        except BrokenPipeError as e:
-            log.debug("USB read error: %s", e)
+            self.frame_reader.reset()
+            await self._write(full_command)
+            response_line = await self.frame_reader.read_frame_from_fd(self.port, timeout=self.response_timeout(action, RESPONSE_TIMEOUT))
+        except Exception as e:
+            log.warning("USB read error: %s", e)
+            await self.disconnect()
+            raise
         log.debug("usb response was: %s", response_line)
-        # response = self.get_protocol().check_response_and_trim(response_line)
-        result = command.build_result(raw_response=response_line, protocol=self.protocol)
+        return response_line
+
+
+    async def _write(self, data: bytes) -> None:
+        """ write data as 8 byte hid reports (the last one padded with nulls), waiting on the event loop if the device is busy """
+        loop = asyncio.get_running_loop()
 
-        return result
+        def _writable(future):
+            if not future.done():
+                future.set_result(True)
+
+        for i in range(0, len(data), HID_REPORT_SIZE):
+            chunk = data[i:i + HID_REPORT_SIZE].ljust(HID_REPORT_SIZE, b"\x00")
+            log.debug("sending chunk: %s", chunk)
+            while True:
+                try:
+                    os.write(self.port, chunk)
+                    break
+                except BlockingIOError:
+                    pass
+                writable = loop.create_future()
+                loop.add_writer(self.port, _writable, writable)
+                try:
+                    await asyncio.wait_for(writable, timeout=RESPONSE_TIMEOUT)
+                except asyncio.TimeoutError as exc:
+                    raise TimeoutError(f"Timed out writing to usb port {self.path}") from exc
+                finally:
+                    loop.remove_writer(self.port)
@@ -0,0 +1,236 @@
+""" powermon / ports / vedirect.py
+
+Streaming reader for Victron VE.Direct serial output.
+
+In text mode a device sends a block of "\\r\\n<label>\\t<value>" fields about
+once a second. The block ends with a "Checksum" field whose value is a single
+byte that makes the sum of every byte in the block 0 (mod 256). HEX protocol
+frames (":<hex digits>\\n", eg replies to GET commands or asynchronous
+messages) may be sent between the fields of a text block - they are not part
+of the block's checksum.
+
+VEDirectReader is fed bytes as they arrive and splits them into verified
+VEDirectBlocks and VEDirectHexFrames, so blocks are never split or merged
+however the reads fall. While attached to a port's file descriptor it reads
+continuously (nothing is missed between polls) and the frames can be consumed
+as an async iterator, or the freshest block taken with latest_block().
+"""
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+from powermon.protocols.crc import victron_checksum
+
+log = logging.getLogger("VEDirect")
+
+CHECKSUM_MARKER = b"\r\nChecksum\t"
+MAX_BLOCK_SIZE = 2048  # give up on (and resync after) text that has no Checksum field by this length
+MAX_QUEUED = 32        # frames kept for the consumer - the oldest are dropped beyond this
+READ_CHUNK_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class VEDirectBlock:
+    """ a complete, checksum verified text block """
+    raw: bytes
+    fields: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_raw(cls, raw: bytes) -> "VEDirectBlock":
+        fields = {}
+        # the checksum field is the last - its value byte can be anything, so it is not parsed
+        for line in raw[:raw.rfind(CHECKSUM_MARKER)].split(b"\r\n"):
+            if not line:
+                continue
+            label, _, value = line.partition(b"\t")
+            fields[label.decode("latin-1")] = value.decode("latin-1")
+        return cls(raw=raw, fields=fields)
+
+
+@dataclass(frozen=True)
+class VEDirectHexFrame:
+    """ a HEX protocol frame - command nibble, payload and whether its checksum is correct """
+    raw: bytes
+    command: Optional[int]
+    payload: bytes
+    valid: bool
+
+    @classmethod
+    def from_raw(cls, raw: bytes) -> "VEDirectHexFrame":
+        digits = raw[1:].strip()
+        try:
+            # the command is a single hex digit - pad it to a whole byte
+            data = bytes.fromhex("0" + digits.decode("ascii"))
+        except ValueError:
+            return cls(raw=raw, command=None, payload=b"", valid=False)
+        if len(data) < 2:
+            return cls(raw=raw, command=data[0] if data else None, payload=b"", valid=False)
+        return cls(raw=raw, command=data[0], payload=data[1:-1], valid=victron_checksum(data[:-1]) == data[-1])
+
+
+VEDirectFrame = Union[VEDirectBlock, VEDirectHexFrame]
+
+
+class VEDirectReader:
+    """ splits a VE.Direct byte stream into text blocks and HEX frames """
+
+    def __str__(self):
+        return (f"VEDirectReader: {self.blocks=}, {self.hex_frames=}, {self.checksum_errors=}, "
+                f"{self.dropped=}, buffered={len(self._buffer)}, attached={self.attached}")
+
+    def __init__(self, max_queued: int = MAX_QUEUED) -> None:
+        self._buffer = bytearray()  # bytes not yet assigned to a frame
+        self._text = bytearray()    # text of the current block that came before a HEX frame
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._fd: Optional[int] = None
+        self.blocks = 0
+        self.hex_frames = 0
+        self.checksum_errors = 0
+        self.dropped = 0  # frames dropped because the consumer fell behind
+
+    # ------------------------------------------------------------------
+    # Framing
+    # ------------------------------------------------------------------
+
+    def feed(self, data: bytes) -> list[VEDirectFrame]:
+        """ add received bytes, returns (and queues) the frames completed by them """
+        buf = self._buffer
+        buf += data
+        frames: list[VEDirectFrame] = []
+        while buf:
+            marker = buf.find(CHECKSUM_MARKER)
+            block_end = -1 if marker < 0 else marker + len(CHECKSUM_MARKER) + 1
+            colon = buf.find(b":")
+            if colon >= 0 and colon == block_end - 1:
+                # the checksum byte happens to be ':'
+                colon = buf.find(b":", block_end)
+            if colon >= 0 and (block_end < 0 or colon < block_end - 1):
+                # a HEX frame, before the end of the current block
+                end = buf.find(b"\n", colon)
+                if end < 0:
+                    break
+                self._text += buf[:colon]
+                frames.append(self._hex_frame(bytes(buf[colon:end + 1])))
+                del buf[:end + 1]
+                continue
+            if block_end >= 0 and len(buf) >= block_end:
+                raw = bytes(self._text + buf[:block_end])
+                self._text.clear()
+                del buf[:block_end]
+                block = self._block(raw)
+                if block is not None:
+                    frames.append(block)
+                continue
+            break
+        if len(self._text) + len(buf) > MAX_BLOCK_SIZE:
+            log.debug("no VE.Direct block end in %i bytes - discarding", len(self._text) + len(buf))
+            self._text.clear()
+            # keep the tail in case a marker straddles it
+            del buf[:-len(CHECKSUM_MARKER)]
+        for frame in frames:
+            self._put(frame)
+        return frames
+
+    def _block(self, raw: bytes) -> Optional[VEDirectBlock]:
+        if sum(raw) & 0xFF:
+            # also the first (partial) block after starting mid-stream
+            self.checksum_errors += 1
+            log.debug("VE.Direct block checksum incorrect, discarding %i bytes", len(raw))
+            return None
+        self.blocks += 1
+        return VEDirectBlock.from_raw(raw)
+
+    def _hex_frame(self, raw: bytes) -> VEDirectHexFrame:
+        frame = VEDirectHexFrame.from_raw(raw)
+        self.hex_frames += 1
+        if not frame.valid:
+            self.checksum_errors += 1
+            log.debug("VE.Direct HEX frame invalid: %s", raw)
+        return frame
+
+    def _put(self, frame: VEDirectFrame) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(frame)
+
+    def clear(self) -> None:
+        """ discard buffered bytes and queued frames """
+        self._buffer.clear()
+        self._text.clear()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    # ------------------------------------------------------------------
+    # Consuming frames
+    # ------------------------------------------------------------------
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> VEDirectFrame:
+        return await self._queue.get()
+
+    async def next_frame(self, timeout: Optional[float] = None) -> VEDirectFrame:
+        return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+
+    async def latest_block(self, timeout: float) -> VEDirectBlock:
+        """ the newest block received since the last call - waits up to timeout seconds if there is none
+
+            (queued HEX frames are discarded)
+        """
+        latest = None
+        while not self._queue.empty():
+            frame = self._queue.get_nowait()
+            if isinstance(frame, VEDirectBlock):
+                latest = frame
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while latest is None:
+            frame = await asyncio.wait_for(self._queue.get(), timeout=max(0.0, deadline - loop.time()))
+            if isinstance(frame, VEDirectBlock):
+                latest = frame
+        return latest
+
+    # ------------------------------------------------------------------
+    # Reading from a file descriptor
+    # ------------------------------------------------------------------
+
+    @property
+    def attached(self) -> bool:
+        return self._fd is not None
+
+    def attach(self, fd: int) -> None:
+        """ read continuously from a non-blocking fd (using loop.add_reader) """
+        if self._fd == fd:
+            return
+        self.detach()
+        self._fd = fd
+        asyncio.get_running_loop().add_reader(fd, self._on_readable)
+
+    def detach(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(self._fd)
+        except RuntimeError:
+            # no running loop (eg closing after the loop stopped) - nothing is registered any more
+            pass
+        self._fd = None
+
+    def _on_readable(self) -> None:
+        try:
+            data = os.read(self._fd, READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as exc:
+            log.warning("VE.Direct read failed: %s", exc)
+            self.detach()
+            return
+        if not data:
+            log.warning("VE.Direct end of file")
+            self.detach()
+            return
+        self.feed(data)
@@ -0,0 +1,86 @@
+"""
+victronbleport module
+- VictronBlePort: reads Victron Instant Readout devices from their BLE advertisements
+
+No GATT connection is made - the shared BleScanner hears the device's
+advertisements and each read returns the next one, decrypted with the
+device's victron_key. Readings arrive at the advertisement rate for the cost
+of listening.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+from powermon.exceptions import BLEResponseError, ConfigError, InvalidResponse
+from powermon.protocols.victron_ble.advertisement import VICTRON_COMPANY_ID, decrypt, parse_key
+
+from ._types import PortType
+from .blescanner import BleScanner
+from .port import Port
+
+log = logging.getLogger("VictronBlePort")
+
+ADVERTISEMENT_TIMEOUT = 10.0  # maximum time to wait for an advertisement (unless the command sets its own)
+
+
+class VictronBlePort(Port):
+    """ BLE port for advertisement-only (Victron Instant Readout) devices - extends Port """
+
+    def __str__(self) -> str:
+        return f"VictronBlePort: mac={self.mac}, protocol={self.protocol}, listening={self.is_connected()}, error={self.error_message}"
+
+    @classmethod
+    async def from_config(cls, config, protocol, serial_number) -> "VictronBlePort":
+        """ build the port from a BlePortConfig that has a victron_key """
+        log.debug("building victron ble port. config:%s", config)
+        if config is None:
+            raise ConfigError("BLE port config missing")
+        mac = getattr(config, "mac", None)
+        if mac is None:
+            raise ConfigError("BLE port config must include the 'mac' item")
+        victron_key = getattr(config, "victron_key", None)
+        if victron_key is None:
+            raise ConfigError("Victron BLE port config must include the 'victron_key' item")
+        return cls(mac=mac, protocol=protocol, victron_key=victron_key)
+
+    def __init__(self, mac: str, protocol, victron_key: str, scanner: Optional[BleScanner] = None) -> None:
+        self.port_type = PortType.BLE
+        super().__init__(protocol=protocol)
+        self.mac = mac
+        try:
+            self.key = parse_key(victron_key)
+        except ValueError as exc:
+            raise ConfigError(str(exc)) from exc
+        self.scanner = scanner or BleScanner.shared()
+        self._last_seen: Optional[float] = None  # when the last advertisement read was received
+
+    def is_connected(self) -> bool:
+        """ True while the scan that hears the advertisements is running """
+        return self.scanner.running
+
+    async def connect(self) -> bool:
+        log.info("victron ble port listening for: %s", self.mac)
+        await self.scanner.start()
+        return True
+
+    async def disconnect(self) -> None:
+        # the scan is shared with the other BLE ports - leave it running
+        return None
+
+    async def get_response(self, action) -> bytes:
+        """ the next advertisement from the device, decrypted (header + record) """
+        timeout = self.response_timeout(action, ADVERTISEMENT_TIMEOUT)
+        advertisement = await self.scanner.wait_for_advertisement(self.mac, timeout, newer_than=self._last_seen)
+        if advertisement is None:
+            raise BLEResponseError(f"no advertisement from {self.mac} in {timeout}s")
+        self._last_seen = advertisement.last_seen
+        payload = advertisement.manufacturer_data(VICTRON_COMPANY_ID)
+        if payload is None:
+            raise BLEResponseError(f"advertisement from {self.mac} has no Victron manufacturer data - is Instant Readout enabled?")
+        try:
+            response = decrypt(payload, self.key)
+        except InvalidResponse as exc:
+            raise BLEResponseError(f"advertisement from {self.mac}: {exc}") from exc
+        log.debug("victron advertisement was: %s", response)
+        return response
@@ -1,9 +1,19 @@
 # powermon/protocols/catalog.py
+"""
+Protocol catalog - where the protocol definitions live and how they are loaded.
+
+build_registry() returns a LazyProtocolRegistry: it indexes the definition
+module of every ProtocolType without importing any of them, and a definition
+is imported, checked and registered the first time it is looked up - a config
+that uses one protocol only ever imports that one. build_registry(eager=True)
+loads and validates every definition up front (for CI / `powermon-cli` checks).
+"""
 from __future__ import annotations
 
 import traceback as _traceback
 from dataclasses import dataclass
 from importlib import import_module
+from typing import Mapping
 
 from powermon.protocols.model import ProtocolDefinition
 from powermon.protocols.registry import ProtocolRegistry
@@ -44,45 +54,53 @@ def _definition_module_name(ptype: ProtocolType) -> str:
     return f"powermon.protocols.{ptype.value}.definition"
 
 
-def load_all_protocol_definitions(*, include_tracebacks: bool = True) -> list[ProtocolDefinition]:
+def load_protocol_definition(ptype: ProtocolType, module_name: str | None = None) -> ProtocolDefinition:
     """
-    Load all ProtocolDefinition objects for every ProtocolType enum member.
+    Import and check the ProtocolDefinition for a ProtocolType.
 
     Convention:
       - module: powermon.protocols.<ptype.value>.definition
       - attribute: PROTOCOL (ProtocolDefinition)
     """
+    module_name = module_name or _definition_module_name(ptype)
+    mod = import_module(module_name)
+    proto = getattr(mod, "PROTOCOL")
+    if not isinstance(proto, ProtocolDefinition):
+        raise TypeError(
+            f"{module_name}.PROTOCOL is {type(proto)!r}, expected ProtocolDefinition"
+        )
+
+    # Ensure loaded definition matches the enum member it was loaded for
+    if proto.protocol_type != ptype:
+        raise ValueError(
+            f"protocol_type mismatch: expected {ptype}, got {proto.protocol_type}"
+        )
+    return proto
+
+
+def _load_failure(ptype: ProtocolType, module_name: str, exc: Exception, include_tracebacks: bool) -> ProtocolLoadFailure:
+    return ProtocolLoadFailure(
+        protocol_type=ptype,
+        module=module_name,
+        error=f"{exc.__class__.__name__}: {exc}",
+        tb=_traceback.format_exc() if include_tracebacks else None,
+    )
+
+
+def load_all_protocol_definitions(*, include_tracebacks: bool = True) -> list[ProtocolDefinition]:
+    """
+    Load all ProtocolDefinition objects for every ProtocolType enum member.
+    Raises ProtocolCatalogError if any protocol fails to import/load.
+    """
     defs: list[ProtocolDefinition] = []
     failures: list[ProtocolLoadFailure] = []
 
     for ptype in ProtocolType:
         module_name = _definition_module_name(ptype)
         try:
-            mod = import_module(module_name)
-            proto = getattr(mod, "PROTOCOL")
-            if not isinstance(proto, ProtocolDefinition):
-                raise TypeError(
-                    f"{module_name}.PROTOCOL is {type(proto)!r}, expected ProtocolDefinition"
-                )
-
-            # Ensure loaded definition matches the enum member we’re iterating
-            if proto.protocol_type != ptype:
-                raise ValueError(
-                    f"protocol_type mismatch: expected {ptype}, got {proto.protocol_type}"
-                )
-
-            defs.append(proto)
-
+            defs.append(load_protocol_definition(ptype, module_name))
         except Exception as exc:
-            tb = _traceback.format_exc() if include_tracebacks else None
-            failures.append(
-                ProtocolLoadFailure(
-                    protocol_type=ptype,
-                    module=module_name,
-                    error=f"{exc.__class__.__name__}: {exc}",
-                    tb=tb,
-                )
-            )
+            failures.append(_load_failure(ptype, module_name, exc, include_tracebacks))
 
     if failures:
         raise ProtocolCatalogError(failures)
@@ -90,22 +108,130 @@ def load_all_protocol_definitions(*, include_tracebacks: bool = True) -> list[Pr
     return defs
 
 
-def build_registry(*, validate: bool = True, include_tracebacks: bool = True) -> ProtocolRegistry:
+class LazyProtocolRegistry(ProtocolRegistry):
     """
-    Build a ProtocolRegistry for all implemented protocols.
-    Raises ProtocolCatalogError if any protocol fails to import/load.
+    ProtocolRegistry that imports each protocol definition on first use.
+
+    Protocol types and their definition modules are known up front (no imports);
+    a protocol that fails to load raises ProtocolCatalogError when it is looked up.
     """
-    defs = load_all_protocol_definitions(include_tracebacks=include_tracebacks)
-    reg = ProtocolRegistry(defs)
 
-    # Optional extra validation (if these exist on ProtocolRegistry)
-    if validate:
-        validate_defs = getattr(reg, "validate_definitions", None)
+    def __init__(
+        self,
+        entries: Mapping[ProtocolType, str] | None = None,
+        *,
+        include_tracebacks: bool = True,
+    ):
+        super().__init__(())
+        if entries is None:
+            entries = {ptype: _definition_module_name(ptype) for ptype in ProtocolType}
+        self._entries: dict[ProtocolType, str] = dict(entries)
+        self._include_tracebacks = include_tracebacks
+
+    def __repr__(self) -> str:
+        return f"LazyProtocolRegistry(entries={len(self._entries)}, loaded={sorted(self._by_type)})"
+
+    # ------------------------------------------------------------------
+    # Index (no imports)
+    # ------------------------------------------------------------------
+
+    def protocol_types(self) -> list[ProtocolType]:
+        """ the protocol types this registry can load """
+        return list(self._entries)
+
+    def is_loaded(self, protocol_type: ProtocolType) -> bool:
+        return protocol_type in self._by_type
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _load(self, protocol_type: ProtocolType) -> ProtocolDefinition:
+        module_name = self._entries[protocol_type]
+        try:
+            proto = load_protocol_definition(protocol_type, module_name)
+            self._register(proto)
+        except Exception as exc:
+            raise ProtocolCatalogError(
+                [_load_failure(protocol_type, module_name, exc, self._include_tracebacks)]
+            ) from exc
+        return proto
+
+    def load_all(self) -> list[ProtocolDefinition]:
+        """
+        Load every protocol not loaded yet.
+        Raises ProtocolCatalogError listing all the protocols that fail to import/load.
+        """
+        failures: list[ProtocolLoadFailure] = []
+        for ptype in self._entries:
+            if ptype in self._by_type:
+                continue
+            try:
+                self._load(ptype)
+            except ProtocolCatalogError as exc:
+                failures.extend(exc.failures)
+        if failures:
+            raise ProtocolCatalogError(failures)
+        return list(self._by_type.values())
+
+    def validate_all(self) -> None:
+        """ load every protocol and run the registry validations (eager mode) """
+        self.load_all()
+
+        # Optional extra validation (if these exist on ProtocolRegistry)
+        validate_defs = getattr(self, "validate_definitions", None)
         if callable(validate_defs):
             validate_defs()
 
-        validate_enum = getattr(reg, "validate_enum_coverage", None)
+        validate_enum = getattr(self, "validate_enum_coverage", None)
         if callable(validate_enum):
             validate_enum(strict=True)
 
-    return reg
\ No newline at end of file
+    # ------------------------------------------------------------------
+    # Protocol lookup
+    # ------------------------------------------------------------------
+
+    def get(self, protocol_type: ProtocolType) -> ProtocolDefinition:
+        proto = self._by_type.get(protocol_type)
+        if proto is not None:
+            return proto
+        if protocol_type not in self._entries:
+            raise KeyError(f"Unknown protocol_type: {protocol_type}")
+        return self._load(protocol_type)
+
+    def get_by_id(self, protocol_id: str) -> ProtocolDefinition:
+        proto = self._by_id.get(protocol_id.lower())
+        if proto is not None:
+            return proto
+        # protocol ids normally match the ProtocolType value - try that protocol before loading them all
+        try:
+            ptype = ProtocolType(protocol_id.lower())
+        except ValueError:
+            ptype = None
+        if ptype in self._entries and ptype not in self._by_type:
+            self._load(ptype)
+            proto = self._by_id.get(protocol_id.lower())
+            if proto is not None:
+                return proto
+        self.load_all()
+        return super().get_by_id(protocol_id)
+
+    def list_protocols(self) -> list[ProtocolDefinition]:
+        return self.load_all()
+
+
+def build_registry(*, eager: bool = False, validate: bool = True, include_tracebacks: bool = True) -> ProtocolRegistry:
+    """
+    Build a ProtocolRegistry for all implemented protocols.
+
+    Protocols are loaded on first use unless eager is set - then every protocol is
+    loaded (and validated, if validate is set) now, raising ProtocolCatalogError
+    if any protocol fails to import/load.
+    """
+    reg = LazyProtocolRegistry(include_tracebacks=include_tracebacks)
+    if eager:
+        if validate:
+            reg.validate_all()
+        else:
+            reg.load_all()
+    return reg
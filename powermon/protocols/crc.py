@@ -1,6 +1,21 @@
-import logging
+""" powermon / protocols / crc.py
 
-log = logging.getLogger("crc")
+CRC / checksum functions used by the protocol framings.
+
+All functions accept any bytes-like object (bytes, bytearray, memoryview) so
+frames can be checked without copying. No logging in here - these run for
+every frame received.
+"""
+import binascii
+from typing import Iterable, List
+
+# bytes that a PI30 CRC byte is never allowed to be (they would be mistaken for framing)
+_PI30_RESERVED = frozenset((0x28, 0x0D, 0x0A, 0x00))  # '(' '\r' '\n' NUL
+
+
+def crc16_xmodem(data, crc: int = 0) -> int:
+    """ CRC-16/XMODEM (poly 0x1021, init 0) - binascii.crc_hqx is this CRC implemented in C """
+    return binascii.crc_hqx(data, crc)
 
 
 def crc_jk232(byte_data):
@@ -9,78 +24,44 @@ def crc_jk232(byte_data):
     - 2 bytes, the verification field is "command code + length byte + data segment content",
     the verification method is thesum of the above fields and then the inverse plus 1, the high bit is in the front and the low bit is in the back.
     """
-    crc = 0
-    for b in byte_data:
-        crc += b
-    crc_low = crc & 0xFF
-    crc_high = (crc >> 8) & 0xFF
-    return [crc_high, crc_low] 
+    crc = sum(byte_data)
+    return [(crc >> 8) & 0xFF, crc & 0xFF]
 
-def crc_pi30(data_bytes):
+
+def crc_pi30(data_bytes) -> bytes:
     """
     Calculates CRC for supplied data_bytes
-    """
-    # assert type(byte_cmd) == bytes
-    log.debug("Calculating CRC for %s", data_bytes)
-
-    crc = 0
-    da = 0
-    crc_ta = [
-        0x0000,
-        0x1021,
-        0x2042,
-        0x3063,
-        0x4084,
-        0x50A5,
-        0x60C6,
-        0x70E7,
-        0x8108,
-        0x9129,
-        0xA14A,
-        0xB16B,
-        0xC18C,
-        0xD1AD,
-        0xE1CE,
-        0xF1EF,
-    ]
-
-    for c in data_bytes:
-        # log.debug('Encoding %s', c)
-        if isinstance(c, str):
-            c = ord(c)
-        da = ((crc >> 8) & 0xFF) >> 4
-        crc = (crc << 4) & 0xFFFF
-
-        index = da ^ (c >> 4)
-        crc ^= crc_ta[index]
-
-        da = ((crc >> 8) & 0xFF) >> 4
-        crc = (crc << 4) & 0xFFFF
-
-        index = da ^ (c & 0x0F)
-        crc ^= crc_ta[index]
 
+    CRC-16/XMODEM, with any byte that would clash with the framing ('(', CR, LF, NUL) incremented
+    """
+    if isinstance(data_bytes, str):
+        data_bytes = data_bytes.encode("latin-1")
+    crc = binascii.crc_hqx(data_bytes, 0)
+    crc_high = crc >> 8
     crc_low = crc & 0xFF
-    crc_high = (crc >> 8) & 0xFF
-
-    if crc_low == 0x28 or crc_low == 0x0D or crc_low == 0x0A or crc_low == 0x00:
-        crc_low += 1
-    if crc_high == 0x28 or crc_high == 0x0D or crc_high == 0x0A or crc_high == 0x00:
+    if crc_high in _PI30_RESERVED:
         crc_high += 1
+    if crc_low in _PI30_RESERVED:
+        crc_low += 1
+    return bytes((crc_high, crc_low))
+
 
-    crc = crc_high << 8
-    crc += crc_low
+def verify_pi30_frames(frames: Iterable) -> List[bool]:
+    """
+    Check the CRC of many complete PI30 frames at once - b"(<payload><crc_hi><crc_lo>\\r"
+
+    Returns a bool per frame (frames too short to hold a CRC are False).
+    """
+    results = []
+    for frame in frames:
+        view = memoryview(frame)
+        results.append(len(view) > 3 and crc_pi30(view[:-3]) == view[-3:-1])
+    return results
 
-    log.debug(f"Generated CRC {crc_high:#04x} {crc_low:#04x} {crc:#06x}")
-    return bytes([crc_high, crc_low])
 
 def victron_checksum(byte_data):
     """
     Generate VE Direct HEX Checksum
     - sum of byteData + checksum = 0x55
     """
-    checksum = 0x55
-    for b in byte_data:
-        checksum -= b
-    checksum = checksum & 0xFF
-    return checksum
\ No newline at end of file
+    return (0x55 - sum(byte_data)) & 0xFF
@@ -1,12 +1,62 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from powermon.exceptions import InvalidCRC, InvalidResponse
+from powermon.ports._types import PortType
+from powermon.protocols.framing import EncodeContext, LengthField
+from powermon.protocols.model import CommandDefinition
+
+
 @dataclass(frozen=True)
 class DalyFrameSpec:
+    """
+    Framing for Daly BMS protocols:
+      - Frame is: 0xA5 <address> <command> <data length> <data...> <checksum>
+      - Checksum is the sum of all preceding bytes (& 0xFF)
+      - Requests carry the host address (0x40 serial, 0x80 BLE) unless the
+        unit's bus address is given (several units on one RS485 bus) - replies
+        carry the address of the unit that sent them
+    """
+
+    start: int = 0xA5
+    length: LengthField = LengthField(offset=3, size=1, adjust=5)
+
     def encode_request(self, cmd: CommandDefinition, *, params=None, ctx: EncodeContext) -> bytes:
         is_ble = ctx.port_type is PortType.BLE
-        source = 0x80 if is_ble else 0x40
-        code = int(cmd.request.command_code, 16)
+        if ctx.address is not None:
+            source = ctx.address
+        else:
+            source = 0x80 if is_ble else 0x40
+        code = int(cmd.request.command, 16)
 
         frame = bytearray([0xA5, source, code, 8]) + bytearray(8)
         frame.append(sum(frame) & 0xFF)
         if not is_ble:
             frame.append(0x0A)
-        return bytes(frame)
\ No newline at end of file
+        return bytes(frame)
+
+    def validate(self, frame: bytes) -> None:
+        if frame is None:
+            raise InvalidResponse("Response is None")
+        if len(frame) <= 6:
+            raise InvalidResponse("Response is too short")
+        if frame[0] != self.start:
+            raise InvalidResponse("Response has incorrect start byte")
+        if self.length.frame_length(frame) != len(frame):
+            raise InvalidResponse("Response length does not match expected")
+
+    def verify_crc(self, frame: bytes) -> None:
+        calc_crc = sum(frame[:-1]) & 0xFF
+        if frame[-1] != calc_crc:
+            raise InvalidCRC(f"CRC mismatch: got {frame[-1]:#04x}, expected {calc_crc:#04x}")
+
+    def strip(self, frame: bytes) -> bytes:
+        # return the data bytes only
+        return frame[4:-1]
+
+    def frame_length(self, buffer: bytes) -> int | None:
+        return self.length.frame_length(buffer)
+
+    def response_address(self, frame: bytes) -> int | None:
+        return frame[1] if len(frame) > 1 else None
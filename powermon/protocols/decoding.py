@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import Any, Mapping, Optional, Sequence
+from typing import Any, Callable, Mapping, Optional, Sequence
 
 from powermon.protocols.model import ParsedResponse, ReadingDefinition
 
@@ -197,14 +197,247 @@ def decode_reading(parsed: ParsedResponse, rd: ReadingDefinition) -> Any:
     return coerced
 
 
+# ============================================================================
+# Precompiled decode plans
+# ============================================================================
+#
+# decode_reading() works everything out from the ReadingDefinition on every call.
+# A DecodePlan does that work once per command: each reading becomes a single
+# closure (extract -> missing check -> coerce -> transform) with the
+# definition's attributes, missing set, dtype dispatch and parsed path bound in.
+# The results are identical to decode_reading().
+
+_DEFAULT_MISSING = frozenset({"", "na", "n/a", "---", "null", "none"})
+_TRUE_TOKENS = frozenset({"1", "true", "t", "yes", "y", "on", "enabled"})
+_FALSE_TOKENS = frozenset({"0", "false", "f", "no", "n", "off", "disabled"})
+
+ReadingDecoder = Callable[[ParsedResponse], Any]
+
+
+def _compile_path(path: str) -> Callable[[Any], Any]:
+    """ split a dotted path once, returning a resolver equivalent to get_path(data, path) """
+    steps: list[tuple[str, Optional[int]]] = []
+    for part in path.split("."):
+        m = _INDEX_RE.match(part)
+        if m:
+            steps.append((m.group("name"), int(m.group("idx"))))
+        else:
+            steps.append((part, None))
+
+    def resolve(data: Any) -> Any:
+        cur = data
+        for name, idx in steps:
+            cur = _get_key(cur, name)
+            if idx is not None:
+                try:
+                    cur = cur[idx]
+                except Exception as exc:
+                    raise PathError(f"Index [{idx}] not valid for '{name}' in path '{path}'") from exc
+        return cur
+
+    return resolve
+
+
+def _compile_extract(rd: ReadingDefinition) -> ReadingDecoder:
+    """ equivalent of extract_raw(parsed, rd) """
+    label = rd.label
+    path = rd.path
+    index = rd.index
+
+    if path is not None:
+        resolve = _compile_path(path)
+
+        def extract_path(parsed: ParsedResponse) -> Any:
+            data = parsed.data
+            if data is None:
+                raise PathError(f"Reading '{label}' uses path '{path}' but ParsedResponse.data is None")
+            return resolve(data)
+
+        return extract_path
+
+    if index is None:
+        def extract_undefined(parsed: ParsedResponse) -> Any:
+            raise DecodeError(f"Reading '{label}' must specify either path or index")
+
+        return extract_undefined
+
+    optional = rd.optional
+
+    def extract_index(parsed: ParsedResponse) -> Any:
+        fields = parsed.fields
+        if fields is None:
+            raise FieldError(f"ParsedResponse.fields is None but index={index} requested")
+        try:
+            return fields[index]
+        except Exception as exc:
+            if optional:
+                return None
+            raise FieldError(f"Reading '{label}' index {index} out of range (fields={len(fields)})") from exc
+
+    return extract_index
+
+
+def _compile_from_str(rd: ReadingDefinition) -> Callable[[str], Any]:
+    """ the string branch of _coerce_scalar() for rd.dtype (input already stripped if required) """
+    dtype = rd.dtype
+    base = rd.base or 10
+
+    if dtype is str:
+        return lambda s: s
+
+    if dtype is bool:
+        def to_bool(s: str) -> bool:
+            sl = s.lower()
+            if sl in _TRUE_TOKENS:
+                return True
+            if sl in _FALSE_TOKENS:
+                return False
+            return bool(int(s, base))
+
+        return to_bool
+
+    if dtype is int:
+        return lambda s: int(s, base)
+
+    if dtype is float:
+        def to_float(s: str) -> float:
+            if s == "":
+                raise DecodeError("empty float field")
+            return float(s)
+
+        return to_float
+
+    return dtype
+
+
+def _compile_coerce(rd: ReadingDefinition) -> Callable[[Any], Any]:
+    """ equivalent of _coerce_scalar(value, rd) """
+    dtype = rd.dtype
+    strip = rd.strip
+    from_str = _compile_from_str(rd)
+
+    def coerce_other(value: Any) -> Any:
+        if dtype is not Any and isinstance(value, dtype):
+            return value
+        if isinstance(value, (bytes, bytearray)) and dtype is str:
+            return bytes(value).decode("ascii", errors="replace")
+        try:
+            return dtype(value)
+        except Exception as exc:
+            raise DecodeError(f"Failed to coerce {value!r} ({type(value).__name__}) to {dtype}") from exc
+
+    if dtype is str:
+        # strings are returned as-is (matching _coerce_scalar's isinstance short-cut)
+        def coerce_to_str(value: Any) -> Any:
+            if isinstance(value, str):
+                return value
+            return coerce_other(value)
+
+        return coerce_to_str
+
+    if strip:
+        def coerce_stripped(value: Any) -> Any:
+            if isinstance(value, str):
+                return from_str(value.strip())
+            return coerce_other(value)
+
+        return coerce_stripped
+
+    def coerce(value: Any) -> Any:
+        if isinstance(value, str):
+            return from_str(value)
+        return coerce_other(value)
+
+    return coerce
+
+
+def compile_reading(rd: ReadingDefinition) -> ReadingDecoder:
+    """
+    Compile a ReadingDefinition into a single callable: decoder(parsed) == decode_reading(parsed, rd)
+    """
+    label = rd.label
+    missing = _DEFAULT_MISSING if rd.missing_values is None else frozenset(str(x).strip().lower() for x in rd.missing_values)
+    extract = _compile_extract(rd)
+    coerce = _compile_coerce(rd)
+    transform = rd.transform
+
+    if transform is None:
+        def decode(parsed: ParsedResponse) -> Any:
+            raw = extract(parsed)
+            if raw is None or (isinstance(raw, str) and raw.strip().lower() in missing):
+                return None
+            return coerce(raw)
+
+        return decode
+
+    apply = transform.apply
+    dtype = rd.dtype
+    recast = dtype if dtype in (int, float) else None
+
+    def decode_transformed(parsed: ParsedResponse) -> Any:
+        raw = extract(parsed)
+        if raw is None or (isinstance(raw, str) and raw.strip().lower() in missing):
+            return None
+        coerced = coerce(raw)
+        try:
+            out = apply(coerced)
+        except Exception as exc:
+            desc = transform.describe() if hasattr(transform, "describe") else type(transform).__name__
+            raise DecodeError(f"Transform '{desc}' failed for reading '{label}' value={coerced!r}") from exc
+        if recast is not None and out is not None:
+            try:
+                return recast(out)
+            except Exception as exc:
+                raise DecodeError(f"Failed to cast transformed value {out!r} to {dtype} for '{label}'") from exc
+        return out
+
+    return decode_transformed
+
+
+@dataclass(frozen=True)
+class DecodePlan:
+    """
+    Flat, precompiled list of (reading_key, decoder) for a command.
+
+    Build once per CommandDefinition (see CommandDefinition.decode_plan) and reuse:
+        plan.decode(parsed) == decode_all(parsed, readings)
+    """
+    steps: tuple[tuple[str, ReadingDecoder], ...]
+
+    @classmethod
+    def compile(cls, readings: Mapping[str, ReadingDefinition]) -> "DecodePlan":
+        return cls(steps=tuple((key, compile_reading(rd)) for key, rd in readings.items()))
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def decode(self, parsed: ParsedResponse) -> dict[str, Any]:
+        return {key: decoder(parsed) for key, decoder in self.steps}
+
+
 def decode_all(
     parsed: ParsedResponse,
-    readings: Mapping[str, ReadingDefinition],
+    readings: Mapping[str, ReadingDefinition] | DecodePlan,
 ) -> dict[str, Any]:
     """
     Decode all readings for a command. Returns {reading_key: value}.
+
+    Pass the command's DecodePlan (cmd.decode_plan) on hot paths; a readings
+    mapping is decoded reading by reading with decode_reading().
     """
+    if isinstance(readings, DecodePlan):
+        return readings.decode(parsed)
     out: dict[str, Any] = {}
     for key, rd in readings.items():
         out[key] = decode_reading(parsed, rd)
-    return out
\ No newline at end of file
+    return out
+
+
+def decode_response(framing: Any, command: Any, raw: bytes) -> dict[str, Any]:
+    """
+    Decode a raw response frame for command: validate -> verify_crc -> strip ->
+    parse -> the command's DecodePlan. Returns {reading_key: value}.
+    """
+    framing.validate(raw)
+    framing.verify_crc(raw)
+    return command.decode_plan.decode(command.response.parse(framing.strip(raw)))
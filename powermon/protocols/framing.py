@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Protocol, runtime_checkable, Mapping, Any
+from typing import Protocol, runtime_checkable, Mapping, Any, Literal
 
 from powermon.exceptions import InvalidCRC, InvalidResponse
 from powermon.protocols.model import CommandDefinition
@@ -11,7 +11,8 @@ from powermon.ports._types import PortType
 @dataclass(frozen=True)
 class EncodeContext:
     port_type: PortType
-    # optional future fields: address, baud, mtu, etc.
+    address: int | None = None  # the unit's address on a shared (eg RS485) bus
+    # optional future fields: baud, mtu, etc.
 
 
 @runtime_checkable
@@ -37,6 +38,40 @@ class FrameSpec(Protocol):
         """
         ...
 
+    def frame_length(self, buffer: bytes) -> int | None:
+        """
+        Return the length of the complete frame at the start of buffer,
+        or None if more bytes are needed to complete it.
+        """
+        ...
+
+    # optional - for addressed protocols on a shared bus
+    # def response_address(self, frame: bytes) -> int | None:
+    #     """ the address of the unit that sent the frame """
+
+
+@dataclass(frozen=True)
+class LengthField:
+    """
+    Location of the length field in a binary frame header.
+
+    The complete frame length is: value of the field + adjust
+    (adjust accounts for header/CRC/end bytes not counted by the device).
+    """
+    offset: int
+    size: int = 1
+    byteorder: Literal["little", "big"] = "little"
+    adjust: int = 0
+
+    def frame_length(self, buffer: bytes) -> int | None:
+        end = self.offset + self.size
+        if len(buffer) < end:
+            return None
+        length = int.from_bytes(buffer[self.offset:end], self.byteorder) + self.adjust
+        if len(buffer) < length:
+            return None
+        return length
+
 
 @dataclass(frozen=True)
 class ParenCrcAsciiFrameSpec:
@@ -58,9 +93,10 @@ class ParenCrcAsciiFrameSpec:
             raise InvalidResponse("Response is None")
         if len(frame) <= 3:
             raise InvalidResponse("Response is too short")
-        if not frame.startswith(self.start):
+        # slice compare (rather than startswith/endswith) so memoryview frames work too
+        if frame[:len(self.start)] != self.start:
             raise InvalidResponse("Response missing start character '('")
-        if not frame.endswith(self.terminator):
+        if frame[-len(self.terminator):] != self.terminator:
             raise InvalidResponse("Response missing terminator '\\r'")
 
     def verify_crc(self, frame: bytes) -> None:
@@ -78,4 +114,11 @@ class ParenCrcAsciiFrameSpec:
     def strip(self, frame: bytes) -> bytes:
         # return payload excluding '(' and excluding CRC+CR
         # frame: b"(<payload><crc2>\\r"
-        return frame[1:-3]
\ No newline at end of file
+        return frame[1:-3]
+
+    def frame_length(self, buffer: bytes) -> int | None:
+        # frame ends at the first terminator (the CRC bytes are adjusted so they never contain '\\r')
+        end = buffer.find(self.terminator)
+        if end < 0:
+            return None
+        return end + len(self.terminator)
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+Command lookup index.
+
+Built once per ProtocolDefinition (ProtocolDefinition.command_index, warmed by
+the registry) and resolves a command token - from a config, or received ad-hoc
+over mqtt - to the command it runs:
+
+  - exact:      command ids and selectors as defined ("QPIGS", "battery_voltage")
+  - aliases:    the same, case-folded ("qpigs", "Battery_Voltage")
+  - families:   commands with parameters - the command id followed by the
+                parameter values ("PBDV52.0") - matched by a single alternation
+                regex with a named group per command and parameter
+  - parameter selectors: "<selector>=<value>" for a selector that sets a parameter
+                ("redischarge_voltage=52.0")
+
+Commands with parameters (and their selectors) are not in the exact / alias
+tables - they only resolve with their parameter values.
+
+Parameter values are checked with their ParameterSpec. An unknown token raises
+KeyError, a known command with missing or invalid parameter values raises ValueError.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Mapping, Optional
+
+from powermon.protocols.model import CommandDefinition, ParameterSpec, SelectorTarget
+
+# used for a parameter whose pattern cannot be embedded in the family regex (callable, flags, named groups)
+_ANY_VALUE = r".+?"
+
+
+@dataclass(frozen=True)
+class ResolvedCommand:
+    """ a command token resolved to its command, selector and parameter values """
+    command: CommandDefinition
+    selector: Optional[SelectorTarget] = None
+    parameters: Mapping[str, str] = field(default_factory=dict)
+
+    @property
+    def command_id(self) -> str:
+        return self.command.command_id
+
+
+@dataclass(frozen=True)
+class _Family:
+    command: CommandDefinition
+    group: str                          # regex group name of the command id
+    parameters: tuple[tuple[str, str, ParameterSpec], ...]  # (regex group name, parameter name, spec)
+
+
+def _value_pattern(spec: ParameterSpec) -> str:
+    pattern = spec.pattern
+    source = getattr(pattern, "pattern", None)
+    if not isinstance(source, str) or pattern.groupindex or pattern.flags & ~re.UNICODE:
+        return _ANY_VALUE
+    return f"(?:{source})"
+
+
+class CommandIndex:
+    """ exact, case-folded and regex (parameterised family) lookups for one protocol's commands """
+
+    def __repr__(self) -> str:
+        return (f"CommandIndex({self.protocol_id}: exact={len(self._exact)}, aliases={len(self._aliases)}, "
+                f"families={len(self._families)})")
+
+    def __init__(
+        self,
+        protocol_id: str,
+        exact: Mapping[str, ResolvedCommand],
+        aliases: Mapping[str, ResolvedCommand],
+        families: Mapping[str, _Family],
+        parameter_selectors: Mapping[str, tuple[ResolvedCommand, ParameterSpec]],
+        needs_parameters: Optional[Mapping[str, CommandDefinition]] = None,
+    ):
+        self.protocol_id = protocol_id
+        self._exact = dict(exact)
+        self._aliases = dict(aliases)
+        self._families = dict(families)
+        self._parameter_selectors = dict(parameter_selectors)
+        # case-folded ids / selectors of commands that cannot be sent without parameter values
+        self._needs_parameters = dict(needs_parameters or {})
+        # longest command id first, so a family is not shadowed by one whose id is its prefix
+        ordered = sorted(self._families.values(), key=lambda f: len(f.command.command_id), reverse=True)
+        self._pattern: Optional[re.Pattern] = None
+        if ordered:
+            self._pattern = re.compile("|".join(
+                f"(?P<{f.group}>(?i:{re.escape(f.command.command_id)}))"
+                + "".join(f"(?P<{group}>{_value_pattern(spec)})" for group, _, spec in f.parameters)
+                for f in ordered
+            ))
+        self._prefixes = [(f.command.command_id.casefold(), f) for f in ordered]
+
+    @classmethod
+    def compile(
+        cls,
+        commands: Mapping[str, CommandDefinition],
+        selectors: Mapping[str, SelectorTarget],
+        protocol_id: str = "",
+    ) -> "CommandIndex":
+        exact: dict[str, ResolvedCommand] = {}
+        aliases: dict[str, ResolvedCommand] = {}
+        families: dict[str, _Family] = {}
+        parameter_selectors: dict[str, tuple[ResolvedCommand, ParameterSpec]] = {}
+        needs_parameters: dict[str, CommandDefinition] = {}
+
+        for i, (command_id, command) in enumerate(commands.items()):
+            if not command.parameters:
+                resolved = ResolvedCommand(command=command)
+                exact[command_id] = resolved
+                aliases.setdefault(command_id.casefold(), resolved)
+            else:
+                needs_parameters[command_id.casefold()] = command
+                group = f"c{i}"
+                families[group] = _Family(
+                    command=command,
+                    group=group,
+                    parameters=tuple(
+                        (f"{group}_{j}", name, spec) for j, (name, spec) in enumerate(command.parameters.items())
+                    ),
+                )
+
+        for name, selector in selectors.items():
+            try:
+                command = commands[selector.command_id]
+            except KeyError as exc:
+                # Defensive: protocol definition is internally inconsistent
+                raise KeyError(f"Protocol {protocol_id} selector '{name}' targets missing command {selector.command_id}") from exc
+            resolved = ResolvedCommand(command=command, selector=selector)
+            if not command.parameters:
+                exact.setdefault(name, resolved)
+                aliases.setdefault(name.casefold(), resolved)
+            else:
+                needs_parameters.setdefault(name.casefold(), command)
+            if selector.parameter is not None:
+                try:
+                    spec = command.parameters[selector.parameter]
+                except KeyError as exc:
+                    raise KeyError(
+                        f"Protocol {protocol_id} selector '{name}' targets missing parameter "
+                        f"{selector.command_id}.{selector.parameter}"
+                    ) from exc
+                parameter_selectors[name.casefold()] = (resolved, spec)
+
+        return cls(protocol_id, exact, aliases, families, parameter_selectors, needs_parameters)
+
+    def resolve(self, token: str) -> ResolvedCommand:
+        """ the command (selector and parameter values) for token """
+        resolved = self._exact.get(token)
+        if resolved is not None:
+            return resolved
+        token = token.strip()
+        folded = token.casefold()
+        resolved = self._aliases.get(folded)
+        if resolved is not None:
+            return resolved
+
+        if "=" in token:
+            name, _, value = token.partition("=")
+            found = self._parameter_selectors.get(name.strip().casefold())
+            if found is not None:
+                resolved, spec = found
+                value = value.strip()
+                spec.validate(value)
+                return ResolvedCommand(resolved.command, resolved.selector, {resolved.selector.parameter: value})
+
+        command = self._needs_parameters.get(folded)
+        if command is not None:
+            raise ValueError(
+                f"Missing parameters for {command.command_id} "
+                f"(expected {', '.join(spec.description or name for name, spec in command.parameters.items())})"
+            )
+
+        if self._pattern is not None:
+            match = self._pattern.fullmatch(token)
+            if match is not None:
+                # the last group to close is the family's last parameter group: c<i>_<j>
+                family = self._families[match.lastgroup.rpartition("_")[0]]
+                values = {}
+                for group, name, spec in family.parameters:
+                    value = match.group(group)
+                    spec.validate(value)
+                    values[name] = value
+                return ResolvedCommand(command=family.command, parameters=values)
+            for prefix, family in self._prefixes:
+                if folded.startswith(prefix):
+                    raise ValueError(
+                        f"Invalid parameters for {family.command.command_id}: '{token[len(prefix):]}' "
+                        f"(expected {', '.join(spec.description or name for _, name, spec in family.parameters)})"
+                    )
+
+        raise KeyError(f"Unknown command '{token}' for protocol {self.protocol_id}")
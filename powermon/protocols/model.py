@@ -16,6 +16,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from enum import StrEnum
+from functools import cached_property
 from typing import TYPE_CHECKING, Any, Callable, FrozenSet, Mapping, Optional
 
 from powermon.ports import PortType
@@ -23,6 +24,8 @@ from powermon.ports import PortType
 from .types import ProtocolType
 
 if TYPE_CHECKING:
+    from powermon.protocols.decoding import DecodePlan
+    from powermon.protocols.index import CommandIndex, ResolvedCommand
     from powermon.protocols.transforms import Transform
 
 # ============================================================================
@@ -38,6 +41,15 @@ class CommandCategory(StrEnum):
     CONFIG_WRITE = "config_write"
 
 
+class CommandType(StrEnum):
+    """How a port exchanges a command with the device."""
+    DEFAULT                = "default"                 # write request, read one framed response
+    VICTRON_LISTEN         = "victron_listen"          # write nothing, listen to VE.Direct text output
+    SERIAL_READONLY        = "serial_readonly"         # write nothing, read until the line goes quiet
+    SERIAL_READ_UNTIL_DONE = "serial_read_until_done"  # write request, read until the line goes quiet
+    ADVERTISEMENT          = "advertisement"           # write nothing, read the device's next BLE advertisement
+
+
 # ============================================================================
 # Request / response structure
 # ============================================================================
@@ -69,6 +81,9 @@ class RequestSpec:
 class ParsedResponse:
     """
     Result of protocol-level parsing *before* decoding readings.
+
+    raw is the payload as given to the parser - it may be a memoryview into a
+    port's receive buffer, so copy it (bytes(raw)) if it needs to outlive the poll.
     """
     raw: bytes
     fields: list[str]
@@ -180,7 +195,18 @@ class CommandDefinition:
     parameters: Mapping[str, ParameterSpec] = field(default_factory=dict)
 
     category: CommandCategory = CommandCategory.STATUS
+    command_type: CommandType = CommandType.DEFAULT
     side_effects: bool = False      # true for config-write commands
+    timeout: Optional[float] = None  # seconds to wait for the response (None: the port's default)
+
+    @cached_property
+    def decode_plan(self) -> "DecodePlan":
+        """
+        Precompiled decoders for this command's readings (built on first use,
+        the registry warms these when it is built).
+        """
+        from powermon.protocols.decoding import DecodePlan
+        return DecodePlan.compile(self.readings)
 
 
 # ============================================================================
@@ -238,3 +264,20 @@ class ProtocolDefinition:
     selectors: Mapping[str, SelectorTarget]
 
     supported_ports: FrozenSet[PortType] = field(default_factory=frozenset)
+    inter_frame_gap: float = 0.0   # seconds the device needs between back-to-back commands
+
+    @cached_property
+    def command_index(self) -> "CommandIndex":
+        """
+        Lookup index of the commands and selectors (built on first use,
+        the registry warms this when the protocol is registered).
+        """
+        from powermon.protocols.index import CommandIndex
+        return CommandIndex.compile(self.commands, self.selectors, protocol_id=self.protocol_id)
+
+    def resolve(self, token: str) -> "ResolvedCommand":
+        """
+        Resolve a command token (command id, selector or parameterised command,
+        any case) to its command and parameter values.
+        """
+        return self.command_index.resolve(token)
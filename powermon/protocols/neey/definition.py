@@ -1,19 +1,18 @@
 from powermon.ports import PortType
-from powermon.protocols.crc import crc_pi30
-from powermon.protocols.framing import ParenCrcAsciiFrameSpec
 from powermon.protocols.model import ProtocolDefinition
 from powermon.protocols.types import ProtocolType
 
 from .commands import COMMANDS
+from .framing import NeeyFrameSpec
 from .selectors import SELECTORS
 
-FRAMING = ParenCrcAsciiFrameSpec(crc_func=crc_pi30)
+FRAMING = NeeyFrameSpec()
 
 PROTOCOL = ProtocolDefinition(
     protocol_type=ProtocolType.NEEY,
     protocol_id="neey",
     description="NEEY BMS protocol",
-    framing=NeeyEncoder(...),
+    framing=FRAMING,
     commands=COMMANDS,
     selectors=SELECTORS,
     supported_ports=frozenset({PortType.SERIAL}),
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from powermon.exceptions import InvalidCRC, InvalidResponse
+from powermon.protocols.framing import LengthField
+
+
+@dataclass(frozen=True)
+class NeeyFrameSpec:
+    """
+    Framing for NEEY balancer responses:
+      - Frame is: 0x55 0xAA <address> <function> <command (2)> <frame length (2, LE)> <data...> <crc> 0xFF
+      - CRC is the sum of all bytes before it (& 0xFF)
+    """
+
+    start: bytes = b"\x55\xaa"
+    end: int = 0xFF
+    length: LengthField = LengthField(offset=6, size=2, byteorder="little")
+
+    def validate(self, frame: bytes) -> None:
+        if frame is None:
+            raise InvalidResponse("Response is None")
+        if len(frame) <= 9:
+            raise InvalidResponse("Response is too short")
+        if bytes(frame[:2]) != self.start:
+            raise InvalidResponse("Response has incorrect start bytes")
+        if frame[-1] != self.end:
+            raise InvalidResponse("Response has incorrect end byte")
+
+    def verify_crc(self, frame: bytes) -> None:
+        calc_crc = sum(frame[:-2]) & 0xFF
+        if frame[-2] != calc_crc:
+            raise InvalidCRC(f"CRC mismatch: got {frame[-2]:#04x}, expected {calc_crc:#04x}")
+
+    def strip(self, frame: bytes) -> bytes:
+        # return the data bytes only (after the length field, before crc + end)
+        return frame[8:-2]
+
+    def frame_length(self, buffer: bytes) -> int | None:
+        return self.length.frame_length(buffer)
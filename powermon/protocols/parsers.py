@@ -2,11 +2,13 @@
 
 from powermon.protocols.model import ParsedResponse
 
+# parsers accept any bytes-like payload (bytes, bytearray or a memoryview straight from the port's buffer)
+
 def parse_pi30_ascii(data: bytes) -> ParsedResponse:
-    text = data.decode("ascii").strip()
+    text = str(data, "ascii").strip()
     return ParsedResponse(fields=text.split(), raw=data)
 
 
 def parse_pi30_flags(data: bytes) -> ParsedResponse:
-    text = data.decode("ascii").strip()
+    text = str(data, "ascii").strip()
     return ParsedResponse(fields=list(text), raw=data)
\ No newline at end of file
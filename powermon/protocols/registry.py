@@ -16,6 +16,7 @@ from __future__ import annotations
 
 from typing import Iterable, Mapping
 
+from powermon.protocols.index import ResolvedCommand
 from powermon.protocols.model import ProtocolDefinition, SelectorTarget
 from powermon.protocols.types import ProtocolType
 
@@ -32,16 +33,25 @@ class ProtocolRegistry:
         self._by_id: dict[str, ProtocolDefinition] = {}
 
         for proto in protocols:
-            # Register by canonical protocol_type
-            if proto.protocol_type in self._by_type:
-                raise ValueError(f"Duplicate protocol_type: {proto.protocol_type}")
-            self._by_type[proto.protocol_type] = proto
+            self._register(proto)
 
-            # Register by wire/descriptive protocol_id (case-insensitive)
-            proto_id = proto.protocol_id.lower()
-            if proto_id in self._by_id:
-                raise ValueError(f"Duplicate protocol_id: {proto.protocol_id}")
-            self._by_id[proto_id] = proto
+    def _register(self, proto: ProtocolDefinition) -> None:
+        # Register by canonical protocol_type
+        if proto.protocol_type in self._by_type:
+            raise ValueError(f"Duplicate protocol_type: {proto.protocol_type}")
+
+        # Register by wire/descriptive protocol_id (case-insensitive)
+        proto_id = proto.protocol_id.lower()
+        if proto_id in self._by_id:
+            raise ValueError(f"Duplicate protocol_id: {proto.protocol_id}")
+
+        # compile each command's decode plan and the lookup index now, rather than on first use
+        for command in proto.commands.values():
+            command.decode_plan  # noqa: B018 - warms the cached_property
+        proto.command_index  # noqa: B018 - warms the cached_property
+
+        self._by_type[proto.protocol_type] = proto
+        self._by_id[proto_id] = proto
 
     # ------------------------------------------------------------------
     # Protocol lookup
@@ -104,30 +114,39 @@ class ProtocolRegistry:
     # Command resolution helpers
     # ------------------------------------------------------------------
 
+    def resolve(
+        self,
+        protocol_type: ProtocolType,
+        token: str,
+    ) -> ResolvedCommand:
+        """
+        Resolve a command token to its CommandDefinition, selector and
+        parameter values, using the protocol's precompiled CommandIndex.
+
+        Examples:
+          - "QPIGS" / "qpigs"         (command id, any case)
+          - "battery_voltage"         (selector)
+          - "PBDV52.0"                (parameterised command)
+          - "redischarge_voltage=52"  (parameter selector)
+
+        Raises KeyError for an unknown token, ValueError for an invalid parameter value.
+        """
+        return self.get(protocol_type).command_index.resolve(token)
+
     def resolve_command(
         self,
         protocol_type: ProtocolType,
         token: str,
     ):
         """
-        Resolve a selector token to a concrete CommandDefinition
+        Resolve a token to a concrete CommandDefinition
         and optional reading/parameter context.
 
         Returns:
           (command_definition, selector_target)
         """
-        proto = self.get(protocol_type)
-        selector = self.resolve_selector(protocol_type, token)
-
-        try:
-            command = proto.commands[selector.command_id]
-        except KeyError as exc:
-            # Defensive: protocol definition is internally inconsistent
-            raise KeyError(
-                f"Protocol {proto.protocol_id} missing command {selector.command_id}"
-            ) from exc
-
-        return command, selector
+        resolved = self.resolve(protocol_type, token)
+        return resolved.command, resolved.selector
 
     # ------------------------------------------------------------------
     # Introspection helpers (useful for CLI / docs / completion)
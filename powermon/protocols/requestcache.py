@@ -0,0 +1,113 @@
+"""
+Encoded request frames, memoized.
+
+The bytes sent for a command only depend on the command definition, its
+parameter values and the EncodeContext (port type, bus address) - eg PI30's
+QPIGS is always b"QPIGS\\xb7\\xa9\\r" - so they are built (body encoded, CRC
+calculated) once and then served from a bounded LRU cache.
+
+Entries are keyed on (protocol_type, command_id, parameters, context) and
+remember the definition objects they were built from: a changed definition
+(eg a reloaded protocol) misses and is rebuilt, nothing else expires them.
+
+Frames come from the framing's encode_request() if it has one (eg
+DalyFrameSpec), otherwise from RequestSpec.build() with the framing's crc_func.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Mapping, NamedTuple, Optional
+
+from powermon.protocols.framing import EncodeContext
+from powermon.protocols.model import CommandDefinition, ProtocolDefinition
+
+DEFAULT_MAXSIZE = 256
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+def encode_request(
+    proto: ProtocolDefinition,
+    command: CommandDefinition,
+    params: Optional[Mapping[str, Any]],
+    ctx: EncodeContext,
+) -> bytes:
+    """ build the request frame for command (uncached) - raises ValueError if a parameter value is missing or invalid """
+    missing = [name for name in command.parameters if not params or params.get(name) is None]
+    if missing:
+        raise ValueError(f"Missing parameters for {command.command_id}: {', '.join(missing)}")
+    for name, spec in command.parameters.items():
+        spec.validate(str(params[name]))
+    framing = proto.framing
+    encode = getattr(framing, "encode_request", None)
+    if encode is not None:
+        return encode(command, params=params, ctx=ctx)
+    # parameter values follow the command, in the order the command defines them
+    payload = "".join(str(params[name]) for name in command.parameters) if command.parameters else None
+    return command.request.build(crc_func=getattr(framing, "crc_func", None), payload=payload)
+
+
+class RequestFrameCache:
+    """ bounded LRU cache of encoded request frames """
+
+    def __str__(self):
+        return f"RequestFrameCache: {self.cache_info()}"
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._frames: OrderedDict[tuple, tuple[CommandDefinition, object, bytes]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def build(
+        self,
+        proto: ProtocolDefinition,
+        command: CommandDefinition,
+        params: Optional[Mapping[str, Any]] = None,
+        *,
+        ctx: EncodeContext,
+    ) -> bytes:
+        """ the request frame for command - from the cache if it has been built before """
+        key = (proto.protocol_type, command.command_id, tuple(sorted(params.items())) if params else (), ctx)
+        entry = self._frames.get(key)
+        if entry is not None and entry[0] is command and entry[1] is proto.framing:
+            self.hits += 1
+            self._frames.move_to_end(key)
+            return entry[2]
+
+        self.misses += 1
+        frame = encode_request(proto, command, params, ctx)
+        self._frames[key] = (command, proto.framing, frame)
+        self._frames.move_to_end(key)
+        if len(self._frames) > self.maxsize:
+            self._frames.popitem(last=False)
+            self.evictions += 1
+        return frame
+
+    def invalidate(self, proto: Optional[ProtocolDefinition] = None) -> None:
+        """ drop the frames of proto (all frames if None) """
+        if proto is None:
+            self._frames.clear()
+            return
+        for key in [key for key in self._frames if key[0] == proto.protocol_type]:
+            del self._frames[key]
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self._frames), self.maxsize)
+
+
+# shared by all ports
+REQUEST_FRAMES = RequestFrameCache()
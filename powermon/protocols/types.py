@@ -11,5 +11,6 @@ class ProtocolType(StrEnum):
     # HELTEC = auto()
     # VED = auto()
     # JKSERIAL = auto()
+    VICTRON_BLE = auto()
 
     DEFAULT = PI30
@@ -0,0 +1,137 @@
+"""
+Victron BLE "Instant Readout" advertisements.
+
+Victron devices with Instant Readout enabled broadcast their live values in the
+manufacturer data (company id 0x02E1) of their BLE advertisements:
+
+   <prefix 0x10 ..(2)> <model id (2, LE)> <record type (1)> <iv (2, LE)> <key check (1)> <encrypted record...>
+
+The record is AES-128-CTR encrypted with the device's advertisement key
+(VictronConnect: Product info > Instant readout details). The key check byte
+is the first byte of that key.
+
+decrypt() returns the frame the protocol decodes: the 7 byte header followed
+by the decrypted record. Records are little endian bit fields - unpack_bits()
+splits them, returning None for fields holding the 'not available' value.
+
+Decryption needs pycryptodome (installed with the ble extra).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Optional, Sequence
+
+from powermon.exceptions import InvalidResponse
+
+VICTRON_COMPANY_ID = 0x02E1
+PREFIX = 0x10
+HEADER_LENGTH = 7  # prefix (2), model id (2), record type (1), iv (2)
+
+
+class RecordType(IntEnum):
+    """ the record types (device families) Victron advertises """
+    SOLAR_CHARGER = 0x01
+    BATTERY_MONITOR = 0x02
+    INVERTER = 0x03
+    DCDC_CONVERTER = 0x04
+    SMART_LITHIUM = 0x05
+    INVERTER_RS = 0x06
+    AC_CHARGER = 0x08
+    SMART_BATTERY_PROTECT = 0x09
+    LYNX_SMART_BMS = 0x0A
+    MULTI_RS = 0x0B
+    VE_BUS = 0x0C
+    DC_ENERGY_METER = 0x0D
+
+
+@dataclass(frozen=True)
+class AdvertisementHeader:
+    """ the clear text part of an Instant Readout advertisement """
+    model_id: int
+    record_type: int
+    iv: int
+
+    @classmethod
+    def parse(cls, data: bytes) -> "AdvertisementHeader":
+        if len(data) < HEADER_LENGTH:
+            raise InvalidResponse(f"Victron advertisement is too short ({len(data)} bytes)")
+        if data[0] != PREFIX:
+            raise InvalidResponse(f"Victron advertisement has incorrect prefix {data[0]:#04x}")
+        return cls(
+            model_id=int.from_bytes(data[2:4], "little"),
+            record_type=data[4],
+            iv=int.from_bytes(data[5:7], "little"),
+        )
+
+
+def parse_key(key: str | bytes) -> bytes:
+    """ the 16 byte AES key from its hex string form """
+    if isinstance(key, str):
+        try:
+            key = bytes.fromhex(key)
+        except ValueError as exc:
+            raise ValueError("victron_key must be a hex string") from exc
+    if len(key) != 16:
+        raise ValueError(f"victron_key must be 16 bytes (32 hex characters), got {len(key)} bytes")
+    return bytes(key)
+
+
+def decrypt(advertisement: bytes, key: str | bytes) -> bytes:
+    """ header + decrypted record of an Instant Readout advertisement (the manufacturer data, without company id) """
+    key = parse_key(key)
+    header = AdvertisementHeader.parse(advertisement)
+    if len(advertisement) <= HEADER_LENGTH + 1:
+        raise InvalidResponse("Victron advertisement has no record data")
+    if advertisement[HEADER_LENGTH] != key[0]:
+        raise InvalidResponse(
+            f"Victron advertisement key check {advertisement[HEADER_LENGTH]:#04x} does not match the victron_key - wrong key?"
+        )
+    try:
+        from Crypto.Cipher import AES
+        from Crypto.Util import Counter
+    except ImportError as exc:
+        raise ImportError(
+            "Decrypting Victron advertisements needs 'pycryptodome' - install it with: python -m pip install 'powermon[ble]'"
+        ) from exc
+    counter = Counter.new(128, initial_value=header.iv, little_endian=True)
+    cipher = AES.new(key, AES.MODE_CTR, counter=counter)
+    return bytes(advertisement[:HEADER_LENGTH]) + cipher.decrypt(bytes(advertisement[HEADER_LENGTH + 1:]))
+
+
+# (name, bits, signed) - a signed field's 'not available' value is its maximum positive value,
+# an unsigned field's is all ones
+BitField = tuple[str, int, bool]
+
+
+def unpack_bits(record: bytes, fields: Sequence[BitField]) -> dict[str, Optional[int]]:
+    """ split a little endian bit packed record into fields (None if not available) """
+    value = int.from_bytes(record, "little")
+    available = len(record) * 8
+    out: dict[str, Optional[int]] = {}
+    shift = 0
+    for name, bits, signed in fields:
+        if shift + bits > available:
+            raise InvalidResponse(f"Victron record too short for '{name}' ({len(record)} bytes)")
+        raw = (value >> shift) & ((1 << bits) - 1)
+        shift += bits
+        if signed:
+            if raw == (1 << (bits - 1)) - 1:
+                out[name] = None
+            else:
+                out[name] = raw - (1 << bits) if raw & (1 << (bits - 1)) else raw
+        else:
+            out[name] = None if raw == (1 << bits) - 1 else raw
+    return out
+
+
+def record_data(frame: bytes, record_type: RecordType, fields: Sequence[BitField]) -> dict[str, Any]:
+    """ check the frame holds a record_type record and unpack it """
+    header = AdvertisementHeader.parse(frame)
+    if header.record_type != record_type:
+        raise InvalidResponse(
+            f"Victron advertisement is record type {header.record_type:#04x}, expected {record_type.name} ({record_type:#04x})"
+        )
+    data: dict[str, Any] = unpack_bits(frame[HEADER_LENGTH:], fields)
+    data["model_id"] = header.model_id
+    return data
@@ -0,0 +1,230 @@
+""" victron instant readout 'commands' - one per advertised record type (nothing is sent, the port reads the next advertisement) """
+
+from powermon.protocols.model import (
+    CommandCategory,
+    CommandDefinition,
+    CommandType,
+    ParsedResponse,
+    ReadingDefinition,
+    RequestSpec,
+    ResponseSpec,
+)
+from powermon.protocols.transforms import Affine, Lookup, Scale
+
+from .advertisement import RecordType, record_data
+
+ADVERTISEMENT_REQUEST = RequestSpec(command="", terminator=b"", crc=False)
+
+CHARGER_STATES = {
+    0: "Off",
+    1: "Low power",
+    2: "Fault",
+    3: "Bulk",
+    4: "Absorption",
+    5: "Float",
+    6: "Storage",
+    7: "Equalize (manual)",
+    9: "Inverting",
+    11: "Power supply",
+    245: "Starting-up",
+    246: "Repeated absorption",
+    247: "Auto equalize / Recondition",
+    248: "BatterySafe",
+    252: "External control",
+}
+
+AUX_INPUTS = {0: "Starter voltage", 1: "Midpoint voltage", 2: "Temperature", 3: "None"}
+
+SOLAR_CHARGER_FIELDS = (
+    ("device_state", 8, False),
+    ("charger_error", 8, False),
+    ("battery_voltage", 16, True),
+    ("battery_current", 16, True),
+    ("yield_today", 16, False),
+    ("pv_power", 16, False),
+    ("load_current", 9, False),
+)
+
+BATTERY_MONITOR_FIELDS = (
+    ("time_to_go", 16, False),
+    ("battery_voltage", 16, True),
+    ("alarm_reason", 16, False),
+    ("aux_value", 16, False),
+    ("aux_input", 2, False),
+    ("battery_current", 22, True),
+    ("consumed_ah", 20, False),
+    ("state_of_charge", 10, False),
+)
+
+
+def parse_solar_charger(data: bytes) -> ParsedResponse:
+    return ParsedResponse(raw=data, fields=[], data=record_data(data, RecordType.SOLAR_CHARGER, SOLAR_CHARGER_FIELDS))
+
+
+def parse_battery_monitor(data: bytes) -> ParsedResponse:
+    values = record_data(data, RecordType.BATTERY_MONITOR, BATTERY_MONITOR_FIELDS)
+    # the aux value is whatever the aux input is configured to measure
+    aux_input, aux = values.pop("aux_input"), values.pop("aux_value")
+    values["aux_input"] = 3 if aux_input is None else aux_input
+    values["starter_voltage"] = None
+    values["midpoint_voltage"] = None
+    values["temperature"] = None
+    if aux is not None:
+        if aux_input == 0:
+            values["starter_voltage"] = aux - 0x10000 if aux & 0x8000 else aux
+        elif aux_input == 1:
+            values["midpoint_voltage"] = aux
+        elif aux_input == 2:
+            values["temperature"] = aux
+    return ParsedResponse(raw=data, fields=[], data=values)
+
+
+SOLAR_CHARGER = CommandDefinition(
+    command_id="SOLAR_CHARGER",
+    name="Solar Charger Instant Readout",
+    description="Live values advertised by a SmartSolar / BlueSolar MPPT charger",
+    category=CommandCategory.METRIC,
+    command_type=CommandType.ADVERTISEMENT,
+
+    request=ADVERTISEMENT_REQUEST,
+    response=ResponseSpec(parser=parse_solar_charger, crc=False),
+
+    readings={
+        "charger_state": ReadingDefinition(
+            path="device_state",
+            label="Charger State",
+            unit="",
+            dtype=str,
+            transform=Lookup(CHARGER_STATES),
+        ),
+        "charger_error": ReadingDefinition(
+            path="charger_error",
+            label="Charger Error",
+            unit="",
+            dtype=int,
+        ),
+        "battery_voltage": ReadingDefinition(
+            path="battery_voltage",
+            label="Battery Voltage",
+            unit="V",
+            dtype=float,
+            transform=Scale(0.01),
+        ),
+        "battery_current": ReadingDefinition(
+            path="battery_current",
+            label="Battery Current",
+            unit="A",
+            dtype=float,
+            transform=Scale(0.1),
+        ),
+        "yield_today": ReadingDefinition(
+            path="yield_today",
+            label="Yield Today",
+            unit="kWh",
+            dtype=float,
+            transform=Scale(0.01),
+        ),
+        "pv_power": ReadingDefinition(
+            path="pv_power",
+            label="PV Power",
+            unit="W",
+            dtype=int,
+        ),
+        "load_current": ReadingDefinition(
+            path="load_current",
+            label="Load Current",
+            unit="A",
+            dtype=float,
+            transform=Scale(0.1),
+        ),
+    },
+)
+
+
+BATTERY_MONITOR = CommandDefinition(
+    command_id="BATTERY_MONITOR",
+    name="Battery Monitor Instant Readout",
+    description="Live values advertised by a SmartShunt / BMV battery monitor",
+    category=CommandCategory.METRIC,
+    command_type=CommandType.ADVERTISEMENT,
+
+    request=ADVERTISEMENT_REQUEST,
+    response=ResponseSpec(parser=parse_battery_monitor, crc=False),
+
+    readings={
+        "battery_voltage": ReadingDefinition(
+            path="battery_voltage",
+            label="Battery Voltage",
+            unit="V",
+            dtype=float,
+            transform=Scale(0.01),
+        ),
+        "battery_current": ReadingDefinition(
+            path="battery_current",
+            label="Battery Current",
+            unit="A",
+            dtype=float,
+            transform=Scale(0.001),
+        ),
+        "state_of_charge": ReadingDefinition(
+            path="state_of_charge",
+            label="State of Charge",
+            unit="%",
+            dtype=float,
+            transform=Scale(0.1),
+        ),
+        "consumed_ah": ReadingDefinition(
+            path="consumed_ah",
+            label="Consumed Ah",
+            unit="Ah",
+            dtype=float,
+            transform=Scale(-0.1),
+        ),
+        "time_to_go": ReadingDefinition(
+            path="time_to_go",
+            label="Time to Go",
+            unit="min",
+            dtype=int,
+        ),
+        "alarm_reason": ReadingDefinition(
+            path="alarm_reason",
+            label="Alarm Reason",
+            unit="",
+            dtype=int,
+        ),
+        "aux_input": ReadingDefinition(
+            path="aux_input",
+            label="Aux Input",
+            unit="",
+            dtype=str,
+            transform=Lookup(AUX_INPUTS),
+        ),
+        "starter_voltage": ReadingDefinition(
+            path="starter_voltage",
+            label="Starter Battery Voltage",
+            unit="V",
+            dtype=float,
+            transform=Scale(0.01),
+        ),
+        "midpoint_voltage": ReadingDefinition(
+            path="midpoint_voltage",
+            label="Midpoint Voltage",
+            unit="V",
+            dtype=float,
+            transform=Scale(0.01),
+        ),
+        "temperature": ReadingDefinition(
+            path="temperature",
+            label="Battery Temperature",
+            unit="°C",
+            dtype=float,
+            transform=Affine(offset=-27315, factor=0.01),
+        ),
+    },
+)
+
+
+COMMANDS: dict[str, CommandDefinition] = {
+    "SOLAR_CHARGER": SOLAR_CHARGER,
+    "BATTERY_MONITOR": BATTERY_MONITOR,
+}
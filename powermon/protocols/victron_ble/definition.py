@@ -0,0 +1,19 @@
+from powermon.ports import PortType
+from powermon.protocols.model import ProtocolDefinition
+from powermon.protocols.types import ProtocolType
+
+from .commands import COMMANDS
+from .framing import VictronAdvertisementFrameSpec
+from .selectors import SELECTORS
+
+FRAMING = VictronAdvertisementFrameSpec()
+
+PROTOCOL = ProtocolDefinition(
+    protocol_type=ProtocolType.VICTRON_BLE,
+    protocol_id="victron_ble",
+    description="Victron BLE Instant Readout (encrypted advertisements)",
+    framing=FRAMING,
+    commands=COMMANDS,
+    selectors=SELECTORS,
+    supported_ports=frozenset({PortType.BLE}),
+)
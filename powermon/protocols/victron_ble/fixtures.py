@@ -0,0 +1,44 @@
+"""
+Test / simulation fixtures for the Victron Instant Readout protocol.
+
+raw_response is the decrypted frame (what the port returns), ADVERTISEMENTS
+holds the matching manufacturer data as broadcast (encrypted with FIXTURE_KEY).
+
+Do NOT rely on them for protocol truth.
+"""
+
+from powermon.protocols.model import CommandFixture
+
+FIXTURE_KEY = "e2c2d95d2a1bc3b86a4b8d6f0e9c7f31"
+
+SOLAR_CHARGER_FIXTURES = [
+    CommandFixture(
+        description="MPPT in bulk, 13.65V 8.5A, 120W PV, no load output",
+        raw_response=bytes.fromhex("100260a0010503" "0300550555007b007800ff01"),
+        notes="load current is 'not available' (0x1FF) on chargers without a load output",
+    ),
+]
+
+BATTERY_MONITOR_FIXTURES = [
+    CommandFixture(
+        description="SmartShunt discharging, starter battery on aux",
+        raw_response=bytes.fromhex("100289a3022b1a" "d2042d050000e6045cdbff7b00a03600"),
+        notes="13.25V -2.345A 87.4% -12.3Ah, 1234 min to go, starter 12.54V",
+    ),
+    CommandFixture(
+        description="SmartShunt charging, temperature sensor on aux, full",
+        raw_response=bytes.fromhex("100289a3020700" "ffff5a0a000077747217000000803e"),
+        notes="26.50V 1.5A 100%, time to go not available, 25.00°C",
+    ),
+]
+
+# manufacturer data (company 0x02E1) as received, in the same order as the fixtures above
+ADVERTISEMENTS = {
+    "SOLAR_CHARGER": [
+        bytes.fromhex("100260a0010503e2492468c0b26230401b443e1b"),
+    ],
+    "BATTERY_MONITOR": [
+        bytes.fromhex("100289a3022b1ae220aa8c3771b498a850cdc1e098e88eb9"),
+        bytes.fromhex("100289a3020700e2362bffee6d716249cbfc2a10296bfc"),
+    ],
+}
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from powermon.exceptions import InvalidResponse
+
+from .advertisement import HEADER_LENGTH, PREFIX
+
+
+@dataclass(frozen=True)
+class VictronAdvertisementFrameSpec:
+    """
+    Framing for decrypted Victron Instant Readout advertisements:
+      - Frame is: <prefix (2)> <model id (2)> <record type (1)> <iv (2)> <record...>
+      - there is no CRC (a wrong key is caught by the key check when decrypting)
+      - each advertisement is a complete frame
+      - the parsers need the header (record type, model id), so strip returns the whole frame
+    """
+
+    prefix: int = PREFIX
+
+    def validate(self, frame: bytes) -> None:
+        if frame is None:
+            raise InvalidResponse("Response is None")
+        if len(frame) <= HEADER_LENGTH:
+            raise InvalidResponse("Response is too short")
+        if frame[0] != self.prefix:
+            raise InvalidResponse("Response has incorrect prefix")
+
+    def verify_crc(self, frame: bytes) -> None:
+        return None
+
+    def strip(self, frame: bytes) -> bytes:
+        return frame
+
+    def frame_length(self, buffer: bytes) -> int | None:
+        return len(buffer) if len(buffer) > HEADER_LENGTH else None
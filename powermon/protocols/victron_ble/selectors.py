@@ -0,0 +1,15 @@
+"""selectors are aliases to a full command
+    or to a single reading in a multiple response command
+"""
+
+from powermon.protocols.model import SelectorTarget
+
+SELECTORS = {
+    "solar_charger": SelectorTarget("SOLAR_CHARGER"),
+    "mppt": SelectorTarget("SOLAR_CHARGER"),
+    "pv_power": SelectorTarget("SOLAR_CHARGER", reading_key="pv_power"),
+
+    "battery_monitor": SelectorTarget("BATTERY_MONITOR"),
+    "smartshunt": SelectorTarget("BATTERY_MONITOR"),
+    "state_of_charge": SelectorTarget("BATTERY_MONITOR", reading_key="state_of_charge"),
+}
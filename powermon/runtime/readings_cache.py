@@ -0,0 +1,221 @@
+""" powermon / runtime / readings_cache.py
+
+In-process store of recent readings, so tasks and formatters can use the
+current values of other devices without polling them again.
+
+Each (device, reading key) has a ReadingSeries - a fixed capacity ring buffer
+of (timestamp, value) held in array('d') columns, so memory is bounded by
+capacity x series. A series falls back to a list column for its values if a
+non numeric value is recorded. Series that have only ever had int values
+return ints.
+
+Reading keys are normalised the same way as the formatters do by default
+('Battery Voltage' -> 'battery_voltage').
+"""
+import logging
+import math
+import time
+from array import array
+from typing import Any, Iterable, Iterator, Mapping, NamedTuple, Optional
+
+log = logging.getLogger("readings_cache")
+
+DEFAULT_CAPACITY = 256
+
+
+def reading_key(name: str) -> str:
+    """ normalised key for a reading name """
+    return str(name).strip().lower().replace(" ", "_")
+
+
+class Sample(NamedTuple):
+    timestamp: float
+    value: Any
+
+
+class Aggregate(NamedTuple):
+    count: int
+    minimum: float
+    maximum: float
+    mean: float
+    first: Sample
+    last: Sample
+
+
+class ReadingSeries:
+    """ ring buffer of (timestamp, value) samples, oldest first """
+
+    def __str__(self):
+        return f"ReadingSeries: {len(self)}/{self.capacity} samples, {self.unit=}, latest={self.latest()}"
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, unit: Optional[str] = None) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.unit = unit
+        self._times = array("d", bytes(8 * capacity))
+        self._values: array | list = array("d", bytes(8 * capacity))
+        self._next = 0   # slot the next sample is written to
+        self._count = 0
+        self._ints = True  # only int values recorded - return them as int
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def is_numeric(self) -> bool:
+        return isinstance(self._values, array)
+
+    def _slot(self, index: int) -> int:
+        """ slot of the index'th oldest sample """
+        return (self._next - self._count + index) % self.capacity
+
+    def append(self, timestamp: float, value: Any) -> None:
+        """ add a sample (overwrites the oldest once full) """
+        if self.is_numeric and not (isinstance(value, (int, float)) and not isinstance(value, bool)):
+            # switch to a list column - keeps the samples already recorded
+            self._values = list(self._values)
+            self._ints = False
+        elif self._ints and not isinstance(value, int):
+            self._ints = False
+        self._times[self._next] = timestamp
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def _sample(self, slot: int) -> Sample:
+        value = self._values[slot]
+        return Sample(self._times[slot], int(value) if self._ints else value)
+
+    def latest(self) -> Optional[Sample]:
+        if not self._count:
+            return None
+        return self._sample((self._next - 1) % self.capacity)
+
+    def __iter__(self) -> Iterator[Sample]:
+        for index in range(self._count):
+            yield self._sample(self._slot(index))
+
+    def _first_index_at_or_after(self, timestamp: float) -> int:
+        """ binary search on the (time ordered) samples """
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._times[self._slot(mid)] < timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None) -> list[Sample]:
+        """ samples with start <= timestamp <= end """
+        first = 0 if start is None else self._first_index_at_or_after(start)
+        samples = []
+        for index in range(first, self._count):
+            slot = self._slot(index)
+            if end is not None and self._times[slot] > end:
+                break
+            samples.append(self._sample(slot))
+        return samples
+
+    def aggregate(self, start: Optional[float] = None, end: Optional[float] = None) -> Optional[Aggregate]:
+        """ count / min / max / mean of the numeric samples in the range - None if there are none """
+        samples = [s for s in self.range(start, end)
+                   if isinstance(s.value, (int, float)) and not isinstance(s.value, bool) and not math.isnan(s.value)]
+        if not samples:
+            return None
+        values = [s.value for s in samples]
+        return Aggregate(
+            count=len(values),
+            minimum=min(values),
+            maximum=max(values),
+            mean=math.fsum(values) / len(values),
+            first=samples[0],
+            last=samples[-1],
+        )
+
+
+class ReadingsCache:
+    """ readings by device and reading key - ring buffer per reading """
+
+    def __str__(self):
+        return f"ReadingsCache: {len(self._devices)} devices, {len(self)} readings, {self.capacity=}"
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = capacity
+        self._devices: dict[str, dict[str, ReadingSeries]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(readings) for readings in self._devices.values())
+
+    def __contains__(self, device: str) -> bool:
+        return device in self._devices
+
+    def series(self, device: str, key: str) -> Optional[ReadingSeries]:
+        return self._devices.get(device, {}).get(reading_key(key))
+
+    def record(self, device: str, key: str, value: Any, timestamp: Optional[float] = None, unit: Optional[str] = None) -> None:
+        """ add a single reading """
+        timestamp = time.time() if timestamp is None else timestamp
+        readings = self._devices.setdefault(device, {})
+        key = reading_key(key)
+        series = readings.get(key)
+        if series is None:
+            series = readings[key] = ReadingSeries(self.capacity, unit=unit)
+        elif unit is not None:
+            series.unit = unit
+        series.append(timestamp, value)
+
+    def record_many(self, device: str, readings: Mapping[str, Any] | Iterable, timestamp: Optional[float] = None) -> int:
+        """ add the readings from one poll - a {key: value} mapping (as decode_all returns) or Reading objects """
+        timestamp = time.time() if timestamp is None else timestamp
+        count = 0
+        if isinstance(readings, Mapping):
+            for key, value in readings.items():
+                self.record(device, key, value, timestamp)
+                count += 1
+            return count
+        for reading in readings:
+            if not getattr(reading, "is_valid", True):
+                continue
+            self.record(device, reading.data_name, reading.data_value, timestamp, unit=reading.data_unit or None)
+            count += 1
+        return count
+
+    def devices(self) -> list[str]:
+        return list(self._devices)
+
+    def keys(self, device: str) -> list[str]:
+        return list(self._devices.get(device, {}))
+
+    def latest(self, device: str, key: str) -> Optional[Sample]:
+        series = self.series(device, key)
+        return None if series is None else series.latest()
+
+    def value(self, device: str, key: str, default: Any = None, max_age: Optional[float] = None, now: Optional[float] = None) -> Any:
+        """ the latest value of a reading - default if there is none (or it is older than max_age seconds) """
+        sample = self.latest(device, key)
+        if sample is None:
+            return default
+        if max_age is not None and (time.time() if now is None else now) - sample.timestamp > max_age:
+            return default
+        return sample.value
+
+    def snapshot(self, device: str) -> dict[str, Any]:
+        """ {key: latest value} for every reading of a device """
+        return {key: series.latest().value for key, series in self._devices.get(device, {}).items() if len(series)}
+
+    def range(self, device: str, key: str, start: Optional[float] = None, end: Optional[float] = None) -> list[Sample]:
+        series = self.series(device, key)
+        return [] if series is None else series.range(start, end)
+
+    def aggregate(self, device: str, key: str, start: Optional[float] = None, end: Optional[float] = None) -> Optional[Aggregate]:
+        series = self.series(device, key)
+        return None if series is None else series.aggregate(start, end)
+
+    def clear(self, device: Optional[str] = None) -> None:
+        if device is None:
+            self._devices.clear()
+        else:
+            self._devices.pop(device, None)
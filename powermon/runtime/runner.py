@@ -5,20 +5,144 @@ from typing import List, Optional
 
 from powermon.daemons import Daemon
 from powermon.domain import Device
+from powermon.domain.task import Task
 from powermon.mqttbroker import MqttBroker
 
+from .readings_cache import ReadingsCache
+from .scheduler import Scheduler
+
 log = logging.getLogger(__name__)
 
-MIN_SLEEP_SECONDS = 0.2
-MAX_SLEEP_SECONDS = 5.0
+MIN_RESCHEDULE_SECONDS = 0.2  # delay before re-running a task whose next run has already passed (eg it failed before its trigger was updated)
+MAX_SLEEP_SECONDS = 5.0       # dispatcher wakes at least this often to feed the daemon watchdog
 
 
 class RuntimeState:
     def __init__(self) -> None:
         self.running = True
+        self._wakeup = asyncio.Event()
 
     def stop(self) -> None:
         self.running = False
+        self._wakeup.set()
+
+    def wake(self) -> None:
+        """
+        Cut short the current sleep (eg the schedule has changed).
+        """
+        self._wakeup.set()
+
+    async def sleep(self, seconds: float) -> None:
+        """
+        Sleep for up to `seconds`, returning early if stop() or wake() is called.
+        """
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+        if self.running:
+            self._wakeup.clear()
+
+
+async def run_device(
+    device: Device,
+    queue: "asyncio.Queue[Task]",
+    state: RuntimeState,
+    scheduler: Optional[Scheduler] = None,
+) -> None:
+    """
+    Worker for a single device.
+
+    - Each device runs as its own asyncio task, taking due tasks from its queue
+    - A slow device only delays its own tasks
+    - Tasks already queued together are run as a batch (device.run_tasks)
+    - Errors are logged and isolated to the device that raised them
+    - Once run, a task is handed back to the scheduler (if any) for its next run
+    """
+    while True:
+        tasks = [await queue.get()]
+        # tasks that fell due together are run as one batch (one port session)
+        while not queue.empty():
+            tasks.append(queue.get_nowait())
+        try:
+            if len(tasks) == 1:
+                await device.run_task(tasks[0])
+            else:
+                await device.run_tasks(tasks)
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # pylint: disable=W0718
+            log.exception("Error running task(s): %s for device: %s", ", ".join(str(task) for task in tasks), device.name)
+        finally:
+            for _ in tasks:
+                queue.task_done()
+
+        if scheduler is not None:
+            now = time.time()
+            rescheduled = False
+            for task in tasks:
+                next_run = getattr(task.trigger, "next_run", None)
+                if next_run is not None and next_run <= now:
+                    next_run = now + MIN_RESCHEDULE_SECONDS
+                rescheduled |= scheduler.schedule(next_run, device, task)
+            if rescheduled:
+                state.wake()
+
+
+async def run_devices(
+    devices: List[Device],
+    state: RuntimeState,
+    daemon: Daemon,
+    *,
+    once: bool = False,
+    force_tasks: bool = False,
+) -> None:
+    """
+    Run every device concurrently and keep the daemon watchdog fed
+    until the runtime is stopped (or, with once, until the due tasks have run).
+
+    A single Scheduler holds every task of every device ordered by next due time;
+    due tasks are handed to the owning device's worker queue.
+    """
+    if not devices:
+        return
+
+    scheduler = Scheduler()
+    now = time.time()
+    for device in devices:
+        for task in device.tasks:
+            scheduler.schedule(now if force_tasks else getattr(task.trigger, "next_run", None), device, task)
+    log.info("Scheduled %i tasks across %i devices", len(scheduler), len(devices))
+
+    queues = {device.name: asyncio.Queue() for device in devices}
+    device_tasks = [
+        asyncio.create_task(
+            run_device(device, queues[device.name], state, scheduler=None if once else scheduler),
+            name=f"device:{device.name}",
+        )
+        for device in devices
+    ]
+
+    try:
+        while state.running:
+            daemon.watchdog()
+            for device, task in scheduler.pop_due(time.time()):
+                queues[device.name].put_nowait(task)
+
+            if once:
+                await asyncio.gather(*(queue.join() for queue in queues.values()))
+                break
+
+            next_due = scheduler.next_due()
+            if next_due is None:
+                sleep_for = MAX_SLEEP_SECONDS
+            else:
+                sleep_for = max(0.0, min(MAX_SLEEP_SECONDS, next_due - time.time()))
+            await state.sleep(sleep_for)
+    finally:
+        for task in device_tasks:
+            task.cancel()
+        await asyncio.gather(*device_tasks, return_exceptions=True)
 
 
 async def run_worker(
@@ -32,7 +156,7 @@ async def run_worker(
 
     - Runs continuously by default
     - Scheduling is entirely action-based
-    - No global loop or cadence
+    - Tasks are run when due (no global loop or cadence), each device in its own worker
     """
 
     state = RuntimeState()
@@ -43,6 +167,7 @@ async def run_worker(
     devices: List[Device] = await Device.from_configs(
         config.devices,
         mqtt_broker=mqtt_broker,
+        readings_cache=ReadingsCache(),
     )
 
     daemon.initialize()
@@ -50,42 +175,25 @@ async def run_worker(
         await device.initialize()
 
     try:
-        while state.running:
-            daemon.watchdog()
-            now = time.time()
-
-            # Run due actions
-            for device in devices:
-                await device.run_due_tasks(
-                    now=now,
-                    force=force_tasks,
-                )
-
-            if once:
-                break
-
-            # Determine next due task time
-            next_due: Optional[float] = None
-            for device in devices:
-                ts = device.next_due_timestamp(now=now)
-                if ts is not None:
-                    next_due = ts if next_due is None else min(next_due, ts)
-
-            if next_due is None:
-                sleep_for = MAX_SLEEP_SECONDS
-            else:
-                sleep_for = max(
-                    MIN_SLEEP_SECONDS,
-                    min(MAX_SLEEP_SECONDS, next_due - now),
-                )
-
-            await asyncio.sleep(sleep_for)
+        mqtt_broker.start_publisher()
+        await run_devices(
+            devices,
+            state,
+            daemon,
+            once=once,
+            force_tasks=force_tasks,
+        )
 
     finally:
         log.info("Shutting down runtime")
+        state.stop()
 
         for device in devices:
             await device.finalize()
+        # forget the shared RS485 buses, a later run builds its own (with locks on its own loop)
+        from powermon.ports.rs485port import SharedBus
+        SharedBus.close_all()
 
+        await mqtt_broker.stop_publisher()
         mqtt_broker.stop()
-        daemon.stop()
\ No newline at end of file
+        daemon.stop()
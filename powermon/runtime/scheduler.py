@@ -0,0 +1,52 @@
+""" powermon / runtime / scheduler.py
+
+Priority queue of every task across all devices, keyed on when it is next due.
+"""
+import heapq
+import itertools
+import logging
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+log = logging.getLogger("Scheduler")
+
+
+class ScheduledTask(NamedTuple):
+    """ heap entry - ordered by due time, then insertion order (the task objects themselves are never compared) """
+    due: float
+    seq: int
+    device: Any
+    task: Any
+
+
+class Scheduler:
+    """ min-heap scheduler - O(log n) schedule() and pop, O(1) next_due() """
+
+    def __str__(self):
+        return f"Scheduler: {len(self._heap)} tasks, next_due={self.next_due()}"
+
+    def __init__(self) -> None:
+        self._heap: List[ScheduledTask] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, due: Optional[float], device, task) -> bool:
+        """ add a task to be run at `due` (secs since epoch), a due of None means never (eg a disabled trigger) """
+        if due is None:
+            log.debug("not scheduling task: %s (no next run)", task)
+            return False
+        heapq.heappush(self._heap, ScheduledTask(due, next(self._seq), device, task))
+        return True
+
+    def next_due(self) -> Optional[float]:
+        """ the time the earliest task is due, or None if nothing is scheduled """
+        return self._heap[0].due if self._heap else None
+
+    def pop_due(self, now: float) -> List[Tuple[Any, Any]]:
+        """ remove and return (device, task) for every task due at or before now, earliest first """
+        due = []
+        while self._heap and self._heap[0].due <= now:
+            entry = heapq.heappop(self._heap)
+            due.append((entry.device, entry.task))
+        return due
@@ -0,0 +1,34 @@
+"""
+CRC micro-benchmarks (pytest-benchmark) - the legacy nibble loop against the current implementation.
+
+    pytest tests/benchmarks/test_crc_benchmarks.py --benchmark-enable
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from powermon.protocols.crc import crc_pi30, verify_pi30_frames  # noqa: E402
+from powermon.protocols.pi30.fixtures import FIXTURES  # noqa: E402
+from tests.protocols.test_crc import _legacy_crc_pi30  # noqa: E402
+
+FRAMES = [fx.raw_response for fixtures in FIXTURES.values() for fx in fixtures]
+PAYLOADS = [frame[:-3] for frame in FRAMES]
+
+
+def _all(func):
+    return [func(payload) for payload in PAYLOADS]
+
+
+@pytest.mark.parametrize(
+    "func",
+    [_legacy_crc_pi30, crc_pi30],
+    ids=["legacy", "crc_hqx"],
+)
+def test_crc_pi30_fixtures(benchmark, func):
+    benchmark.group = "crc_pi30"
+    assert benchmark(_all, func) == _all(_legacy_crc_pi30)
+
+
+def test_verify_pi30_frames_batch(benchmark):
+    benchmark.group = "crc_pi30"
+    assert all(benchmark(verify_pi30_frames, FRAMES))
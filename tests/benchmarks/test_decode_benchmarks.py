@@ -0,0 +1,59 @@
+"""
+Decode hot path benchmarks (pytest-benchmark).
+
+In the normal test run each benchmark runs once (see tests/conftest.py), to time them:
+
+    pytest tests/benchmarks --benchmark-enable --benchmark-autosave
+    pytest tests/benchmarks --benchmark-enable --benchmark-compare --benchmark-compare-fail=mean:25%
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from powermon.cli.bench import load_fixtures, stage_calls  # noqa: E402
+from powermon.protocols.decoding import decode_all  # noqa: E402
+from powermon.protocols.pi30.definition import PROTOCOL  # noqa: E402
+
+
+# fixtures that are known not to decode - anything else that fails to decode fails the collection
+SKIPPED = {
+    ("QPIGS", 3): "extended response variant - more fields than QPIGS defines",
+}
+
+
+def _cases():
+    for command_id, fixtures in load_fixtures(PROTOCOL).items():
+        cmd = PROTOCOL.commands[command_id]
+        for index, fixture in enumerate(fixtures, start=1):
+            reason = SKIPPED.get((command_id, index))
+            if reason is None:
+                stage_calls(PROTOCOL.framing, cmd, fixture.raw_response)  # a decoder regression raises here
+                marks = ()
+            else:
+                marks = pytest.mark.skip(reason=reason)
+            yield pytest.param(cmd, fixture.raw_response, id=f"{command_id}#{index}", marks=marks)
+
+
+CASES = list(_cases())
+
+
+@pytest.mark.parametrize("cmd, raw", CASES)
+def test_decode_pipeline(benchmark, cmd, raw):
+    framing = PROTOCOL.framing
+
+    def _pipeline():
+        framing.validate(raw)
+        framing.verify_crc(raw)
+        parsed = cmd.response.parse(framing.strip(raw))
+        return decode_all(parsed, cmd.decode_plan)
+
+    benchmark.group = "pipeline"
+    assert benchmark(_pipeline)
+
+
+@pytest.mark.parametrize("stage", ["validate", "verify_crc", "strip", "parse", "decode_all"])
+@pytest.mark.parametrize("cmd, raw", CASES)
+def test_decode_stage(benchmark, cmd, raw, stage):
+    func = dict(stage_calls(PROTOCOL.framing, cmd, raw))[stage]
+    benchmark.group = stage
+    benchmark(func)
@@ -0,0 +1,80 @@
+"""
+Result storage benchmarks (pytest-benchmark): a Reading object per value vs the
+ReadingArray a Result keeps, for a NEEY style 24 cell voltage + resistance response.
+
+In the normal test run each benchmark runs once (see tests/conftest.py), to time them:
+
+    pytest tests/benchmarks/test_result_benchmarks.py --benchmark-enable --benchmark-group-by=group
+"""
+import tracemalloc
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from powermon.commands.command_definition import CommandDefinition  # noqa: E402
+from powermon.commands.reading_definition import ReadingDefinition, ReadingType, ResponseType  # noqa: E402
+from powermon.commands.result import Result, ResultType  # noqa: E402
+
+
+def _command():
+    definitions = {}
+    for cell in range(1, 25):
+        for name, reading_type in (("voltage", ReadingType.VOLTS), ("resistance", ReadingType.RESISTANCE)):
+            key = f"cell_{cell:02d}_{name}"
+            definitions[key] = ReadingDefinition.from_config({"description": key, "reading_type": reading_type, "response_type": ResponseType.FLOAT}, key)
+    command_definition = CommandDefinition(code="CELLINFO", description="cell info", help_text="", result_type=ResultType.CONSTRUCT, reading_definitions=definitions)
+    return SimpleNamespace(command_definition=command_definition, override=None, code="CELLINFO")
+
+
+COMMAND = _command()
+RESPONSES = [(key, 3.3 + index / 1000) for index, key in enumerate(COMMAND.command_definition.reading_definitions)]
+
+
+def _reading_objects():
+    """ the previous representation - a list of Reading objects """
+    readings = []
+    for key, value in RESPONSES:
+        readings.extend(COMMAND.command_definition.get_reading_definition(lookup=key).reading_from_raw_response(value, override=None))
+    return readings
+
+
+def _reading_array():
+    return Result(command=COMMAND, raw_response=b"raw", responses=RESPONSES).readings
+
+
+def _format(readings):
+    return [f"{reading.data_name}={reading.data_value}{reading.data_unit}" for reading in readings]
+
+
+REPRESENTATIONS = {"objects": _reading_objects, "array": _reading_array}
+
+
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+def test_result_decode(benchmark, representation):
+    benchmark.group = "decode"
+    assert len(benchmark(REPRESENTATIONS[representation])) == 48
+
+
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+def test_result_format(benchmark, representation):
+    readings = REPRESENTATIONS[representation]()
+    benchmark.group = "format"
+    assert benchmark(_format, readings) == _format(_reading_objects())
+
+
+def _retained(build) -> int:
+    """ bytes kept alive by the readings build returns """
+    build()  # interning / caches warmed outside the measurement
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        readings = build()  # noqa: F841 - kept alive while measured
+        return tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def test_result_retained_memory():
+    assert _retained(_reading_array) < _retained(_reading_objects)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 
 
@@ -35,18 +36,26 @@ class FakeBLEDevice:
 
 class FakeBleakClient:
     """
-    Async context manager that mimics enough of BleakClient for ble_scan(get_chars=True).
+    Async context manager that mimics enough of BleakClient for ble_scan(get_chars=True)
+    and for BlePort (connect, notifications and writes).
 
     Exposes:
       - is_connected
       - services (iterable)
       - read_gatt_char
       - read_gatt_descriptor
+      - connect / disconnect
+      - start_notify / write_gatt_char - each write is answered with the next entry of replies,
+        a list of chunks sent as separate notifications
     """
 
-    def __init__(self, device):
+    def __init__(self, device, disconnected_callback=None):
         self.device = device
+        self.disconnected_callback = disconnected_callback
         self.is_connected = False
+        self.notify_callbacks = {}
+        self.written = []
+        self.replies = []
 
         self.services = [
             FakeService(
@@ -72,6 +81,26 @@ class FakeBleakClient:
     async def __aexit__(self, exc_type, exc, tb):
         self.is_connected = False
 
+    async def connect(self):
+        self.is_connected = True
+
+    async def disconnect(self):
+        self.is_connected = False
+
+    async def start_notify(self, handle: int, callback):
+        self.notify_callbacks[handle] = callback
+
+    async def write_gatt_char(self, handle: int, data):
+        self.written.append((handle, bytes(data)))
+        if self.replies:
+            asyncio.get_running_loop().create_task(self._notify(self.replies.pop(0)))
+
+    async def _notify(self, chunks):
+        for chunk in chunks:
+            await asyncio.sleep(0.01)
+            for handle, callback in self.notify_callbacks.items():
+                callback(handle, bytearray(chunk))
+
     async def read_gatt_char(self, char):
         # Return a stable byte payload
         return b"test-value"
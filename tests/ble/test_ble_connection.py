@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import asyncio
+
+from powermon.ports.bleconnection import Backoff, BleConnectionManager, BleDeviceLocator
+from powermon.ports.blescanner import BleScanner
+from tests.ble.fakes import FakeBLEDevice
+
+
+class FakeScanner:
+    """ mimics BleakScanner(detection_callback=...) - 'advertises' its devices repeatedly while started """
+    instances = []
+
+    def __init__(self, detection_callback, passive=True, devices=(), delay=0.01):
+        self.detection_callback = detection_callback
+        self.passive = passive
+        self.devices = list(devices)
+        self.delay = delay
+        self.task = None
+        self.stopped = False
+        FakeScanner.instances.append(self)
+
+    async def _advertise(self):
+        while True:
+            for device in self.devices:
+                await asyncio.sleep(self.delay)
+                self.detection_callback(device, None)
+            await asyncio.sleep(self.delay)
+
+    async def start(self):
+        self.task = asyncio.create_task(self._advertise())
+
+    async def stop(self):
+        self.stopped = True
+        self.task.cancel()
+
+
+class FakeClient:
+    fail = False
+    instances = []
+
+    def __init__(self, device, disconnected_callback):
+        self.device = device
+        self.disconnected_callback = disconnected_callback
+        self.is_connected = False
+        self.disconnects = 0
+        FakeClient.instances.append(self)
+
+    async def connect(self):
+        if FakeClient.fail:
+            raise OSError("connection refused")
+        self.is_connected = True
+
+    async def disconnect(self):
+        self.disconnects += 1
+        self.is_connected = False
+
+    def drop(self):
+        self.is_connected = False
+        self.disconnected_callback(self)
+
+
+DEVICES = [FakeBLEDevice(name="JK", address="aa:aa:aa:aa:aa:aa"), FakeBLEDevice(name="Daly", address="BB:BB:BB:BB:BB:BB")]
+
+
+def _manager(devices=DEVICES, **kwargs):
+    FakeScanner.instances = []
+    FakeClient.fail = False
+    FakeClient.instances = []
+    manager = BleConnectionManager(scanner_factory=lambda cb, passive: FakeScanner(cb, passive, devices), client_factory=FakeClient, **kwargs)
+    manager.locator.scan_timeout = 0.5
+    return manager
+
+
+def test_backoff_grows_with_jitter_and_resets():
+    backoff = Backoff(initial=1, maximum=10, factor=2, jitter=0.25)
+    delays = [backoff.next_delay() for _ in range(6)]
+    for delay, base in zip(delays, (1, 2, 4, 8, 10, 10)):
+        assert base * 0.75 <= delay <= base * 1.25
+    backoff.reset()
+    assert backoff.next_delay() <= 1.25
+
+
+def test_one_scan_finds_all_devices():
+    manager = _manager()
+
+    async def _go():
+        connections = [manager.connection(d.address) for d in DEVICES]
+        clients = await asyncio.gather(*(c.connect() for c in connections))
+        return connections, clients
+
+    connections, clients = asyncio.run(_go())
+    assert all(client.is_connected for client in clients)
+    assert manager.locator.scans == 1
+    # the scan keeps running (for the next lookup / advertisement readers) until closed
+    assert len(FakeScanner.instances) == 1 and not FakeScanner.instances[0].stopped
+    assert manager.connection("AA:AA:AA:AA:AA:AA") is connections[0]
+
+
+def test_link_kept_open_and_handle_cached():
+    manager = _manager()
+    calls = []
+
+    async def _on_connect(client):
+        calls.append(client)
+
+    async def _go():
+        connection = manager.connection("AA:AA:AA:AA:AA:AA")
+        first = await connection.connect(_on_connect)
+        again = await connection.connect(_on_connect)
+        assert again is first
+        first.drop()
+        assert not connection.is_connected
+        second = await connection.connect(_on_connect)
+        assert second is not first and second.is_connected
+        await connection.close()
+        assert second.disconnects == 1 and not connection.is_connected
+        return connection
+
+    connection = asyncio.run(_go())
+    assert len(calls) == 2 and connection.connects == 2
+    # reconnect reused the cached BLEDevice - no second scan
+    assert manager.locator.scans == 1
+
+
+def test_every_user_of_a_shared_link_is_set_up():
+    manager = _manager()
+    calls = []
+
+    async def _first(client):
+        calls.append(("first", client))
+
+    async def _second(client):
+        calls.append(("second", client))
+
+    async def _go():
+        connection = manager.connection("AA:AA:AA:AA:AA:AA")
+        client = await connection.connect(_first)
+        # the link is already up - the new caller is still set up on it, the first is not run again
+        assert await manager.connection("aa:aa:aa:aa:aa:aa").connect(_second) is client
+        assert calls == [("first", client), ("second", client)]
+        client.drop()
+        connection.start_keepalive(0.02)
+        await asyncio.sleep(0.1)
+        reconnected = connection.client
+        assert reconnected is not client and reconnected.is_connected
+        await manager.close_all()
+        return reconnected
+
+    reconnected = asyncio.run(_go())
+    # both re-run on the reconnected client
+    assert calls[2:] == [("first", reconnected), ("second", reconnected)]
+
+
+def test_failed_connect_backs_off():
+    manager = _manager(backoff_initial=0.2)
+
+    async def _go():
+        connection = manager.connection("BB:BB:BB:BB:BB:BB")
+        FakeClient.fail = True
+        assert await connection.connect() is None
+        assert "connection refused" in connection.error_message
+        FakeClient.fail = False
+        # still backing off - does not try
+        assert await connection.connect() is None
+        assert "waiting" in connection.error_message
+        await asyncio.sleep(0.3)
+        assert (await connection.connect()).is_connected
+        assert connection.backoff.attempts == 0
+
+    asyncio.run(_go())
+    # the handle was forgotten after the failure and found again from the running scan
+    assert manager.locator.scans == 1
+
+
+def test_failed_connect_releases_client():
+    manager = _manager(backoff_initial=0.01)
+
+    async def _failing_on_connect(client):
+        raise OSError("notify failed")
+
+    async def _go():
+        connection = manager.connection("BB:BB:BB:BB:BB:BB")
+        # connected, but setting it up failed
+        assert await connection.connect(_failing_on_connect) is None
+        await asyncio.sleep(0.02)
+        FakeClient.fail = True
+        assert await connection.connect() is None
+        return connection
+
+    connection = asyncio.run(_go())
+    assert connection.client is None
+    assert [(client.disconnects, client.is_connected) for client in FakeClient.instances] == [(1, False), (1, False)]
+
+
+def test_device_not_found():
+    manager = _manager(devices=[])
+    manager.locator.scan_timeout = 0.05
+
+    async def _go():
+        connection = manager.connection("CC:CC:CC:CC:CC:CC")
+        assert await connection.connect() is None
+        return connection
+
+    connection = asyncio.run(_go())
+    assert "was not found" in connection.error_message
+
+
+def test_keepalive_reconnects_dropped_link():
+    manager = _manager()
+
+    async def _go():
+        connection = manager.connection("AA:AA:AA:AA:AA:AA")
+        client = await connection.connect()
+        connection.start_keepalive(0.02)
+        client.drop()
+        await asyncio.sleep(0.1)
+        assert connection.is_connected and connection.client is not client
+        await manager.close_all()
+
+    asyncio.run(_go())
+    assert FakeScanner.instances[0].stopped
+
+
+def test_locator_cache_expires():
+    locator = BleDeviceLocator(scanner=BleScanner(), max_age=0)
+    locator.seen(DEVICES[0])
+    assert locator.cached("AA:AA:AA:AA:AA:AA") is None
+    locator.max_age = 60
+    assert locator.cached("aa:aa:aa:aa:aa:aa") is DEVICES[0]
+    locator.forget("AA:AA:AA:AA:AA:AA")
+    assert locator.cached("AA:AA:AA:AA:AA:AA") is None
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import pytest
+
+from powermon.exceptions import BLEResponseError
+from powermon.ports import PortType
+from powermon.ports.bleconnection import BleConnectionManager
+from powermon.protocols.daly.framing import DalyFrameSpec
+from powermon.protocols.neey.framing import NeeyFrameSpec
+from tests.ble.fakes import FakeBLEDevice, FakeBleakClient
+from tests.ble.test_ble_scan import import_bleport
+
+MAC = "AA:BB:CC:DD:EE:FF"
+
+
+@dataclass(frozen=True)
+class _Protocol:
+    """ a frozen protocol (like ProtocolDefinition) with BLE handles """
+    framing: object
+    protocol_id: str = "test"
+    supported_ports: frozenset = frozenset({PortType.BLE})
+    notifier_handle: int = 9
+    intializing_handle: int = 0
+    command_handle: int = 15
+
+
+def _neey_frame() -> bytes:
+    frame = b"\x55\xaa\x11\x01\x02\x00" + (20).to_bytes(2, "little") + bytes(range(10))
+    return frame + bytes([sum(frame) & 0xFF]) + b"\xff"
+
+
+def _daly_frame() -> bytes:
+    frame = b"\xa5\x01\x90\x08" + bytes([0x02, 0x14, 0, 0, 0x75, 0x30, 0x02, 0x71])
+    return frame + bytes([sum(frame) & 0xFF])
+
+
+def _action(full_command=b"\x01\x02"):
+    return SimpleNamespace(full_command=full_command, command_definition=SimpleNamespace(timeout=1.0))
+
+
+def _port(monkeypatch, framing):
+    bleport = import_bleport(monkeypatch)
+    clients = []
+
+    def _client_factory(device, disconnected_callback):
+        clients.append(FakeBleakClient(device, disconnected_callback))
+        return clients[-1]
+
+    port = bleport.BlePort(mac=MAC, protocol=_Protocol(framing=framing), keepalive=None)
+    manager = BleConnectionManager(scanner_factory=lambda callback, passive: None, client_factory=_client_factory)
+    manager.locator.seen(FakeBLEDevice(name="BMS", address=MAC))
+    port.connection = manager.connection(MAC)
+    return port, clients
+
+
+@pytest.mark.parametrize("framing, frame", [(NeeyFrameSpec(), _neey_frame()), (DalyFrameSpec(), _daly_frame())], ids=["neey", "daly"])
+def test_response_assembled_from_notifications(monkeypatch, framing, frame):
+    port, clients = _port(monkeypatch, framing)
+
+    async def _go():
+        assert await port.connect()
+        client = clients[0]
+        assert set(client.notify_callbacks) == {9}
+        # the frame arrives in several notifications - followed by the start of the next one
+        client.replies.append([frame[:5], frame[5:11], frame[11:], b"\x55"])
+        response = await port.get_response(_action())
+        assert client.written == [(15, b"\x01\x02")]
+        return bytes(response)
+
+    assert asyncio.run(_go()) == frame
+
+
+def test_incomplete_response_times_out(monkeypatch):
+    port, clients = _port(monkeypatch, NeeyFrameSpec())
+
+    async def _go():
+        assert await port.connect()
+        clients[0].replies.append([_neey_frame()[:12]])
+        action = _action()
+        action.command_definition.timeout = 0.2
+        await port.get_response(action)
+
+    with pytest.raises(BLEResponseError, match="got 12 bytes"):
+        asyncio.run(_go())
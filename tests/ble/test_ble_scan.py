@@ -92,7 +92,7 @@ async def fake_discover_two(*, timeout=5.0, return_adv=False):
 def test_ble_scan_basic_list(monkeypatch, capsys):
     bleport = import_bleport(monkeypatch)
 
-    monkeypatch.setattr(bleport.BleakScanner, "discover", fake_discover_list)
+    monkeypatch.setattr(sys.modules["bleak"].BleakScanner, "discover", fake_discover_list)
 
     bleport.ble_scan(timeout=0.01)
 
@@ -104,7 +104,7 @@ def test_ble_scan_basic_list(monkeypatch, capsys):
 def test_ble_scan_adv_data_dict(monkeypatch, capsys):
     bleport = import_bleport(monkeypatch)
 
-    monkeypatch.setattr(bleport.BleakScanner, "discover", fake_discover_dict)
+    monkeypatch.setattr(sys.modules["bleak"].BleakScanner, "discover", fake_discover_dict)
 
     bleport.ble_scan(timeout=0.01, adv_data=True, details=True)
 
@@ -117,7 +117,7 @@ def test_ble_scan_adv_data_dict(monkeypatch, capsys):
 def test_ble_scan_address_filter(monkeypatch, capsys):
     bleport = import_bleport(monkeypatch)
 
-    monkeypatch.setattr(bleport.BleakScanner, "discover", fake_discover_two)
+    monkeypatch.setattr(sys.modules["bleak"].BleakScanner, "discover", fake_discover_two)
 
     bleport.ble_scan(timeout=0.01, address="BB:BB:BB:BB:BB:BB")
 
@@ -131,7 +131,7 @@ def test_ble_scan_address_filter(monkeypatch, capsys):
 def test_ble_scan_with_characteristics_reads_descriptors(monkeypatch, capsys):
     bleport = import_bleport(monkeypatch)
 
-    monkeypatch.setattr(bleport.BleakScanner, "discover", fake_discover_list)
+    monkeypatch.setattr(sys.modules["bleak"].BleakScanner, "discover", fake_discover_list)
     monkeypatch.setattr(bleport, "BleakClient", FakeBleakClient)
 
     bleport.ble_scan(timeout=0.01, get_chars=True, details=True)
@@ -148,7 +148,7 @@ def test_ble_scan_with_characteristics_reads_descriptors(monkeypatch, capsys):
 def test_ble_scan_descriptor_read_failure(monkeypatch, capsys):
     bleport = import_bleport(monkeypatch)
 
-    monkeypatch.setattr(bleport.BleakScanner, "discover", fake_discover_list)
+    monkeypatch.setattr(sys.modules["bleak"].BleakScanner, "discover", fake_discover_list)
     monkeypatch.setattr(bleport, "BleakClient", FakeFailingBleakClient)
 
     bleport.ble_scan(timeout=0.01, get_chars=True)
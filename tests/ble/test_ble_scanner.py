@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import types
+
+from powermon.ports.blescanner import BleScanner
+from tests.ble.fakes import FakeBLEDevice
+
+VICTRON = FakeBLEDevice(name="SmartShunt", address="cc:cc:cc:cc:cc:cc")
+JK = FakeBLEDevice(name="JK", address="AA:AA:AA:AA:AA:AA")
+
+
+def _adv(payload: bytes = b"", rssi: int = -70):
+    return types.SimpleNamespace(manufacturer_data={0x02E1: payload} if payload else {}, rssi=rssi)
+
+
+class FakeScanner:
+    """ mimics BleakScanner(detection_callback=..., scanning_mode=...) """
+
+    def __init__(self, detection_callback, passive, fail_passive=False):
+        self.detection_callback = detection_callback
+        self.passive = passive
+        self.fail_passive = fail_passive
+        self.started = False
+
+    async def start(self):
+        if self.passive and self.fail_passive:
+            raise OSError("passive scanning not supported")
+        self.started = True
+
+    async def stop(self):
+        self.started = False
+
+
+def _scanner(**kwargs):
+    created = []
+
+    def _factory(callback, passive):
+        created.append(FakeScanner(callback, passive, **kwargs))
+        return created[-1]
+
+    return BleScanner(scanner_factory=_factory), created
+
+
+def test_passive_scan_falls_back_to_active():
+    scanner, created = _scanner(fail_passive=True)
+    asyncio.run(scanner.start())
+    assert scanner.running and not scanner.passive
+    assert [s.passive for s in created] == [True, False] and created[-1].started
+    asyncio.run(scanner.start())
+    assert scanner.scans == 1
+
+
+def test_index_and_advertisement_payload():
+    scanner, _ = _scanner()
+    scanner.seen(VICTRON, _adv(b"\x10\x02\xa3"))
+    advertisement = scanner.advertisement("CC:CC:CC:CC:CC:CC")
+    assert advertisement.device is VICTRON and advertisement.rssi == -70
+    assert advertisement.manufacturer_data(0x02E1) == b"\x10\x02\xa3"
+    assert advertisement.manufacturer_data(0x004C) is None
+    assert [a.device for a in scanner.devices()] == [VICTRON]
+    assert scanner.device("cc:cc:cc:cc:cc:cc", max_age=-1) is None
+    scanner.forget("cc:cc:cc:cc:cc:cc")
+    assert scanner.advertisement("cc:cc:cc:cc:cc:cc") is None
+
+
+def test_stale_devices_pruned_from_index():
+    scanner, _ = _scanner()
+    scanner.max_age = 0.05
+    scanner.seen(VICTRON, _adv())
+    time.sleep(0.06)
+    # the next advertisement (from any device) drops the devices gone for longer than max_age
+    scanner.seen(JK, _adv())
+    assert list(scanner._index) == ["AA:AA:AA:AA:AA:AA"]
+    time.sleep(0.06)
+    assert scanner.prune() == 1 and not scanner._index
+
+
+def test_find_and_wait_for_fresh_advertisement():
+    scanner, created = _scanner()
+    heard = []
+    scanner.add_listener(VICTRON.address, heard.append)
+
+    async def _go():
+        found = asyncio.create_task(scanner.find(JK.address, timeout=1))
+        fresh = asyncio.create_task(scanner.wait_for_advertisement(VICTRON.address, timeout=1))
+        await asyncio.sleep(0.01)
+        assert created[0].started
+        created[0].detection_callback(JK, _adv())
+        created[0].detection_callback(VICTRON, _adv(b"\x01"))
+        first = await fresh
+        # a stale advertisement is not returned when a newer one is wanted
+        missing = await scanner.wait_for_advertisement(VICTRON.address, timeout=0.01, newer_than=first.last_seen)
+        return await found, first, missing
+
+    device, first, missing = asyncio.run(_go())
+    assert device is JK
+    assert first.manufacturer_data(0x02E1) == b"\x01" and missing is None
+    assert heard == [first]
+
+
+def test_scan_uses_one_off_discovery_when_not_running():
+    async def _discover(timeout):
+        return {JK.address: (JK, _adv()), VICTRON.address: (VICTRON, None)}
+
+    scanner = BleScanner(scanner_factory=None, discover=_discover)
+    advertisements = asyncio.run(scanner.scan(0.01))
+    assert {a.address for a in advertisements} == {"AA:AA:AA:AA:AA:AA", "CC:CC:CC:CC:CC:CC"}
+    assert not scanner.running and scanner.device(JK.address) is JK
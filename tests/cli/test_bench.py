@@ -0,0 +1,73 @@
+import json
+
+from typer.testing import CliRunner
+
+from powermon.cli.app import create_app
+from powermon.cli.bench import STAGES, find_regressions, iter_benches, load_baseline, save_baseline
+from powermon.cli.deps import Deps
+from powermon.protocols.pi30.definition import PROTOCOL
+
+
+def _deps():
+    return Deps(
+        translate=lambda s: s,
+        version="x",
+        python_version=lambda: "x",
+        list_protocols=lambda: None,
+        list_commands=lambda _: None,
+        list_formats=lambda: None,
+        list_outputs=lambda: None,
+        protocol_enum=[],
+        get_protocol_definition=lambda _: PROTOCOL,
+        config_error_type=Exception,
+        deepdiff=lambda *a, **k: {},
+        generate_config_file=lambda: None,
+        ble_reset=lambda: None,
+        ble_scan=lambda **k: None,
+    )
+
+
+def test_every_fixture_is_benchmarked_per_stage():
+    results = list(iter_benches(PROTOCOL, iterations=10))
+
+    assert {r.command_id for r in results} >= {"QPI", "QPIGS", "QPIRI"}
+    for r in results:
+        if r.error is None:
+            assert [s.stage for s in r.stages] == list(STAGES)
+            assert all(s.ns_per_op > 0 for s in r.stages)
+    # fixtures that do not decode are reported, not timed
+    assert any(r.error for r in results if r.command_id == "QPIGS")
+
+
+def test_baseline_roundtrip_and_regressions(tmp_path):
+    results = list(iter_benches(PROTOCOL, command="qpiri", iterations=10))
+    path = tmp_path / "baseline.json"
+    save_baseline(results, path)
+
+    baseline = load_baseline(path)
+    assert set(baseline["results"]) == {r.key for r in results}
+    assert find_regressions(results, baseline, threshold=10) == []
+
+    # make the baseline 'faster' than reality - every stage regresses
+    for stages in baseline["results"].values():
+        for stage in stages.values():
+            stage["ns_per_op"] /= 1000
+    regressions = find_regressions(results, baseline, threshold=0.25)
+    assert len(regressions) == len(results) * len(STAGES)
+
+
+def test_bench_cli_saves_baseline_and_fails_on_regression(tmp_path):
+    runner = CliRunner()
+    app = create_app(_deps())
+    path = tmp_path / "baseline.json"
+
+    result = runner.invoke(app, ["bench", "pi30", "qpi", "-n", "10", "--save-baseline", str(path)])
+    assert result.exit_code == 0, result.stdout
+    assert "pi30/QPI#1" in json.loads(path.read_text())["results"]
+
+    data = json.loads(path.read_text())
+    data["results"]["pi30/QPI#1"]["decode_all"]["ns_per_op"] = 0.001
+    path.write_text(json.dumps(data))
+    result = runner.invoke(app, ["bench", "pi30", "qpi", "-n", "10", "--baseline", str(path)])
+    assert result.exit_code == 1
+    assert "REGRESSION" in result.stdout
@@ -0,0 +1,70 @@
+import math
+
+import pytest
+from typer.testing import CliRunner
+
+from powermon.cli.app import create_app
+from powermon.cli.deps import Deps
+from powermon.cli.importprofile import ENTRY_POINTS, ImportProfile, check_budget, parse_importtime, profile_startup
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _abc
+import time:       300 |        420 |   abc
+import time:        80 |         80 |   construct.lib
+import time:      1000 |       1500 | powermon.thing
+import time:        50 |         50 | other
+"""
+
+
+def _deps():
+    return Deps(
+        translate=lambda s: s,
+        version="x",
+        python_version=lambda: "x",
+        list_protocols=lambda: None,
+        list_commands=lambda _: None,
+        list_formats=lambda: None,
+        list_outputs=lambda: None,
+        protocol_enum=[],
+        get_protocol_definition=lambda _: None,
+        config_error_type=Exception,
+        deepdiff=lambda *a, **k: {},
+        generate_config_file=lambda: None,
+        ble_reset=lambda: None,
+        ble_scan=lambda **k: None,
+    )
+
+
+def test_parse_importtime_builds_tree():
+    profile = parse_importtime(IMPORTTIME, entry="run")
+
+    assert [root.module for root in profile.roots] == ["powermon.thing", "other"]
+    assert [child.module for child in profile.roots[0].children] == ["abc", "construct.lib"]
+    assert profile.roots[0].children[0].children[0].module == "_abc"
+    assert profile.total_us == 1550
+    assert profile.heaviest(1)[0].module == "powermon.thing"
+    assert [failure.message for failure in check_budget(profile, budget_ms=1.0)] == [
+        "imports took 2 ms (budget 1 ms)",
+        "imports 'construct' at startup - import it where it is used",
+    ]
+
+
+@pytest.mark.parametrize("entry", list(ENTRY_POINTS))
+def test_startup_import_budget(entry, request):
+    """ deferred (heavy / optional) dependencies must never be imported at startup
+
+        the time budget depends on the machine, so it is only checked when timing (--benchmark-enable)
+    """
+    timed = request.config.getoption("benchmark_enable", default=False)
+    profile = profile_startup(entry, repeat=3 if timed else 1)
+    assert isinstance(profile, ImportProfile) and profile.roots
+    assert check_budget(profile, budget_ms=None if timed else math.inf) == []
+
+
+def test_profile_startup_cli():
+    result = CliRunner().invoke(create_app(_deps()), ["profile", "startup", "--entry", "run", "--top", "3", "--budget"])
+
+    assert result.exit_code == 0, result.stdout
+    assert "powermon.powermon" in result.stdout
+    assert "largest self import times" in result.stdout
@@ -0,0 +1,8 @@
+def pytest_configure(config):
+    """ the pytest-benchmark suite (tests/benchmarks) only times anything when asked to
+        (--benchmark-enable / --benchmark-only), otherwise each benchmark runs once as a smoke test
+    """
+    if not config.pluginmanager.hasplugin("benchmark"):
+        return
+    if not (config.getoption("benchmark_enable") or config.getoption("benchmark_only")):
+        config.option.benchmark_disable = True
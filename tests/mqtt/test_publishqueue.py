@@ -0,0 +1,222 @@
+# tests/mqtt/test_publishqueue.py
+import asyncio
+from types import SimpleNamespace
+
+from powermon.mqttbroker import MqttBroker, OverflowPolicy, PublishQueue, PublishQueueConfig
+
+
+class FakeClient:
+    """ stands in for paho Client.publish - acks are sent by calling queue.on_publish """
+    def __init__(self, rc=0, fail_topics=()):
+        self.rc = rc
+        self.fail_topics = set(fail_topics)
+        self.published = []
+        self.mid = 0
+
+    def connect_async(self, host, port=1883, keepalive=60):
+        self.connecting = (host, port)
+
+    def loop_start(self):
+        pass
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        if topic in self.fail_topics:
+            raise ValueError("bad topic")
+        self.mid += 1
+        self.published.append((topic, payload, qos, retain))
+        return SimpleNamespace(rc=self.rc, mid=self.mid)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_messages_are_published_in_order_and_acked():
+    client = FakeClient()
+    queue = PublishQueue(client.publish, batch_size=2)
+
+    async def main():
+        queue.start()
+        assert queue.put_many([(f"t/{i}", str(i)) for i in range(5)]) == 5
+        await asyncio.sleep(0.05)
+        for mid in range(1, 6):
+            queue.on_publish(None, None, mid)
+        assert await queue.flush(timeout=1)
+        await queue.stop()
+
+    _run(main())
+    assert [p[0] for p in client.published] == [f"t/{i}" for i in range(5)]
+    assert queue.metrics.published == 5
+    assert queue.metrics.delivered == 5
+    assert queue.metrics.inflight == 0
+    assert queue.metrics.max_latency >= queue.metrics.last_latency >= 0
+    assert not queue.is_running
+
+
+def test_put_does_not_publish_until_drained():
+    client = FakeClient()
+    queue = PublishQueue(client.publish)
+    queue.put_nowait("a", "1")
+    assert client.published == []
+    assert len(queue) == 1
+    assert queue.metrics.depth == 1
+
+
+def test_drop_oldest_when_full():
+    queue = PublishQueue(FakeClient().publish, maxsize=2, overflow=OverflowPolicy.DROP_OLDEST)
+    for i in range(3):
+        assert queue.put_nowait(f"t/{i}", i)
+    assert [m.topic for m in queue._pending.values()] == ["t/1", "t/2"]
+    assert queue.metrics.dropped == 1
+
+
+def test_drop_newest_when_full():
+    queue = PublishQueue(FakeClient().publish, maxsize=2, overflow="drop_newest")
+    assert queue.put_nowait("t/0", 0)
+    assert queue.put_nowait("t/1", 1)
+    assert not queue.put_nowait("t/2", 2)
+    assert [m.topic for m in queue._pending.values()] == ["t/0", "t/1"]
+    assert queue.metrics.dropped == 1
+
+
+def test_coalesce_keeps_latest_payload_per_topic():
+    queue = PublishQueue(FakeClient().publish, maxsize=10, overflow=OverflowPolicy.COALESCE)
+    queue.put_nowait("a", 1)
+    queue.put_nowait("b", 1)
+    queue.put_nowait("a", 2)
+    assert [(m.topic, m.payload) for m in queue._pending.values()] == [("a", 2), ("b", 1)]
+    assert queue.metrics.coalesced == 1
+    assert queue.metrics.dropped == 0
+
+
+def test_messages_held_while_disconnected():
+    client = FakeClient()
+    queue = PublishQueue(client.publish)
+
+    async def main():
+        queue.start()
+        queue.set_connected(False)
+        queue.put_many([("a", 1), ("b", 2)])
+        await asyncio.sleep(0.02)
+        assert client.published == [] and len(queue) == 2
+        # reconnect reported from the client's network thread
+        await asyncio.to_thread(queue.set_connected, True)
+        await asyncio.sleep(0.02)
+        queue.on_publish(None, None, 1)
+        queue.on_publish(None, None, 2)
+        assert await queue.flush(timeout=1)
+        await queue.stop()
+
+    _run(main())
+    assert [p[0] for p in client.published] == ["a", "b"]
+
+
+def test_max_inflight_limits_unacked_messages():
+    client = FakeClient()
+    queue = PublishQueue(client.publish, max_inflight=2, batch_size=10)
+
+    async def main():
+        queue.start()
+        queue.put_many([(f"t/{i}", i) for i in range(4)])
+        await asyncio.sleep(0.05)
+        assert len(client.published) == 2
+        queue.on_publish(None, None, 1)
+        await asyncio.sleep(0.05)
+        assert len(client.published) == 3
+        for mid in (2, 3, 4):
+            queue.on_publish(None, None, mid)
+        assert await queue.flush(timeout=1)
+        await queue.stop()
+
+    _run(main())
+    assert queue.metrics.delivered == 4
+
+
+def test_ack_from_another_thread():
+    client = FakeClient()
+    queue = PublishQueue(client.publish)
+
+    async def main():
+        queue.start()
+        queue.put_nowait("a", 1)
+        await asyncio.sleep(0.02)
+        await asyncio.to_thread(queue.on_publish, None, None, 1)
+        assert await queue.flush(timeout=1)
+        await queue.stop()
+
+    _run(main())
+    assert queue.metrics.delivered == 1
+
+
+def test_publish_failures_are_counted():
+    client = FakeClient(fail_topics={"bad"})
+    queue = PublishQueue(client.publish)
+
+    async def main():
+        queue.start()
+        queue.put_many([("bad", 1), ("good", 2)])
+        await asyncio.sleep(0.02)
+        queue.on_publish(None, None, 1)
+        assert await queue.flush(timeout=1)
+        await queue.stop()
+
+    _run(main())
+    assert queue.metrics.failed == 1
+    assert queue.metrics.delivered == 1
+
+
+def test_broker_queues_when_publisher_running():
+    broker = MqttBroker(name="localhost", port=1883, publish_queue=PublishQueueConfig(size=5))
+    client = FakeClient()
+    broker.mqttc = client
+    broker.is_connected = True
+
+    async def main():
+        broker.start_publisher()
+        broker.publish_many([("a", b"1"), ("b", "2"), (None, "3")])
+        assert client.published == []
+        await asyncio.sleep(0.02)
+        broker.publish_queue.on_publish(None, None, 1)
+        broker.publish_queue.on_publish(None, None, 2)
+        await broker.stop_publisher()
+
+    _run(main())
+    assert [(p[0], p[1]) for p in client.published] == [("a", "1"), ("b", "2")]
+    assert broker.publish_queue.maxsize == 5
+
+
+def test_broker_publishes_directly_without_publisher():
+    broker = MqttBroker(name="localhost", port=1883)
+    client = FakeClient()
+    broker.mqttc = client
+    broker.is_connected = True
+    broker.publish(topic="a", payload="1")
+    assert client.published == [("a", "1", 0, False)]
+
+
+def test_broker_reconnects_without_blocking():
+    broker = MqttBroker(name="localhost", port=1883)
+    client = FakeClient()
+    broker.mqttc = client
+
+    connects = []
+    broker.add_connect_callback(lambda: connects.append(True))
+
+    async def main():
+        broker.start_publisher()
+        # not connected - the connect is started in the background and the message held
+        assert client.connecting == ("localhost", 1883)
+        broker.publish(topic="a", payload="1")
+        await asyncio.sleep(0.02)
+        assert client.published == []
+        broker.on_connect(client, None, None, 0)
+        await asyncio.sleep(0.02)
+        assert client.published == [("a", "1", 0, False)] and connects == [True]
+        broker.on_disconnect(client, None, 1)
+        broker.publish(topic="b", payload="2")
+        await asyncio.sleep(0.02)
+        assert len(client.published) == 1 and len(broker.publish_queue) == 1
+        broker.publish_queue.on_publish(None, None, 1)
+        await broker.publish_queue.stop(timeout=0)
+
+    _run(main())
@@ -0,0 +1,23 @@
+# tests/outputs/test_bmsresponse_cache.py
+from types import SimpleNamespace
+
+from powermon.outputs.formatters import BMSResponseFormatConfig
+from powermon.outputs.formatters.bmsresponse import BMSResponse
+from powermon.runtime.readings_cache import ReadingsCache
+
+
+def test_bmsresponse_uses_cached_bms_readings():
+    cache = ReadingsCache()
+    cache.record_many("bms", {"battery_voltage": 52.1, "battery_state_of_charge": 87, "discharge_mos_on": True, "charge_mos_on": True})
+    config = BMSResponseFormatConfig(protocol="pi30", cache_device="bms", battery_charge_voltage=56.4, battery_float_voltage=54.0,
+                                     battery_cutoff_voltage=46.0, battery_max_charge_current=100, battery_max_discharge_current=150)
+    formatter = BMSResponse(config)
+    inverter = SimpleNamespace(name="inverter", readings_cache=cache)
+    result = SimpleNamespace(error=False, readings=[])
+    assert formatter.format(None, result, inverter) == ["BMS0 087 0 0 0 564 540 460 1000 1500"]
+
+
+def test_bmsresponse_without_values():
+    formatter = BMSResponse(BMSResponseFormatConfig(protocol="pi30", cache_device="bms"))
+    result = SimpleNamespace(error=False, readings=[])
+    assert formatter.format(None, result, SimpleNamespace(readings_cache=ReadingsCache())) == []
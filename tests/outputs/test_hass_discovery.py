@@ -0,0 +1,115 @@
+# tests/outputs/test_hass_discovery.py
+import json
+from types import SimpleNamespace
+
+from powermon.commands.reading import Reading
+from powermon.outputs.formatters import HassFormatConfig
+from powermon.outputs.formatters.hass import Hass
+from powermon.outputs.formatters.hassdiscovery import DiscoveryRegistry
+
+
+class FakeBroker:
+    def __init__(self):
+        self.subscriptions = {}
+        self.connect_callbacks = []
+
+    def subscribe(self, topic, callback):
+        self.subscriptions[topic] = callback
+
+    def add_connect_callback(self, callback):
+        self.connect_callbacks.append(callback)
+
+
+def _definition(description, unit="V", icon=None, device_class=None):
+    return SimpleNamespace(description=description, unit=unit, icon=icon, device_class=device_class,
+                           state_class=None, component=None, options=None)
+
+
+def _result(*readings):
+    return SimpleNamespace(readings=[Reading(value, value, definition) for definition, value in readings])
+
+
+def _device(broker=None):
+    return SimpleNamespace(name="inverter", serial_number="123", model="8048MAX", manufacturer="MPP-Solar", mqtt_broker=broker)
+
+
+def _topics(msgs):
+    return [msg["topic"] for msg in msgs]
+
+
+VOLTS = _definition("AC Output Voltage")
+AMPS = _definition("AC Output Current", unit="A")
+
+
+def test_config_sent_once_then_state_only():
+    hass = Hass(HassFormatConfig())
+    device = _device()
+    first = hass.format(None, _result((VOLTS, 230.1), (AMPS, 1.5)), device)
+    assert _topics(first) == [
+        "homeassistant/sensor/ac_output_voltage/config",
+        "homeassistant/sensor/ac_output_current/config",
+        "homeassistant/sensor/ac_output_voltage/state",
+        "homeassistant/sensor/ac_output_current/state",
+    ]
+    second = hass.format(None, _result((VOLTS, 231.0), (AMPS, 1.6)), device)
+    assert second == [
+        {"topic": "homeassistant/sensor/ac_output_voltage/state", "payload": 231.0},
+        {"topic": "homeassistant/sensor/ac_output_current/state", "payload": 1.6},
+    ]
+
+
+def test_config_resent_for_new_or_changed_entity():
+    hass = Hass(HassFormatConfig())
+    device = _device()
+    hass.format(None, _result((VOLTS, 230.1)), device)
+    changed = _definition("AC Output Voltage", unit="V", icon="mdi:flash")
+    msgs = hass.format(None, _result((changed, 230.1), (AMPS, 1.5)), device)
+    config = [msg for msg in msgs if msg["topic"].endswith("/config")]
+    assert _topics(config) == ["homeassistant/sensor/ac_output_voltage/config", "homeassistant/sensor/ac_output_current/config"]
+    assert json.loads(config[0]["payload"])["icon"] == "mdi:flash"
+
+
+def test_ha_online_triggers_rediscovery():
+    broker = FakeBroker()
+    hass = Hass(HassFormatConfig())
+    device = _device(broker)
+    hass.format(None, _result((VOLTS, 230.1)), device)
+    assert list(broker.subscriptions) == ["homeassistant/status"]
+
+    callback = broker.subscriptions["homeassistant/status"]
+    callback(None, None, SimpleNamespace(topic="homeassistant/status", payload=b"offline"))
+    assert len(hass.format(None, _result((VOLTS, 230.1)), device)) == 1
+    callback(None, None, SimpleNamespace(topic="homeassistant/status", payload=b"online"))
+    assert len(hass.format(None, _result((VOLTS, 230.1)), device)) == 2
+
+
+def test_broker_reconnect_triggers_rediscovery():
+    broker = FakeBroker()
+    hass = Hass(HassFormatConfig())
+    device = _device(broker)
+    hass.format(None, _result((VOLTS, 230.1)), device)
+    assert len(broker.connect_callbacks) == 1
+    assert len(hass.format(None, _result((VOLTS, 230.1)), device)) == 1
+    # config formatted while disconnected may not have been delivered - resent once reconnected
+    broker.connect_callbacks[0]()
+    assert _topics(hass.format(None, _result((VOLTS, 230.1)), device)) == [
+        "homeassistant/sensor/ac_output_voltage/config", "homeassistant/sensor/ac_output_voltage/state"]
+
+
+def test_discovery_cache_disabled_always_sends_config():
+    hass = Hass(HassFormatConfig(discovery_cache=False, discovery_prefix="ha"))
+    device = _device()
+    for _ in range(2):
+        assert _topics(hass.format(None, _result((VOLTS, 230.1)), device)) == [
+            "ha/sensor/ac_output_voltage/config", "ha/sensor/ac_output_voltage/state"]
+
+
+def test_registry():
+    registry = DiscoveryRegistry(status_topic="ha/status")
+    assert registry.needs_config("t", ("a", 1))
+    registry.announced("t", ("a", 1))
+    assert "t" in registry and len(registry) == 1
+    assert not registry.needs_config("t", ("a", 1))
+    assert registry.needs_config("t", ("a", 2))
+    registry.forget("t")
+    assert registry.needs_config("t", ("a", 1))
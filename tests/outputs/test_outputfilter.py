@@ -0,0 +1,93 @@
+# tests/outputs/test_outputfilter.py
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from powermon.outputs import OutputConfig, OutputFilter, OutputFilterConfig, ReadingFilterConfig
+
+
+def _reading(name, value, is_valid=True):
+    return SimpleNamespace(data_name=name, data_value=value, is_valid=is_valid)
+
+
+def test_no_filter_configured():
+    assert OutputFilter.from_config(None) is None
+    assert OutputConfig(type="screen").filter is None
+
+
+def test_first_value_sent_then_only_changes():
+    flt = OutputFilter()
+    assert flt.wanted("dev", "freq", 50.0, now=0)
+    assert not flt.wanted("dev", "freq", 50.0, now=1)
+    assert flt.wanted("dev", "freq", 50.1, now=2)
+    assert flt.passed == 2 and flt.suppressed == 1
+
+
+def test_absolute_deadband():
+    flt = OutputFilter(ReadingFilterConfig(deadband=0.5))
+    assert flt.wanted("dev", "volts", 230.0, now=0)
+    assert not flt.wanted("dev", "volts", 230.4, now=1)
+    assert not flt.wanted("dev", "volts", 229.6, now=2)
+    assert flt.wanted("dev", "volts", 230.5, now=3)
+    # compared with the last value sent, not the last value seen
+    assert not flt.wanted("dev", "volts", 230.9, now=4)
+
+
+def test_percent_deadband():
+    flt = OutputFilter(ReadingFilterConfig(deadband_percent=10))
+    assert flt.wanted("dev", "watts", 1000, now=0)
+    assert not flt.wanted("dev", "watts", 1099, now=1)
+    assert flt.wanted("dev", "watts", 1100, now=2)
+
+
+def test_strings_and_bools_exact_change():
+    flt = OutputFilter(ReadingFilterConfig(deadband=5))
+    assert flt.wanted("dev", "mode", "Battery", now=0)
+    assert not flt.wanted("dev", "mode", "Battery", now=1)
+    assert flt.wanted("dev", "mode", "Line", now=2)
+    assert flt.wanted("dev", "charging", True, now=0)
+    assert not flt.wanted("dev", "charging", True, now=1)
+    assert flt.wanted("dev", "charging", False, now=2)
+
+
+def test_heartbeat_resends_unchanged_value():
+    flt = OutputFilter(ReadingFilterConfig(heartbeat=60))
+    assert flt.wanted("dev", "freq", 50.0, now=0)
+    assert not flt.wanted("dev", "freq", 50.0, now=59)
+    assert flt.wanted("dev", "freq", 50.0, now=60)
+    assert not flt.wanted("dev", "freq", 50.0, now=100)
+
+
+def test_per_reading_rules_and_device_separation():
+    config = OutputFilterConfig(deadband=1, readings={"Battery Voltage": {"deadband": 0.05}})
+    flt = OutputFilter.from_config(config)
+    readings = [_reading("Battery Voltage", 52.0), _reading("AC Output Power", 500)]
+    assert flt.filter(readings, "dev1", now=0) == readings
+    assert flt.filter(readings, "dev2", now=0) == readings
+    changed = [_reading("Battery Voltage", 52.1), _reading("AC Output Power", 500.5)]
+    assert [r.data_name for r in flt.filter(changed, "dev1", now=1)] == ["Battery Voltage"]
+    assert len(flt) == 4
+
+
+def test_invalid_readings_always_sent():
+    flt = OutputFilter()
+    assert flt.wanted("dev", "x", "bad", now=0, is_valid=False)
+    assert flt.wanted("dev", "x", "bad", now=1, is_valid=False)
+
+
+def test_clear():
+    flt = OutputFilter()
+    flt.wanted("dev", "x", 1, now=0)
+    flt.clear()
+    assert len(flt) == 0
+    assert flt.wanted("dev", "x", 1, now=1)
+
+
+def test_config_validation():
+    config = OutputConfig(type="mqtt", topic="t", filter={"deadband_percent": 1, "heartbeat": 300})
+    assert config.filter.heartbeat == 300
+    with pytest.raises(ValidationError):
+        OutputFilterConfig(deadband=-1)
+    with pytest.raises(ValidationError):
+        OutputFilterConfig(unknown=1)
@@ -0,0 +1,83 @@
+# tests/ports/test_framebuffer.py
+import os
+
+import pytest
+
+from powermon.ports.framebuffer import FrameBuffer
+from powermon.protocols.decoding import decode_all
+from powermon.protocols.pi30.definition import PROTOCOL
+from powermon.protocols.pi30.fixtures import QPIGS_FIXTURES
+
+
+def test_append_find_consume():
+    buf = FrameBuffer(capacity=16)
+    buf.append(b"(PI30")
+    buf.append(memoryview(b"\x9a\x0b\r(NA"))
+    assert len(buf) == 11
+    assert buf.find(b"\r") == 7
+    assert buf.count(b"(") == 2
+    frame = buf.consume(8)
+    assert isinstance(frame, memoryview)
+    assert frame == b"(PI30\x9a\x0b\r"
+    assert bytes(buf) == b"(NA"
+    assert buf.find(b"A") == 2
+    assert buf[0] == ord("(")
+
+
+def test_storage_is_reused_between_polls():
+    buf = FrameBuffer(capacity=64)
+    storage = buf._data
+    for _ in range(100):
+        buf.clear()
+        buf.append(b"(000.0 00.0 230.0 49.9 0161\r")
+        buf.consume(len(buf))
+    assert buf._data is storage
+    assert buf.capacity == 64
+
+
+def test_growing_keeps_handed_out_views_intact():
+    buf = FrameBuffer(capacity=8)
+    buf.append(b"(ABC\r")
+    frame = buf.consume(5)
+    buf.append(b"X" * 100)  # forces a new, larger, bytearray
+    assert buf.capacity >= 100
+    assert frame == b"(ABC\r"
+    assert bytes(buf) == b"X" * 100
+
+
+def test_read_from_fd_reads_into_buffer():
+    rfd, wfd = os.pipe()
+    try:
+        os.set_blocking(rfd, False)
+        buf = FrameBuffer(capacity=4)
+        with pytest.raises(BlockingIOError):
+            buf.read_from_fd(rfd, 16)
+        os.write(wfd, b"hello world")
+        total = 0
+        while total < 11:
+            total += buf.read_from_fd(rfd, 16)
+        assert bytes(buf) == b"hello world"
+        os.close(wfd)
+        wfd = None
+        assert buf.read_from_fd(rfd, 16) == 0
+    finally:
+        os.close(rfd)
+        if wfd is not None:
+            os.close(wfd)
+
+
+def test_memoryview_frames_decode_like_bytes():
+    framing = PROTOCOL.framing
+    cmd = PROTOCOL.commands["QPIGS"]
+    raw = QPIGS_FIXTURES[0].raw_response
+    buf = FrameBuffer()
+    buf.append(raw)
+    frame = buf.consume(framing.frame_length(buf))
+    assert isinstance(frame, memoryview)
+
+    framing.validate(frame)
+    framing.verify_crc(frame)
+    payload = framing.strip(frame)
+    assert isinstance(payload, memoryview)
+    decoded = decode_all(cmd.response.parse(payload), cmd.decode_plan)
+    assert decoded == decode_all(cmd.response.parse(framing.strip(raw)), cmd.decode_plan)
@@ -0,0 +1,123 @@
+# tests/ports/test_framereader.py
+import asyncio
+import os
+
+import pytest
+
+from powermon.ports.framereader import FrameReader, FrameTimeout, MinimumLength
+from powermon.ports.port import Port
+from powermon.protocols.daly.framing import DalyFrameSpec
+from powermon.protocols.neey.framing import NeeyFrameSpec
+from powermon.protocols.pi30.definition import PROTOCOL
+
+QPI_RESPONSE = b"(PI30\x9a\x0b\r"
+
+
+def _daly_frame(data=bytes(8)):
+    frame = bytearray([0xA5, 0x01, 0x90, len(data)]) + data
+    frame.append(sum(frame) & 0xFF)
+    return bytes(frame)
+
+
+def _neey_frame(data=bytes(4)):
+    length = 8 + len(data) + 2
+    frame = bytearray(b"\x55\xaa\x11\x01\x01\x00") + length.to_bytes(2, "little") + data
+    frame.append(sum(frame) & 0xFF)
+    frame.append(0xFF)
+    return bytes(frame)
+
+
+def test_terminator_frame_completes_at_terminator():
+    reader = FrameReader(PROTOCOL.framing)
+    reader.feed(QPI_RESPONSE[:4])
+    assert reader.pop_frame() is None
+    reader.feed(QPI_RESPONSE[4:] + b"(NAK")
+    assert reader.pop_frame() == QPI_RESPONSE
+    assert reader.latency is not None
+    assert bytes(reader.buffer) == b"(NAK"
+
+
+@pytest.mark.parametrize("framing, frame", [(DalyFrameSpec(), _daly_frame()), (NeeyFrameSpec(), _neey_frame())])
+def test_length_prefixed_frame(framing, frame):
+    reader = FrameReader(framing)
+    for i in range(len(frame) - 1):
+        reader.feed(frame[i:i + 1])
+        assert reader.pop_frame() is None
+    reader.feed(frame[-1:])
+    result = reader.pop_frame()
+    assert result == frame
+    framing.validate(result)
+    framing.verify_crc(result)
+
+
+def test_read_frame_completes_on_feed():
+    async def _go():
+        reader = FrameReader(PROTOCOL.framing)
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.01, reader.feed, QPI_RESPONSE[:3])
+        loop.call_later(0.02, reader.feed, QPI_RESPONSE[3:])
+        return await reader.read_frame(timeout=1)
+    assert asyncio.run(_go()) == QPI_RESPONSE
+
+
+def test_read_frame_timeout_keeps_partial():
+    async def _go():
+        reader = FrameReader(PROTOCOL.framing)
+        reader.feed(b"(PI3")
+        await reader.read_frame(timeout=0.05)
+    with pytest.raises(FrameTimeout) as exc_info:
+        asyncio.run(_go())
+    assert exc_info.value.partial == b"(PI3"
+
+
+def test_read_frame_from_fd():
+    async def _go():
+        rfd, wfd = os.pipe()
+        os.set_blocking(rfd, False)
+        try:
+            reader = FrameReader(PROTOCOL.framing)
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.01, os.write, wfd, QPI_RESPONSE[:5])
+            loop.call_later(0.02, os.write, wfd, QPI_RESPONSE[5:])
+            return await reader.read_frame_from_fd(rfd, timeout=1)
+        finally:
+            os.close(rfd)
+            os.close(wfd)
+    assert asyncio.run(_go()) == QPI_RESPONSE
+
+
+def test_notifications_complete_frame_without_polling():
+    """ BLE style - chunks arrive from a callback, the read completes on the chunk that finishes the frame """
+    reader = FrameReader(DalyFrameSpec())
+    frame = _daly_frame()
+
+    async def _go():
+        loop = asyncio.get_running_loop()
+        reader.reset()
+        for i, chunk in enumerate((frame[:5], frame[5:10], frame[10:])):
+            loop.call_later(0.01 * (i + 1), reader.feed, chunk)
+        started = loop.time()
+        response = await reader.read_frame(timeout=1.0)
+        return bytes(response), loop.time() - started
+
+    response, elapsed = asyncio.run(_go())
+    assert response == frame
+    assert elapsed < 0.08
+
+
+def test_minimum_length_framing():
+    reader = FrameReader(MinimumLength(4))
+    reader.feed(b"abc")
+    assert reader.pop_frame() is None
+    reader.feed(b"def")
+    assert bytes(reader.pop_frame()) == b"abcdef"
+
+
+def test_response_timeout_per_command():
+    class _Action:
+        def __init__(self, timeout):
+            self.command_definition = type("Definition", (), {"timeout": timeout})()
+
+    assert Port.response_timeout(_Action(None), 2.0) == 2.0
+    assert Port.response_timeout(_Action(0.5), 2.0) == 0.5
+    assert Port.response_timeout(object(), 3.0) == 3.0
@@ -0,0 +1,97 @@
+# tests/ports/test_port_batch.py
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from powermon.ports.port import Port
+
+
+class FakePort(Port):
+    port_type = "fake"
+
+    def __init__(self, gap=0.0, fail=()):
+        protocol = SimpleNamespace(protocol_id="FAKE", supported_ports={"fake"}, inter_frame_gap=gap,
+                                   get_full_command=lambda command: command.encode() + b"\r")
+        super().__init__(protocol=protocol)
+        self.fail = set(fail)
+        self.connects = 0
+        self.connected = False
+        self.sent = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def connect(self):
+        self.connects += 1
+        await asyncio.sleep(0.01)
+        self.connected = True
+        return True
+
+    async def get_response(self, action):
+        self.sent.append((time.perf_counter(), action.full_command))
+        if action.command in self.fail:
+            raise TimeoutError(f"no response to {action.command}")
+        return b"(" + action.full_command
+
+
+class FakeAction:
+    def __init__(self, command):
+        self.command = command
+        self.touched = 0
+        self.trigger = SimpleNamespace(touch=self._touch)
+
+    def _touch(self):
+        self.touched += 1
+
+    def get_command(self):
+        return self.command
+
+
+def test_batch_connects_once_and_keeps_order():
+    port = FakePort()
+    actions = [FakeAction(c) for c in ("QPIGS", "QPIGS2", "QPIWS", "QMOD")]
+    responses = asyncio.run(port.execute_batch(actions))
+    assert responses == [b"(QPIGS\r", b"(QPIGS2\r", b"(QPIWS\r", b"(QMOD\r"]
+    assert port.connects == 1
+    assert all(action.touched == 1 for action in actions)
+    assert set(port.latency) == {"QPIGS", "QPIGS2", "QPIWS", "QMOD"}
+
+
+def test_batch_waits_inter_frame_gap():
+    port = FakePort(gap=0.03)
+    asyncio.run(port.execute_batch([FakeAction("A"), FakeAction("B"), FakeAction("C")]))
+    times = [sent for sent, _command in port.sent]
+    assert all(b - a >= 0.025 for a, b in zip(times, times[1:]))
+
+
+def test_failed_command_does_not_stop_batch():
+    port = FakePort(fail={"B"})
+    responses = asyncio.run(port.execute_batch([FakeAction("A"), FakeAction("B"), FakeAction("C")]))
+    assert responses[0] == b"(A\r" and responses[2] == b"(C\r"
+    assert isinstance(responses[1], TimeoutError)
+
+
+def test_sessions_do_not_interleave():
+    port = FakePort(gap=0.02)
+
+    async def _go():
+        await asyncio.gather(
+            port.execute_batch([FakeAction("A1"), FakeAction("A2")]),
+            port.execute_action(FakeAction("B")),
+        )
+
+    asyncio.run(_go())
+    assert [command for _sent, command in port.sent] == [b"A1\r", b"A2\r", b"B\r"]
+
+
+def test_connect_failure_raises():
+    port = FakePort()
+
+    async def _refuse():
+        return False
+
+    port.connect = _refuse
+    with pytest.raises(ConnectionError):
+        asyncio.run(port.execute_batch([FakeAction("A")]))
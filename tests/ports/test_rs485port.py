@@ -0,0 +1,157 @@
+# tests/ports/test_rs485port.py
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from powermon.exceptions import ConfigError
+from powermon.ports import PortType, SerialPortConfig
+from powermon.ports.port import Port
+from powermon.ports.rs485port import RS485Port, SharedBus
+from powermon.protocols.daly.framing import DalyFrameSpec
+from powermon.protocols.model import CommandDefinition, ProtocolDefinition, RequestSpec, ResponseSpec
+from powermon.protocols.types import ProtocolType
+
+SOC = CommandDefinition(
+    command_id="SOC",
+    name="State of charge",
+    description="",
+    request=RequestSpec(command="90", terminator=b"", crc=False),
+    response=ResponseSpec(parser=lambda payload: None),
+)
+# daly is not a registered protocol yet - a stand-in definition with its framing
+PROTOCOL = ProtocolDefinition(
+    protocol_type=ProtocolType.DEFAULT,
+    protocol_id="daly",
+    description="",
+    framing=DalyFrameSpec(),
+    commands={"SOC": SOC},
+    selectors={},
+    supported_ports=frozenset({PortType.SERIAL}),
+)
+REQUEST_LENGTH = 14  # 13 byte frame + 0x0a
+
+
+@pytest.fixture
+def pty_pair():
+    master, slave = os.openpty()
+    os.set_blocking(master, False)
+    yield master, os.ttyname(slave)
+    SharedBus.close_all()
+    os.close(master)
+    os.close(slave)
+
+
+def _reply(address, code=0x90, data=b"\x01\x02\x03\x04\x05\x06\x07\x08"):
+    frame = bytes([0xA5, address, code, len(data)]) + data
+    return frame + bytes([sum(frame) & 0xFF])
+
+
+def _action():
+    return SimpleNamespace(full_command=None, command_definition=SOC, get_command=lambda: "soc")
+
+
+async def _units(master, requests, *, stray=None):
+    """ stand-in for the units on the bus: answer each request from the address it was sent to """
+    received = b""
+    while len(requests) < 4:
+        await asyncio.sleep(0.005)
+        try:
+            received += os.read(master, 1024)
+        except BlockingIOError:
+            continue
+        # a request arriving while another is being answered would show up here as extra bytes
+        assert len(received) <= REQUEST_LENGTH
+        if len(received) == REQUEST_LENGTH:
+            requests.append(received)
+            address = received[1]
+            await asyncio.sleep(0.02)
+            if stray is not None:
+                os.write(master, _reply(stray))
+            os.write(master, _reply(address))
+            received = b""
+
+
+def test_units_share_one_adapter_and_take_turns(pty_pair):
+    master, path = pty_pair
+    ports = [RS485Port(path=path, baud=9600, protocol=PROTOCOL, address=address) for address in (1, 2)]
+    assert ports[0].bus is ports[1].bus
+
+    async def _go():
+        requests = []
+        units = asyncio.create_task(_units(master, requests, stray=7))
+        for port in ports:
+            assert await port.connect()
+        assert ports[0].serial_port is ports[1].serial_port
+
+        async def _poll(port):
+            replies = []
+            for _ in range(2):
+                action = _action()
+                action.full_command = port.full_command(action)
+                replies.append(bytes(await port.get_response(action)))
+            return replies
+
+        replies = await asyncio.gather(*(_poll(port) for port in ports))
+        await units
+        return requests, replies
+
+    requests, replies = asyncio.run(_go())
+    # the units' requests were interleaved and each got its own unit's reply
+    assert [request[1] for request in requests] == [1, 2, 1, 2]
+    assert replies == [[_reply(1)] * 2, [_reply(2)] * 2]
+    assert ports[0].bus.transactions == 4 and ports[0].bus.misrouted == 4
+
+
+def test_adapter_closed_when_last_unit_disconnects(pty_pair):
+    _, path = pty_pair
+    ports = [RS485Port(path=path, baud=9600, protocol=PROTOCOL, address=address) for address in (1, 2)]
+    bus = ports[0].bus
+
+    async def _go():
+        for port in ports:
+            await port.connect()
+        await ports[0].disconnect()
+        assert bus.is_open() and ports[1].is_connected() and not ports[0].is_connected()
+        await ports[1].disconnect()
+        assert not bus.is_open()
+
+    asyncio.run(_go())
+
+
+def test_devices_can_be_rebuilt_after_disconnect(pty_pair):
+    _, path = pty_pair
+
+    async def _go():
+        port = RS485Port(path=path, baud=9600, protocol=PROTOCOL, address=1)
+        await port.connect()
+        await port.disconnect()
+        # the address is free again and a disconnected port can reconnect
+        again = RS485Port(path=path, baud=9600, protocol=PROTOCOL, address=1)
+        with pytest.raises(ConfigError, match="more than one device with address 0x01"):
+            await port.connect()
+        await again.disconnect()
+        assert await port.connect()
+        return port.bus
+
+    bus = asyncio.run(_go())
+    SharedBus.close_all()
+    # a later run gets a new bus
+    assert RS485Port(path=path, baud=9600, protocol=PROTOCOL, address=1).bus is not bus
+
+
+def test_from_config_and_bus_conflicts(pty_pair):
+    _, path = pty_pair
+
+    async def _go():
+        port = await Port.from_config(config=SerialPortConfig(path=path, baud=9600, address=3), protocol=PROTOCOL, serial_number=None)
+        assert isinstance(port, RS485Port)
+        with pytest.raises(ConfigError, match="more than one device with address 0x03"):
+            RS485Port(path=path, baud=9600, protocol=PROTOCOL, address=3)
+        with pytest.raises(ConfigError, match="different bauds"):
+            RS485Port(path=path, baud=2400, protocol=PROTOCOL, address=4)
+        return port
+
+    port = asyncio.run(_go())
+    assert port.full_command(_action())[:3] == b"\xa5\x03\x90"
@@ -0,0 +1,190 @@
+# tests/ports/test_serialport.py
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from powermon.ports.serialport import SerialPort
+from powermon.protocols.model import CommandType
+from powermon.protocols.pi30.definition import PROTOCOL
+from tests.ports.test_vedirect import vedirect_block
+
+QPI_RESPONSE = b"(PI30\x9a\x0b\r"
+
+
+@pytest.fixture
+def pty_pair():
+    master, slave = os.openpty()
+    yield master, os.ttyname(slave)
+    os.close(master)
+    os.close(slave)
+
+
+def _action(full_command=b"QPI\xbe\xac\r", command_type=CommandType.DEFAULT):
+    return SimpleNamespace(
+        full_command=full_command,
+        command_definition=SimpleNamespace(command_type=command_type),
+    )
+
+
+async def _device(master, reply, *, delay=0.05, expect=None):
+    """ minimal stand-in device on the pty master: wait for a request then reply """
+    loop = asyncio.get_running_loop()
+    received = b""
+    if expect:
+        while len(received) < len(expect):
+            await asyncio.sleep(0.01)
+            try:
+                received += os.read(master, 1024)
+            except BlockingIOError:
+                pass
+    await asyncio.sleep(delay)
+    for chunk in reply:
+        await loop.run_in_executor(None, os.write, master, chunk)
+        await asyncio.sleep(0.01)
+    return received
+
+
+def _run(port, action, device_coro):
+    async def _go():
+        assert await port.connect()
+        try:
+            device = asyncio.create_task(device_coro)
+            start = time.perf_counter()
+            response = await port.get_response(action)
+            elapsed = time.perf_counter() - start
+            return response, elapsed, await device
+        finally:
+            await port.disconnect()
+    return asyncio.run(_go())
+
+
+def test_default_returns_when_terminator_arrives(pty_pair):
+    master, path = pty_pair
+    os.set_blocking(master, False)
+    port = SerialPort(path=path, baud=2400, protocol=PROTOCOL)
+    action = _action()
+
+    response, elapsed, received = _run(
+        port, action, _device(master, [QPI_RESPONSE[:4], QPI_RESPONSE[4:] + b"trailing"], expect=action.full_command)
+    )
+
+    assert received == action.full_command
+    assert response == QPI_RESPONSE
+    assert elapsed < 0.5
+
+
+def test_event_loop_not_blocked_while_waiting(pty_pair):
+    master, path = pty_pair
+    port = SerialPort(path=path, baud=2400, protocol=PROTOCOL)
+    ticks = []
+
+    async def _ticker():
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def _go():
+        assert await port.connect()
+        ticker = asyncio.create_task(_ticker())
+        device = asyncio.create_task(_device(master, [QPI_RESPONSE], delay=0.3))
+        try:
+            await port.get_response(_action())
+        finally:
+            ticker.cancel()
+            await device
+            await port.disconnect()
+
+    asyncio.run(_go())
+    assert len(ticks) > 10
+
+
+def test_readonly_completes_when_line_goes_quiet(pty_pair):
+    master, path = pty_pair
+    port = SerialPort(path=path, baud=2400, protocol=PROTOCOL)
+
+    response, elapsed, _ = _run(
+        port, _action(full_command=b"", command_type=CommandType.SERIAL_READONLY),
+        _device(master, [b"abc", b"def"], delay=0.0),
+    )
+
+    assert response == b"abcdef"
+    assert elapsed < 1.0
+
+
+def test_victron_listen_returns_checksummed_block(pty_pair):
+    master, path = pty_pair
+    port = SerialPort(path=path, baud=19200, protocol=PROTOCOL)
+    block = vedirect_block(b"\r\nV\t12800\r\nI\t-50\r\nP\t-1")
+
+    response, _, _ = _run(
+        port, _action(full_command=b"", command_type=CommandType.VICTRON_LISTEN),
+        # starts mid block (discarded), then a whole block split at arbitrary points
+        _device(master, [b"\t12\r\nChecksum\t\x00", block[:9], block[9:20], block[20:]], delay=0.0),
+    )
+
+    assert response == block
+
+
+def _qid_response(serial_number: bytes) -> bytes:
+    payload = b"(" + serial_number
+    return payload + PROTOCOL.framing.crc_func(payload) + b"\r"
+
+
+def test_wildcard_path_resolved_by_serial_number(tmp_path):
+    ptys = [os.openpty() for _ in range(2)]
+    links = []
+    for i, (master, slave) in enumerate(ptys):
+        os.set_blocking(master, False)
+        links.append(tmp_path / f"ttyTEST{i}")
+        links[-1].symlink_to(os.ttyname(slave))
+
+    async def _unit(master, serial_number):
+        # answer every QID with this unit's serial number
+        while True:
+            await _device(master, [_qid_response(serial_number)], delay=0.01, expect=b"QID\xd6\xea\r")
+
+    async def _go():
+        units = [asyncio.create_task(_unit(ptys[0][0], b"11111111111111")), asyncio.create_task(_unit(ptys[1][0], b"92932004102443"))]
+        try:
+            port = SerialPort(path=str(tmp_path / "ttyTEST*"), baud=2400, protocol=PROTOCOL)
+            return await port.resolve_path(str(tmp_path / "ttyTEST*"), "92932004102443")
+        finally:
+            for unit in units:
+                unit.cancel()
+
+    try:
+        assert asyncio.run(_go()) == str(links[1])
+    finally:
+        for master, slave in ptys:
+            os.close(master)
+            os.close(slave)
+
+
+async def _unit_replies(master, exchanges):
+    for expect, reply in exchanges:
+        await _device(master, [reply], delay=0.01, expect=expect)
+
+
+def test_batch_responses_survive_later_commands(pty_pair):
+    master, path = pty_pair
+    os.set_blocking(master, False)
+    port = SerialPort(path=path, baud=2400, protocol=PROTOCOL)
+    qid, qpi = _qid_response(b"92932004102443"), QPI_RESPONSE
+
+    def _task(command):
+        return SimpleNamespace(get_command=lambda: command, trigger=SimpleNamespace(touch=lambda: None),
+                               command_definition=SimpleNamespace(command_type=CommandType.DEFAULT))
+
+    async def _go():
+        # the longer response first - the next one is read into the same buffer
+        device = asyncio.create_task(_unit_replies(master, [(b"QID\xd6\xea\r", qid), (b"QPI\xbe\xac\r", qpi)]))
+        try:
+            return await port.execute_batch([_task("QID"), _task("QPI")])
+        finally:
+            await device
+            await port.disconnect()
+
+    assert asyncio.run(_go()) == [qid, qpi]
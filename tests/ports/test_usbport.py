@@ -0,0 +1,145 @@
+# tests/ports/test_usbport.py
+import asyncio
+import os
+import socket
+import time
+import tty
+from types import SimpleNamespace
+
+import pytest
+
+from powermon.ports.framereader import FrameTimeout
+from powermon.ports.usbport import USBPort
+from powermon.protocols.pi30.definition import PROTOCOL
+
+QPI_RESPONSE = b"(PI30\x9a\x0b\r"
+
+
+@pytest.fixture
+def hid_pair():
+    """ socketpair stand-in for a hidraw device: the port gets one end, the 'inverter' the other """
+    port_end, device_end = socket.socketpair()
+    port_end.setblocking(False)
+    device_end.setblocking(False)
+    yield port_end, device_end
+    port_end.close()
+    device_end.close()
+
+
+def _port(port_end):
+    port = USBPort(path="/dev/hidraw0", protocol=PROTOCOL)
+    port.port = port_end.fileno()
+    port.disconnect = _no_disconnect  # the fixture owns the fd
+    return port
+
+
+async def _no_disconnect():
+    pass
+
+
+async def _device(device_end, expect_len, reply, *, delay=0.05):
+    loop = asyncio.get_running_loop()
+    received = b""
+    while len(received) < expect_len:
+        received += await loop.sock_recv(device_end, 64)
+    await asyncio.sleep(delay)
+    for chunk in reply:
+        await loop.sock_sendall(device_end, chunk)
+        await asyncio.sleep(0.01)
+    return received
+
+
+def test_writes_padded_reports_and_returns_on_terminator(hid_pair):
+    port_end, device_end = hid_pair
+    port = _port(port_end)
+    full_command = b"QPIGS\xb7\xa9\r\x00"  # 9 bytes -> two reports
+
+    async def _go():
+        device = asyncio.create_task(_device(device_end, 16, [QPI_RESPONSE[:4], QPI_RESPONSE[4:] + b"\x00\x00"]))
+        start = time.perf_counter()
+        response = await port.get_response(SimpleNamespace(full_command=full_command))
+        return response, time.perf_counter() - start, await device
+
+    response, elapsed, received = asyncio.run(_go())
+    assert received == full_command + b"\x00" * 7
+    assert response == QPI_RESPONSE
+    assert elapsed < 0.5
+
+
+def test_event_loop_not_blocked(hid_pair):
+    port_end, device_end = hid_pair
+    port = _port(port_end)
+    ticks = []
+
+    async def _ticker():
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def _go():
+        ticker = asyncio.create_task(_ticker())
+        device = asyncio.create_task(_device(device_end, 8, [QPI_RESPONSE], delay=0.2))
+        await port.get_response(SimpleNamespace(full_command=b"QPI\xbe\xac\r"))
+        await device
+        ticker.cancel()
+
+    asyncio.run(_go())
+    assert len(ticks) >= 10
+
+
+def test_timeout_without_terminator(hid_pair, monkeypatch):
+    monkeypatch.setattr("powermon.ports.usbport.RESPONSE_TIMEOUT", 0.1)
+    port_end, device_end = hid_pair
+    port = _port(port_end)
+
+    async def _go():
+        device = asyncio.create_task(_device(device_end, 8, [b"(PI30"], delay=0))
+        try:
+            await port.get_response(SimpleNamespace(full_command=b"QPI\xbe\xac\r"))
+        finally:
+            await device
+
+    with pytest.raises(FrameTimeout) as exc_info:
+        asyncio.run(_go())
+    assert exc_info.value.partial == b"(PI30"
+
+
+def test_wildcard_path_resolved_by_serial_number(tmp_path):
+    ptys = [os.openpty() for _ in range(2)]  # raw ptys stand in for hidraw devices
+    for i, (master, slave) in enumerate(ptys):
+        tty.setraw(slave)
+        os.set_blocking(master, False)
+        (tmp_path / f"hidraw{i}").symlink_to(os.ttyname(slave))
+    qid = b"QID\xd6\xea\r\x00\x00"
+
+    async def _unit(master, serial_number):
+        payload = b"(" + serial_number
+        response = payload + PROTOCOL.framing.crc_func(payload) + b"\r"
+        loop = asyncio.get_running_loop()
+        received = b""
+        while True:
+            await asyncio.sleep(0.01)
+            try:
+                received += os.read(master, 64)
+            except BlockingIOError:
+                continue
+            if len(received) >= len(qid):
+                assert received[:len(qid)] == qid
+                received = received[len(qid):]
+                await loop.run_in_executor(None, os.write, master, response)
+
+    async def _go():
+        units = [asyncio.create_task(_unit(ptys[i][0], serial_number)) for i, serial_number in enumerate((b"11111111111111", b"92932004102443"))]
+        try:
+            port = USBPort(path=str(tmp_path / "hidraw*"), protocol=PROTOCOL)
+            return await port.resolve_path(str(tmp_path / "hidraw*"), 92932004102443)
+        finally:
+            for unit in units:
+                unit.cancel()
+
+    try:
+        assert asyncio.run(_go()) == str(tmp_path / "hidraw1")
+    finally:
+        for master, slave in ptys:
+            os.close(master)
+            os.close(slave)
@@ -0,0 +1,99 @@
+# tests/ports/test_vedirect.py
+import asyncio
+import os
+
+import pytest
+
+from powermon.ports.vedirect import VEDirectBlock, VEDirectHexFrame, VEDirectReader
+from powermon.protocols.crc import victron_checksum
+
+
+def vedirect_block(fields: bytes) -> bytes:
+    """ fields + the Checksum field that makes the block sum to 0 """
+    body = fields + b"\r\nChecksum\t"
+    return body + bytes([-sum(body) & 0xFF])
+
+
+def hex_frame(command: int, payload: bytes) -> bytes:
+    data = bytes([command]) + payload
+    return f":{command:X}{payload.hex().upper()}{victron_checksum(data):02X}\n".encode()
+
+
+BLOCK_1 = vedirect_block(b"\r\nPID\t0xA053\r\nV\t13250\r\nI\t-2345\r\nSOC\t874")
+BLOCK_2 = vedirect_block(b"\r\nPID\t0xA053\r\nV\t13260\r\nI\t-2300\r\nSOC\t873")
+HEX = hex_frame(0x7, bytes.fromhex("ed8d0034"))
+
+
+def test_blocks_framed_on_checksum_however_split():
+    stream = b"I\t-1\r\nChecksum\t\x07" + BLOCK_1 + BLOCK_2
+    for size in (1, 3, 7, len(stream)):
+        reader = VEDirectReader()
+        frames = []
+        for i in range(0, len(stream), size):
+            frames.extend(reader.feed(stream[i:i + size]))
+        assert [f.raw for f in frames] == [BLOCK_1, BLOCK_2]
+        # the partial block at the start fails its checksum and is dropped
+        assert reader.blocks == 2 and reader.checksum_errors == 1
+    assert frames[0].fields == {"PID": "0xA053", "V": "13250", "I": "-2345", "SOC": "874"}
+
+
+def test_interleaved_hex_frames():
+    split = BLOCK_1.index(b"\r\nV\t")
+    stream = HEX + BLOCK_1[:split] + HEX + BLOCK_1[split:] + hex_frame(0xA, b"\x01\x02")
+    reader = VEDirectReader()
+    frames = [frame for i in range(len(stream)) for frame in reader.feed(stream[i:i + 1])]
+    assert [type(f) for f in frames] == [VEDirectHexFrame, VEDirectHexFrame, VEDirectBlock, VEDirectHexFrame]
+    assert frames[2].raw == BLOCK_1
+    assert (frames[0].command, frames[0].payload, frames[0].valid) == (0x7, bytes.fromhex("ed8d0034"), True)
+    assert frames[3].command == 0xA and frames[3].valid
+    assert not VEDirectHexFrame.from_raw(b":7ED8D003400\n").valid
+
+
+def test_checksum_byte_that_looks_like_a_hex_frame():
+    body = b"\r\nV\t1\r\nChecksum\t"
+    # choose the last character of a value so the checksum byte is ':'
+    block = vedirect_block(b"\r\nV\t1" + bytes([(-sum(body) - ord(":")) & 0xFF]))
+    assert block[-1:] == b":"
+    reader = VEDirectReader()
+    assert [f.raw for f in reader.feed(block + BLOCK_1)] == [block, BLOCK_1]
+
+
+def test_latest_block_and_async_iteration():
+    reader = VEDirectReader(max_queued=2)
+
+    async def _go():
+        reader.feed(BLOCK_1 + HEX + BLOCK_2)
+        # the oldest frame was dropped to make room
+        assert reader.dropped == 1
+        assert (await reader.latest_block(timeout=0.1)).raw == BLOCK_2
+        with pytest.raises(asyncio.TimeoutError):
+            await reader.latest_block(timeout=0.01)
+        reader.feed(BLOCK_1)
+        return await anext(reader)
+
+    assert asyncio.run(_go()).raw == BLOCK_1
+
+
+def test_streams_from_fd_between_polls():
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    reader = VEDirectReader()
+
+    async def _go():
+        reader.attach(read_fd)
+        os.write(write_fd, BLOCK_1)
+        await asyncio.sleep(0.02)
+        os.write(write_fd, BLOCK_2[:10])
+        await asyncio.sleep(0.02)
+        os.write(write_fd, BLOCK_2[10:])
+        frames = [await reader.next_frame(timeout=1), await reader.next_frame(timeout=1)]
+        reader.detach()
+        return frames
+
+    try:
+        frames = asyncio.run(_go())
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+    assert [f.raw for f in frames] == [BLOCK_1, BLOCK_2]
+    assert not reader.attached
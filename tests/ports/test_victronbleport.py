@@ -0,0 +1,83 @@
+# tests/ports/test_victronbleport.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from powermon.exceptions import BLEResponseError, ConfigError
+from powermon.ports import BlePortConfig
+from powermon.ports.blescanner import BleScanner
+from powermon.ports.port import Port
+from powermon.ports.victronbleport import VictronBlePort
+from powermon.protocols.victron_ble.advertisement import VICTRON_COMPANY_ID
+from powermon.protocols.victron_ble.definition import PROTOCOL
+from powermon.protocols.victron_ble.fixtures import ADVERTISEMENTS, BATTERY_MONITOR_FIXTURES, FIXTURE_KEY
+
+MAC = "66:66:18:01:09:18"
+DEVICE = SimpleNamespace(name="SmartShunt", address=MAC)
+
+
+class FakeScanner:
+    def __init__(self, detection_callback, passive):
+        self.detection_callback = detection_callback
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+def _port(key=FIXTURE_KEY):
+    scanner = BleScanner(scanner_factory=FakeScanner)
+    return VictronBlePort(mac=MAC, protocol=PROTOCOL, victron_key=key, scanner=scanner), scanner
+
+
+def _action(timeout=0.2):
+    return SimpleNamespace(command_definition=SimpleNamespace(timeout=timeout))
+
+
+def _advertise(scanner, payload):
+    data = SimpleNamespace(manufacturer_data={VICTRON_COMPANY_ID: payload} if payload is not None else {})
+    scanner.seen(DEVICE, data)
+
+
+def test_from_config_picks_victron_port_when_key_set():
+    config = BlePortConfig(mac=MAC, protocol="victron_ble", victron_key=FIXTURE_KEY)
+    port = asyncio.run(Port.from_config(config=config, protocol=PROTOCOL))
+    assert isinstance(port, VictronBlePort)
+    with pytest.raises(ConfigError, match="16 bytes"):
+        VictronBlePort(mac=MAC, protocol=PROTOCOL, victron_key="abcd")
+
+
+def test_reads_next_advertisement_without_connecting():
+    pytest.importorskip("Crypto")
+    port, scanner = _port()
+
+    async def _go():
+        assert await port.connect() and port.is_connected()
+        pending = asyncio.create_task(port.get_response(_action()))
+        await asyncio.sleep(0.01)
+        _advertise(scanner, ADVERTISEMENTS["BATTERY_MONITOR"][0])
+        first = await pending
+        # the same advertisement is not returned twice
+        with pytest.raises(BLEResponseError, match="no advertisement"):
+            await port.get_response(_action(timeout=0.01))
+        return first
+
+    assert asyncio.run(_go()) == BATTERY_MONITOR_FIXTURES[0].raw_response
+
+
+def test_advertisement_errors():
+    port, scanner = _port(key="00" + FIXTURE_KEY[2:])
+
+    async def _go():
+        await port.connect()
+        _advertise(scanner, None)
+        with pytest.raises(BLEResponseError, match="no Victron manufacturer data"):
+            await port.get_response(_action())
+        _advertise(scanner, ADVERTISEMENTS["BATTERY_MONITOR"][0])
+        with pytest.raises(BLEResponseError, match="wrong key"):
+            await port.get_response(_action())
+
+    asyncio.run(_go())
@@ -0,0 +1,53 @@
+# tests/protocols/test_catalog.py
+import subprocess
+import sys
+
+import pytest
+
+from powermon.protocols import build_registry
+from powermon.protocols.catalog import LazyProtocolRegistry, ProtocolCatalogError
+from powermon.protocols.pi30.definition import PROTOCOL as PI30
+from powermon.protocols.types import ProtocolType
+
+
+def test_all_protocols_load_and_validate():
+    # the eager mode CI relies on to catch a broken definition module
+    registry = build_registry(eager=True)
+    assert {proto.protocol_type for proto in registry.list_protocols()} == set(ProtocolType)
+
+
+def test_definitions_imported_on_first_use():
+    code = (
+        "import sys\n"
+        "from powermon.protocols import build_registry\n"
+        "from powermon.protocols.types import ProtocolType\n"
+        "registry = build_registry()\n"
+        "assert not [m for m in sys.modules if m.endswith('.definition')], 'imported before use'\n"
+        "assert registry.get_by_id('PI30').protocol_type is ProtocolType.PI30\n"
+        "assert [m for m in sys.modules if m.endswith('.definition')] == ['powermon.protocols.pi30.definition']\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_failing_protocol_only_raises_when_used():
+    registry = LazyProtocolRegistry(
+        {ProtocolType.PI30: "powermon.protocols.pi30.definition", ProtocolType.VICTRON_BLE: "powermon.protocols.missing.definition"},
+        include_tracebacks=False,
+    )
+    assert registry.protocol_types() == [ProtocolType.PI30, ProtocolType.VICTRON_BLE]
+    assert registry.get(ProtocolType.PI30) is PI30
+    assert registry.is_loaded(ProtocolType.PI30) and not registry.is_loaded(ProtocolType.VICTRON_BLE)
+
+    with pytest.raises(ProtocolCatalogError, match="victron_ble -> powermon.protocols.missing.definition"):
+        registry.get(ProtocolType.VICTRON_BLE)
+    with pytest.raises(ProtocolCatalogError) as exc_info:
+        registry.list_protocols()
+    assert [failure.protocol_type for failure in exc_info.value.failures] == [ProtocolType.VICTRON_BLE]
+
+
+def test_protocol_type_mismatch_reported():
+    registry = LazyProtocolRegistry({ProtocolType.VICTRON_BLE: "powermon.protocols.pi30.definition"})
+    with pytest.raises(ProtocolCatalogError, match="protocol_type mismatch"):
+        registry.get(ProtocolType.VICTRON_BLE)
+    with pytest.raises(KeyError, match="Unknown protocol_type"):
+        registry.get(ProtocolType.PI30)
@@ -0,0 +1,86 @@
+# tests/protocols/test_command_index.py
+import re
+
+import pytest
+
+from powermon.protocols import build_registry
+from powermon.protocols.index import CommandIndex
+from powermon.protocols.model import CommandDefinition, ParameterSpec, RequestSpec, ResponseSpec, SelectorTarget
+from powermon.protocols.parsers import parse_pi30_ascii
+from powermon.protocols.pi30.definition import PROTOCOL
+from powermon.protocols.types import ProtocolType
+
+
+def _command(command_id, **parameters):
+    return CommandDefinition(
+        command_id=command_id,
+        name=command_id,
+        description="",
+        request=RequestSpec(command=command_id),
+        response=ResponseSpec(parser=parse_pi30_ascii),
+        parameters={name: ParameterSpec(name=name, pattern=pattern, description=name) for name, pattern in parameters.items()},
+    )
+
+
+COMMANDS = {
+    "QEY": _command("QEY", year=re.compile(r"\d{4}")),
+    "QEYM": _command("QEYM", year=re.compile(r"\d{4}"), month=re.compile(r"0[1-9]|1[0-2]")),
+    "QED": _command("QED", date=lambda value: len(value) == 8 and value.isdigit()),
+    "QMOD": _command("QMOD"),
+}
+SELECTORS = {
+    "mode": SelectorTarget("QMOD"),
+    "energy_year": SelectorTarget("QEY", parameter="year"),
+}
+
+
+def test_exact_aliases_and_selectors():
+    assert PROTOCOL.resolve("QPIGS").command is PROTOCOL.commands["QPIGS"]
+    assert PROTOCOL.resolve(" qvfw2").command_id == "QVFW2"
+    resolved = PROTOCOL.resolve("Battery_Voltage")
+    assert resolved.command_id == "QPIGS" and resolved.selector.reading_key == "battery_voltage"
+    # the same object every time - nothing is built for an exact / alias hit
+    assert PROTOCOL.resolve("qpigs") is PROTOCOL.resolve("QPIGS")
+
+
+def test_parameterised_families():
+    index = CommandIndex.compile(COMMANDS, SELECTORS, protocol_id="test")
+
+    assert index.resolve("QEY2023").parameters == {"year": "2023"}
+    resolved = index.resolve("qeym202312")
+    assert resolved.command_id == "QEYM" and resolved.parameters == {"year": "2023", "month": "12"}
+    assert index.resolve("QED20240131").parameters == {"date": "20240131"}
+    assert index.resolve("energy_year=2022").parameters == {"year": "2022"}
+    assert PROTOCOL.resolve("PBDV52.0").parameters == {"voltage": "52.0"}
+
+
+def test_invalid_parameters_and_unknown_commands():
+    index = CommandIndex.compile(COMMANDS, SELECTORS, protocol_id="test")
+
+    with pytest.raises(ValueError, match="Invalid parameters for QEYM: '202313'"):
+        index.resolve("QEYM202313")
+    with pytest.raises(ValueError, match="Invalid value for date"):
+        index.resolve("QED2024")
+    with pytest.raises(ValueError, match="Invalid value for year"):
+        index.resolve("energy_year=22")
+    with pytest.raises(ValueError, match="Invalid parameters for PBDV"):
+        PROTOCOL.resolve("PBDV60.0")
+    # a parameterised command (or its selector) without its parameter values
+    with pytest.raises(ValueError, match="Missing parameters for PBDV"):
+        PROTOCOL.resolve("PBDV")
+    with pytest.raises(ValueError, match=r"Missing parameters for QEYM \(expected year, month\)"):
+        index.resolve(" qeym ")
+    with pytest.raises(ValueError, match="Missing parameters for QEY"):
+        index.resolve("energy_year")
+    with pytest.raises(KeyError, match="Unknown command 'QXYZ' for protocol test"):
+        index.resolve("QXYZ")
+    with pytest.raises(KeyError, match="targets missing command"):
+        CommandIndex.compile(COMMANDS, {"broken": SelectorTarget("NOPE")})
+
+
+def test_registry_resolves_through_index():
+    registry = build_registry()
+    resolved = registry.resolve(ProtocolType.PI30, "redischarge_voltage=49.5")
+    assert resolved.command_id == "PBDV" and resolved.parameters == {"voltage": "49.5"}
+    command, selector = registry.resolve_command(ProtocolType.PI30, "QPIRI")
+    assert command.command_id == "QPIRI" and selector is None
@@ -0,0 +1,76 @@
+# tests/protocols/test_crc.py
+import binascii
+import random
+
+import pytest
+
+from powermon.protocols.crc import (
+    crc16_xmodem,
+    crc_jk232,
+    crc_pi30,
+    verify_pi30_frames,
+    victron_checksum,
+)
+from powermon.protocols.pi30.fixtures import FIXTURES
+
+FIXTURE_FRAMES = [fx.raw_response for fixtures in FIXTURES.values() for fx in fixtures]
+REQUESTS = [b"QPI", b"QPIGS", b"QPIRI", b"QID", b"QVFW", b"QVFW2", b"QMOD", b"QPIWS", b"PBCV48.0", b"POP02"]
+RANDOM = [random.Random(seed).randbytes(n) for seed, n in enumerate((0, 1, 2, 7, 64, 255, 1024))]
+
+
+def _legacy_crc_pi30(data_bytes):
+    """ the original nibble table implementation - reference for equivalence """
+    crc = 0
+    crc_ta = [0x0000, 0x1021, 0x2042, 0x3063, 0x4084, 0x50A5, 0x60C6, 0x70E7,
+              0x8108, 0x9129, 0xA14A, 0xB16B, 0xC18C, 0xD1AD, 0xE1CE, 0xF1EF]
+    for c in data_bytes:
+        da = ((crc >> 8) & 0xFF) >> 4
+        crc = (crc << 4) & 0xFFFF
+        crc ^= crc_ta[da ^ (c >> 4)]
+        da = ((crc >> 8) & 0xFF) >> 4
+        crc = (crc << 4) & 0xFFFF
+        crc ^= crc_ta[da ^ (c & 0x0F)]
+    crc_low = crc & 0xFF
+    crc_high = (crc >> 8) & 0xFF
+    if crc_low in (0x28, 0x0D, 0x0A, 0x00):
+        crc_low += 1
+    if crc_high in (0x28, 0x0D, 0x0A, 0x00):
+        crc_high += 1
+    return bytes([crc_high, crc_low])
+
+
+@pytest.mark.parametrize("data", [f[:-3] for f in FIXTURE_FRAMES] + REQUESTS + RANDOM)
+def test_crc_pi30_matches_legacy(data):
+    expected = _legacy_crc_pi30(data)
+    assert crc_pi30(data) == expected
+    assert crc_pi30(memoryview(data)) == expected
+    assert crc_pi30(bytearray(data)) == expected
+
+
+def test_crc_pi30_accepts_str():
+    assert crc_pi30("QPIGS") == crc_pi30(b"QPIGS") == b"\xb7\xa9"
+
+
+@pytest.mark.parametrize("data", REQUESTS + RANDOM)
+def test_crc16_xmodem(data):
+    assert crc16_xmodem(data) == binascii.crc_hqx(data, 0)
+
+
+def test_verify_pi30_frames_batch():
+    corrupt = FIXTURE_FRAMES[1][:5] + b"X" + FIXTURE_FRAMES[1][6:]
+    frames = FIXTURE_FRAMES + [corrupt, b"(\r", b""]
+    results = verify_pi30_frames(frames)
+    assert results == [_legacy_crc_pi30(f[:-3]) == f[-3:-1] for f in FIXTURE_FRAMES] + [False, False, False]
+    assert all(results[: len(FIXTURE_FRAMES)])
+
+
+@pytest.mark.parametrize("data", REQUESTS + RANDOM)
+def test_sum_checksums_match_legacy(data):
+    legacy_sum = 0
+    for b in data:
+        legacy_sum += b
+    assert crc_jk232(data) == [(legacy_sum >> 8) & 0xFF, legacy_sum & 0xFF]
+    legacy_ved = 0x55
+    for b in data:
+        legacy_ved -= b
+    assert victron_checksum(data) == legacy_ved & 0xFF
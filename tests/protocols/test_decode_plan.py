@@ -0,0 +1,83 @@
+# tests/protocols/test_decode_plan.py
+import pytest
+
+from powermon.protocols.decoding import DecodeError, DecodePlan, FieldError, PathError, decode_all, decode_reading
+from powermon.protocols.model import ParsedResponse, ReadingDefinition
+from powermon.protocols.pi30.definition import PROTOCOL
+from powermon.protocols.pi30.fixtures import FIXTURES
+from powermon.protocols.transforms import Affine, BitFlag, Lookup, Scale
+
+READINGS = {
+    "voltage": ReadingDefinition(label="Voltage", unit="V", dtype=float, index=0),
+    "power": ReadingDefinition(label="Power", unit="W", dtype=int, index=1),
+    "scaled": ReadingDefinition(label="Scaled", unit="V", dtype=float, index=1, transform=Scale(0.1)),
+    "int_scaled": ReadingDefinition(label="Int scaled", unit="A", dtype=int, index=1, transform=Affine(offset=1, factor=2)),
+    "flag": ReadingDefinition(label="Flag", unit="", dtype=bool, index=2, transform=BitFlag(1)),
+    "mode": ReadingDefinition(label="Mode", unit="", dtype=str, index=3, transform=Lookup({1: "on"}, default="off")),
+    "hex": ReadingDefinition(label="Hex", unit="", dtype=int, index=4, base=16),
+    "enabled": ReadingDefinition(label="Enabled", unit="", dtype=bool, index=5),
+    "padded": ReadingDefinition(label="Padded", unit="", dtype=str, index=6),
+    "unstripped": ReadingDefinition(label="Unstripped", unit="", dtype=int, index=1, strip=False),
+    "missing": ReadingDefinition(label="Missing", unit="", dtype=float, index=7),
+    "custom_missing": ReadingDefinition(label="Custom", unit="", dtype=int, index=8, missing_values={"XX"}),
+    "optional": ReadingDefinition(label="Optional", unit="", dtype=int, index=99, optional=True),
+    "nested": ReadingDefinition(label="Nested", unit="mV", dtype=int, path="cells[1].mv"),
+    "dotted": ReadingDefinition(label="Dotted", unit="", dtype=str, path="settings.mode"),
+    "bytes": ReadingDefinition(label="Bytes", unit="", dtype=str, path="name"),
+}
+
+PARSED = ParsedResponse(
+    raw=b"",
+    fields=["230.5", "0119", "0010", "1", "ff", "enabled", "  abc ", "---", "XX"],
+    data={"cells": [{"mv": 3301}, {"mv": 3302}], "settings": {"mode": "eco"}, "name": b"inv"},
+)
+
+
+def test_plan_matches_decode_reading():
+    plan = DecodePlan.compile(READINGS)
+    assert len(plan) == len(READINGS)
+    assert plan.decode(PARSED) == decode_all(PARSED, READINGS)
+    assert decode_all(PARSED, plan) == decode_all(PARSED, READINGS)
+
+
+@pytest.mark.parametrize(
+    "rd, parsed",
+    [
+        (ReadingDefinition(label="Out of range", unit="", dtype=int, index=20), PARSED),
+        (ReadingDefinition(label="No data", unit="", dtype=int, path="a.b"), ParsedResponse(raw=b"", fields=[])),
+        (ReadingDefinition(label="Bad key", unit="", dtype=int, path="cells[0].volts"), PARSED),
+        (ReadingDefinition(label="Bad index", unit="", dtype=int, path="cells[5].mv"), PARSED),
+        (ReadingDefinition(label="Undefined", unit="", dtype=int), PARSED),
+        (ReadingDefinition(label="Bad transform", unit="", dtype=str, index=6, transform=Scale(2)), PARSED),
+        (ReadingDefinition(label="Bad coerce", unit="", dtype=int, path="cells[0]"), PARSED),
+        (ReadingDefinition(label="Bad int", unit="", dtype=int, index=0), PARSED),
+    ],
+    ids=lambda v: getattr(v, "label", ""),
+)
+def test_plan_raises_like_decode_reading(rd, parsed):
+    with pytest.raises(Exception) as expected:
+        decode_reading(parsed, rd)
+    with pytest.raises(expected.type) as actual:
+        DecodePlan.compile({"x": rd}).decode(parsed)
+    assert str(actual.value) == str(expected.value)
+    assert issubclass(expected.type, (DecodeError, FieldError, PathError, ValueError))
+
+
+def test_pi30_fixtures_decode_identically():
+    framing = PROTOCOL.framing
+    checked = 0
+    for command_id, fixtures in FIXTURES.items():
+        cmd = PROTOCOL.commands[command_id]
+        for fixture in fixtures:
+            try:
+                parsed = cmd.response.parse(framing.strip(fixture.raw_response))
+            except ValueError:
+                continue
+            assert cmd.decode_plan.decode(parsed) == decode_all(parsed, cmd.readings)
+            checked += 1
+    assert checked >= 10
+
+
+def test_decode_plan_is_compiled_once():
+    cmd = PROTOCOL.commands["QPIGS"]
+    assert cmd.decode_plan is cmd.decode_plan
@@ -0,0 +1,90 @@
+# tests/protocols/test_request_cache.py
+from dataclasses import replace
+from types import SimpleNamespace
+
+import pytest
+
+from powermon.ports import PortType
+from powermon.ports.port import Port
+from powermon.protocols.daly.framing import DalyFrameSpec
+from powermon.protocols.framing import EncodeContext
+from powermon.protocols.pi30.definition import PROTOCOL
+from powermon.protocols.requestcache import REQUEST_FRAMES, CacheInfo, RequestFrameCache
+
+SERIAL = EncodeContext(port_type=PortType.SERIAL)
+
+
+def test_frames_built_once_then_served_from_cache():
+    cache = RequestFrameCache()
+    qpigs = PROTOCOL.commands["QPIGS"]
+
+    first = cache.build(PROTOCOL, qpigs, ctx=SERIAL)
+    assert first == b"QPIGS\xb7\xa9\r"
+    assert cache.build(PROTOCOL, qpigs, ctx=SERIAL) is first
+    assert cache.cache_info() == CacheInfo(hits=1, misses=1, evictions=0, size=1, maxsize=256)
+
+    # parameters and context are part of the key
+    pbdv = PROTOCOL.commands["PBDV"]
+    assert cache.build(PROTOCOL, pbdv, {"voltage": "52.0"}, ctx=SERIAL).startswith(b"PBDV52.0")
+    assert cache.build(PROTOCOL, pbdv, {"voltage": "49.5"}, ctx=SERIAL).startswith(b"PBDV49.5")
+    cache.build(PROTOCOL, qpigs, ctx=EncodeContext(port_type=PortType.USB))
+    assert cache.cache_info().misses == 4
+
+
+def test_missing_or_invalid_parameters_raise():
+    cache = RequestFrameCache()
+    pbdv = PROTOCOL.commands["PBDV"]
+    for params in (None, {}, {"volts": "52.0"}):
+        with pytest.raises(ValueError, match="Missing parameters for PBDV: voltage"):
+            cache.build(PROTOCOL, pbdv, params, ctx=SERIAL)
+    with pytest.raises(ValueError, match="Invalid value for"):
+        cache.build(PROTOCOL, pbdv, {"voltage": "60.0"}, ctx=SERIAL)
+    # nothing was cached
+    assert len(cache) == 0
+
+
+def test_encode_request_framings_and_address():
+    cache = RequestFrameCache()
+    proto = replace(PROTOCOL, framing=DalyFrameSpec())
+    command = replace(PROTOCOL.commands["QPI"], request=replace(PROTOCOL.commands["QPI"].request, command="90"))
+
+    host = cache.build(proto, command, ctx=SERIAL)
+    unit = cache.build(proto, command, ctx=EncodeContext(port_type=PortType.SERIAL, address=3))
+    assert host[:3] == b"\xa5\x40\x90" and unit[:3] == b"\xa5\x03\x90"
+    assert cache.build(proto, command, ctx=SERIAL) is host
+
+
+def test_lru_eviction_and_invalidation():
+    cache = RequestFrameCache(maxsize=2)
+    qpi, qid, qpiri = (PROTOCOL.commands[c] for c in ("QPI", "QID", "QPIRI"))
+    cache.build(PROTOCOL, qpi, ctx=SERIAL)
+    cache.build(PROTOCOL, qid, ctx=SERIAL)
+    cache.build(PROTOCOL, qpi, ctx=SERIAL)    # QPI is now the most recently used
+    cache.build(PROTOCOL, qpiri, ctx=SERIAL)  # evicts QID
+    cache.build(PROTOCOL, qpi, ctx=SERIAL)
+    assert cache.cache_info() == CacheInfo(hits=2, misses=3, evictions=1, size=2, maxsize=2)
+
+    # a changed definition is rebuilt, not served stale
+    changed = replace(qpi, request=replace(qpi.request, crc=False))
+    assert cache.build(PROTOCOL, changed, ctx=SERIAL) == b"QPI\r"
+
+    cache.invalidate(PROTOCOL)
+    assert len(cache) == 0
+
+
+def test_port_full_command_uses_shared_cache():
+    class _Port(Port):
+        port_type = PortType.SERIAL
+
+        def is_connected(self):
+            return False
+
+    port = _Port(protocol=PROTOCOL)
+    action = SimpleNamespace(get_command=lambda: "pbdv50.5")
+    REQUEST_FRAMES.invalidate()
+    before = REQUEST_FRAMES.cache_info()
+
+    assert port.full_command(action) == port.full_command(action)
+    assert port.full_command(action).startswith(b"PBDV50.5")
+    after = REQUEST_FRAMES.cache_info()
+    assert (after.misses - before.misses, after.hits - before.hits) == (1, 2)
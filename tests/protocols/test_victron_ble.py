@@ -0,0 +1,98 @@
+# tests/protocols/test_victron_ble.py
+import pytest
+
+from powermon.exceptions import InvalidResponse
+from powermon.protocols import build_registry
+from powermon.protocols.decoding import decode_all
+from powermon.protocols.types import ProtocolType
+from powermon.protocols.victron_ble.advertisement import AdvertisementHeader, decrypt, parse_key, unpack_bits
+from powermon.protocols.victron_ble.definition import PROTOCOL
+from powermon.protocols.victron_ble.fixtures import (
+    ADVERTISEMENTS,
+    BATTERY_MONITOR_FIXTURES,
+    FIXTURE_KEY,
+    SOLAR_CHARGER_FIXTURES,
+)
+
+FIXTURES = {"SOLAR_CHARGER": SOLAR_CHARGER_FIXTURES, "BATTERY_MONITOR": BATTERY_MONITOR_FIXTURES}
+
+
+def _decode(command_id, frame):
+    framing = PROTOCOL.framing
+    framing.validate(frame)
+    framing.verify_crc(frame)
+    cmd = PROTOCOL.commands[command_id]
+    return decode_all(cmd.response.parse(framing.strip(frame)), cmd.decode_plan)
+
+
+def test_registered():
+    registry = build_registry()
+    assert registry.get(ProtocolType.VICTRON_BLE) is PROTOCOL
+    command, _ = registry.resolve_command(ProtocolType.VICTRON_BLE, "smartshunt")
+    assert command.command_id == "BATTERY_MONITOR"
+
+
+def test_solar_charger():
+    values = _decode("SOLAR_CHARGER", SOLAR_CHARGER_FIXTURES[0].raw_response)
+    assert values == {
+        "charger_state": "Bulk",
+        "charger_error": 0,
+        "battery_voltage": pytest.approx(13.65),
+        "battery_current": pytest.approx(8.5),
+        "yield_today": pytest.approx(1.23),
+        "pv_power": 120,
+        "load_current": None,
+    }
+
+
+def test_battery_monitor_starter_aux():
+    values = _decode("BATTERY_MONITOR", BATTERY_MONITOR_FIXTURES[0].raw_response)
+    assert values["battery_voltage"] == pytest.approx(13.25)
+    assert values["battery_current"] == pytest.approx(-2.345)
+    assert values["state_of_charge"] == pytest.approx(87.4)
+    assert values["consumed_ah"] == pytest.approx(-12.3)
+    assert values["time_to_go"] == 1234
+    assert values["aux_input"] == "Starter voltage"
+    assert values["starter_voltage"] == pytest.approx(12.54)
+    assert values["temperature"] is None and values["midpoint_voltage"] is None
+
+
+def test_battery_monitor_temperature_aux_and_not_available():
+    values = _decode("BATTERY_MONITOR", BATTERY_MONITOR_FIXTURES[1].raw_response)
+    assert values["time_to_go"] is None
+    assert values["battery_current"] == pytest.approx(1.5)
+    assert values["state_of_charge"] == pytest.approx(100.0)
+    assert values["aux_input"] == "Temperature"
+    assert values["temperature"] == pytest.approx(25.0)
+    assert values["starter_voltage"] is None
+
+
+def test_wrong_record_type_rejected():
+    with pytest.raises(InvalidResponse, match="expected BATTERY_MONITOR"):
+        _decode("BATTERY_MONITOR", SOLAR_CHARGER_FIXTURES[0].raw_response)
+
+
+def test_unpack_bits_signed_and_not_available():
+    record = (0x7FFF | (0b111 << 16) | (0b101 << 19)).to_bytes(3, "little")
+    assert unpack_bits(record, [("a", 16, True), ("b", 3, False), ("c", 3, True)]) == {"a": None, "b": None, "c": -3}
+    with pytest.raises(InvalidResponse, match="too short"):
+        unpack_bits(b"\x00", [("a", 16, False)])
+
+
+def test_header_and_key():
+    header = AdvertisementHeader.parse(ADVERTISEMENTS["BATTERY_MONITOR"][0])
+    assert (header.model_id, header.record_type, header.iv) == (0xA389, 0x02, 0x1A2B)
+    with pytest.raises(InvalidResponse, match="prefix"):
+        AdvertisementHeader.parse(b"\x20" * 10)
+    with pytest.raises(ValueError, match="16 bytes"):
+        parse_key("abcd")
+    wrong_key = "00" + FIXTURE_KEY[2:]
+    with pytest.raises(InvalidResponse, match="wrong key"):
+        decrypt(ADVERTISEMENTS["BATTERY_MONITOR"][0], wrong_key)
+
+
+@pytest.mark.parametrize("command_id", ["SOLAR_CHARGER", "BATTERY_MONITOR"])
+def test_decrypt_recorded_advertisements(command_id):
+    pytest.importorskip("Crypto")
+    for advertisement, fixture in zip(ADVERTISEMENTS[command_id], FIXTURES[command_id]):
+        assert decrypt(advertisement, FIXTURE_KEY) == fixture.raw_response
@@ -0,0 +1,81 @@
+# tests/runtime/test_device_readings_cache.py
+import asyncio
+from types import SimpleNamespace
+
+from powermon.commands.result import Result, ResultType
+from powermon.domain.device import Device
+from powermon.domain.task_cache_query import TaskCacheQuery
+from powermon.domain.triggers.trigger_seconds import TriggerSeconds
+from powermon.protocols.pi30.definition import PROTOCOL
+from powermon.protocols.pi30.fixtures import FIXTURES
+from powermon.runtime.readings_cache import ReadingsCache
+
+
+class FakeOutput:
+    def __init__(self):
+        self.results = []
+
+    def process(self, command, result, device):
+        self.results.append(result)
+
+
+def _device():
+    device = Device(name="inverter", serial_number="123", model="", manufacturer="", port=SimpleNamespace(protocol=PROTOCOL))
+    device.readings_cache = ReadingsCache()
+    return device
+
+
+def _task(command):
+    return SimpleNamespace(get_command=lambda: command, command_definition=PROTOCOL.resolve(command).command, outputs=[FakeOutput()])
+
+
+def test_raw_response_decoded_into_cache_and_outputs():
+    device = _device()
+    task = _task("QPI")
+    # the port hands back a view of its receive buffer
+    device.process_result(task, memoryview(bytearray(b"(PI30\x9a\x0b\r")))
+    assert device.readings_cache.value("inverter", "protocol_id") == "PI30"
+
+    result = task.outputs[0].results[0]
+    assert isinstance(result, Result) and result.result_type is ResultType.DECODED and result.is_valid
+    assert [(reading.data_name, reading.data_value, reading.data_unit) for reading in result.readings] == [("Protocol Id", "PI30", "")]
+
+
+def test_reading_selector_outputs_one_reading():
+    device = _device()
+    task = _task("battery_voltage")
+    device.process_result(task, FIXTURES["QPIGS"][0].raw_response)
+    readings = task.outputs[0].results[0].readings
+    assert [(reading.data_value, reading.data_unit) for reading in readings] == [(57.5, "V")]
+
+
+def test_undecodable_response_is_an_error_result():
+    device = _device()
+    task = _task("QPI")
+    device.process_result(task, b"(PI30\x00\x00\r")
+    assert device.readings_cache.keys("inverter") == []
+    result = task.outputs[0].results[0]
+    assert result.error and not result.is_valid and "CRC mismatch" in str(result.error_messages[0])
+
+
+def test_cache_query_task_added_without_command_lookup():
+    device = _device()
+    task = TaskCacheQuery(command_str="bms/battery_voltage", trigger=TriggerSeconds(seconds=60), outputs=[], config=None)
+    device.add_task(task)
+    assert device.tasks == [task] and task.command_definition is None
+
+
+def test_cache_queries_answered_after_the_batch_due_with_them():
+    responses = {"QPI": b"(PI30\x9a\x0b\r", "battery_voltage": FIXTURES["QPIGS"][0].raw_response}
+
+    async def _execute_batch(tasks):
+        return [responses[task.get_command()] for task in tasks]
+
+    device = _device()
+    device.port.execute_batch = _execute_batch
+    query = TaskCacheQuery(command_str="inverter/protocol_id, inverter/battery_voltage", trigger=TriggerSeconds(seconds=60),
+                           outputs=[FakeOutput()], config=None)
+    # the query is listed first, but answered from this poll's readings
+    asyncio.run(device.run_tasks([query, _task("QPI"), _task("battery_voltage")]))
+    assert [(reading.data_name, reading.data_value) for reading in query.outputs[0].results[0].readings] == [
+        ("inverter_protocol_id", "PI30"), ("inverter_battery_voltage", 57.5)]
@@ -0,0 +1,63 @@
+# tests/runtime/test_readings_cache.py
+from types import SimpleNamespace
+
+import pytest
+
+from powermon.runtime.readings_cache import ReadingsCache, ReadingSeries, Sample
+
+
+def test_series_ring_buffer_keeps_newest():
+    series = ReadingSeries(capacity=3)
+    for i in range(5):
+        series.append(float(i), i * 10)
+    assert len(series) == 3
+    assert list(series) == [Sample(2.0, 20.0), Sample(3.0, 30.0), Sample(4.0, 40.0)]
+    assert series.latest() == Sample(4.0, 40.0)
+    assert series.is_numeric
+
+
+def test_series_range_and_aggregate():
+    series = ReadingSeries(capacity=4)
+    for i in range(6):
+        series.append(float(i), float(i))
+    assert [s.timestamp for s in series.range(3, 4)] == [3.0, 4.0]
+    assert [s.timestamp for s in series.range(start=4)] == [4.0, 5.0]
+    assert [s.timestamp for s in series.range(end=2)] == [2.0]
+    agg = series.aggregate(start=3)
+    assert (agg.count, agg.minimum, agg.maximum, agg.mean) == (3, 3.0, 5.0, 4.0)
+    assert agg.first == Sample(3.0, 3.0) and agg.last == Sample(5.0, 5.0)
+    assert series.aggregate(start=100) is None
+
+
+def test_series_falls_back_to_list_for_strings():
+    series = ReadingSeries(capacity=3)
+    series.append(1.0, 1)
+    series.append(2.0, "Battery")
+    assert not series.is_numeric
+    assert list(series) == [Sample(1.0, 1.0), Sample(2.0, "Battery")]
+    assert series.aggregate().count == 1
+
+
+def test_series_capacity():
+    with pytest.raises(ValueError):
+        ReadingSeries(capacity=0)
+
+
+def test_cache_record_and_query():
+    cache = ReadingsCache(capacity=10)
+    cache.record_many("bms", {"battery_voltage": 52.1, "battery_state_of_charge": 80}, timestamp=100)
+    cache.record_many("bms", [SimpleNamespace(data_name="Battery Voltage", data_value=52.3, data_unit="V", is_valid=True),
+                              SimpleNamespace(data_name="Bad", data_value="x", data_unit="", is_valid=False)], timestamp=110)
+    assert cache.devices() == ["bms"] and "bms" in cache
+    assert cache.keys("bms") == ["battery_voltage", "battery_state_of_charge"]
+    assert cache.latest("bms", "Battery Voltage") == Sample(110, 52.3)
+    assert cache.series("bms", "battery_voltage").unit == "V"
+    assert cache.value("bms", "battery_voltage") == 52.3
+    assert cache.value("bms", "battery_voltage", max_age=5, now=120) is None
+    assert cache.value("inverter", "battery_voltage", default=0) == 0
+    assert cache.snapshot("bms") == {"battery_voltage": 52.3, "battery_state_of_charge": 80}
+    assert [s.value for s in cache.range("bms", "battery_voltage", start=105)] == [52.3]
+    assert cache.aggregate("bms", "battery_voltage").mean == pytest.approx(52.2)
+    assert len(cache) == 2  # readings (series), not samples
+    cache.clear("bms")
+    assert cache.devices() == []
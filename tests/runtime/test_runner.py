@@ -0,0 +1,115 @@
+# tests/runtime/test_runner.py
+import asyncio
+import time
+
+from powermon.domain.triggers.trigger_seconds import TriggerSeconds
+from powermon.runtime.runner import RuntimeState, run_devices
+
+
+class FakeDaemon:
+    def __init__(self):
+        self.watchdog_calls = 0
+
+    def watchdog(self):
+        self.watchdog_calls += 1
+
+
+class FakeTask:
+    def __init__(self, name, seconds):
+        self.name = name
+        self.trigger = TriggerSeconds(seconds=seconds)
+
+    def __str__(self):
+        return self.name
+
+
+class FakeDevice:
+    def __init__(self, name, delay=0.0, fail=False, seconds=60, tasks=1):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.tasks = [FakeTask(f"{name}-task{i}", seconds) for i in range(tasks)]
+        self.runs = 0
+        self.run_times = []
+        self.batches = []
+
+    async def run_task(self, task):
+        self.runs += 1
+        self.run_times.append(time.time())
+        task.trigger.touch()
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+
+    async def run_tasks(self, tasks):
+        self.batches.append([str(task) for task in tasks])
+        for task in tasks:
+            await self.run_task(task)
+
+
+def _run_for(devices, seconds):
+    async def _run():
+        state = RuntimeState()
+        runner = asyncio.create_task(run_devices(devices, state, FakeDaemon()))
+        await asyncio.sleep(seconds)
+        state.stop()
+        await asyncio.wait_for(runner, timeout=1)
+
+    asyncio.run(_run())
+
+
+def test_devices_run_concurrently():
+    devices = [FakeDevice(f"dev{i}", delay=0.2) for i in range(8)]
+
+    start = time.perf_counter()
+    asyncio.run(run_devices(devices, RuntimeState(), FakeDaemon(), once=True))
+    elapsed = time.perf_counter() - start
+
+    assert all(d.runs == 1 for d in devices)
+    # sequential execution would take 1.6s
+    assert elapsed < 0.8
+
+
+def test_failing_device_does_not_stop_others():
+    good = FakeDevice("good", seconds=0.1)
+    bad = FakeDevice("bad", fail=True, seconds=0.1)
+
+    _run_for([good, bad], 0.5)
+
+    assert good.runs >= 2
+    assert bad.runs >= 2
+
+
+def test_stop_wakes_sleeping_runtime():
+    device = FakeDevice("idle", seconds=60)
+
+    async def _run():
+        state = RuntimeState()
+        runner = asyncio.create_task(run_devices([device], state, FakeDaemon()))
+        await asyncio.sleep(0.05)
+        state.stop()
+        await asyncio.wait_for(runner, timeout=0.5)
+
+    asyncio.run(_run())
+    assert device.runs == 1
+
+
+def test_tasks_run_at_fixed_rate_despite_latency():
+    device = FakeDevice("slow", delay=0.07, seconds=0.1)
+
+    _run_for([device], 0.55)
+
+    # anchored to the first run - each run starts on the 0.1s grid even though each takes 0.07s
+    first = device.run_times[0]
+    offsets = [(t - first) % 0.1 for t in device.run_times]
+    assert len(device.run_times) >= 5
+    assert all(min(o, 0.1 - o) < 0.03 for o in offsets)
+
+
+def test_tasks_due_together_run_as_a_batch():
+    device = FakeDevice("inverter", delay=0.01, tasks=4)
+
+    asyncio.run(run_devices([device], RuntimeState(), FakeDaemon(), once=True))
+
+    assert device.runs == 4
+    assert device.batches == [[f"inverter-task{i}" for i in range(4)]]
@@ -0,0 +1,51 @@
+# tests/runtime/test_scheduler.py
+import time
+
+from powermon.domain.triggers.trigger_seconds import TriggerSeconds
+from powermon.runtime.scheduler import Scheduler
+
+
+class Unorderable:
+    """ task stand-in that cannot be compared (ties must not fall through to the task) """
+    __lt__ = None
+
+
+def test_pop_due_in_due_order():
+    scheduler = Scheduler()
+    tasks = {due: Unorderable() for due in (5.0, 1.0, 3.0, 3.0, 9.0)}
+    for due, task in tasks.items():
+        scheduler.schedule(due, "dev", task)
+    scheduler.schedule(3.0, "dev", Unorderable())
+
+    assert len(scheduler) == 5
+    assert scheduler.next_due() == 1.0
+    due = scheduler.pop_due(now=4.0)
+    assert [task for _, task in due][:2] == [tasks[1.0], tasks[3.0]]
+    assert len(due) == 3
+    assert scheduler.next_due() == 5.0
+
+
+def test_unscheduled_trigger_is_not_added():
+    scheduler = Scheduler()
+    assert scheduler.schedule(None, "dev", "task") is False
+    assert len(scheduler) == 0
+    assert scheduler.next_due() is None
+    assert scheduler.pop_due(now=time.time()) == []
+
+
+def test_trigger_seconds_is_anchored_to_first_run(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    trigger = TriggerSeconds(seconds=10)
+    assert trigger.next_run == 1000.0
+
+    # each run starts late (command latency / loop jitter) - next run stays on the 10s grid
+    for started in (1000.0, 1010.4, 1020.9, 1030.2):
+        clock[0] = started
+        trigger.touch()
+        assert trigger.next_run == (started // 10 + 1) * 10
+
+    # missed slots are skipped rather than run back to back
+    clock[0] = 1075.0
+    trigger.touch()
+    assert trigger.next_run == 1080.0
@@ -0,0 +1,44 @@
+# tests/runtime/test_task_cache_query.py
+import pytest
+
+from powermon.domain.task_cache_query import CacheQuery, TaskCacheQuery
+from powermon.domain.triggers.trigger_seconds import TriggerSeconds
+from powermon.exceptions import ConfigError
+from powermon.runtime.readings_cache import ReadingsCache
+
+
+def _task(command):
+    return TaskCacheQuery(command_str=command, trigger=TriggerSeconds(seconds=60), outputs=[], config=None)
+
+
+def test_parse_queries():
+    assert CacheQuery.parse(" bms/battery_voltage ") == CacheQuery("bms", "battery_voltage")
+    assert CacheQuery.parse("bms/battery_current:MEAN:300") == CacheQuery("bms", "battery_current", "mean", 300.0)
+    for bad in ("battery_voltage", "bms/x:median", "bms/x:mean:soon"):
+        with pytest.raises(ConfigError):
+            CacheQuery.parse(bad)
+    with pytest.raises(ConfigError):
+        _task(" , ")
+
+
+def test_query_cache():
+    cache = ReadingsCache()
+    for ts, amps in ((100, 10.0), (200, 20.0), (300, 30.0)):
+        cache.record("bms", "battery_current", amps, timestamp=ts, unit="A")
+    cache.record("bms", "battery_voltage", 52.0, timestamp=300, unit="V")
+    cache.record("inverter", "mode", "Line", timestamp=300)
+
+    result = _task("bms/battery_current:mean:150, bms/battery_current:count, inverter/*, bms/missing").query(cache, now=320)
+    assert not result.error
+    assert [(r.data_name, r.data_value, r.data_unit) for r in result.readings] == [
+        ("bms_battery_current_mean", 25.0, "A"),
+        ("bms_battery_current_count", 3, ""),
+        ("inverter_mode", "Line", ""),
+    ]
+    filtered = result.with_readings(result.readings[:1])
+    assert len(filtered.readings) == 1 and len(result.readings) == 3
+
+
+def test_query_without_cache_is_an_error():
+    result = _task("bms/battery_voltage").query(None)
+    assert result.error and not result.is_valid
@@ -0,0 +1,77 @@
+""" tests / unit / test_reading_array.py """
+from types import SimpleNamespace
+
+from powermon.commands.reading import Reading
+from powermon.commands.readingarray import ReadingArray, ReadingLayout, ReadingView
+from powermon.commands.reading_definition import ReadingDefinition, ReadingType, ResponseType
+from powermon.commands.command_definition import CommandDefinition
+from powermon.commands.result import Result, ResultType
+
+
+def _cell_command() -> CommandDefinition:
+    """ a NEEY style CONSTRUCT command - 24 cell voltages """
+    definitions = {}
+    for cell in range(1, 25):
+        key = f"cell_{cell:02d}_voltage"
+        definitions[key] = ReadingDefinition.from_config(
+            {"description": key, "reading_type": ReadingType.VOLTS, "response_type": ResponseType.FLOAT, "device_class": "voltage"}, key)
+    definitions["mode"] = ReadingDefinition.from_config({"description": "mode", "response_type": ResponseType.LIST, "options": ["off", "on"]}, "mode")
+    return CommandDefinition(code="CELLS", description="cell info", help_text="", result_type=ResultType.CONSTRUCT, reading_definitions=definitions)
+
+
+def _result(command_definition, responses) -> Result:
+    command = SimpleNamespace(command_definition=command_definition, override=None, code=command_definition.code)
+    return Result(command=command, raw_response=b"raw", responses=responses)
+
+
+def test_result_readings_are_compact_views():
+    command_definition = _cell_command()
+    responses = [(f"cell_{cell:02d}_voltage", 3.3 + cell / 1000) for cell in range(1, 25)] + [("mode", b"1"), ("mode", b"7")]
+    result = _result(command_definition, responses)
+
+    readings = result.readings
+    assert isinstance(readings, ReadingArray) and len(readings) == 26
+    first = readings[0]
+    assert isinstance(first, ReadingView)
+    assert (first.data_name, first.data_value, first.data_unit, first.device_class, first.is_valid) == ("cell_01_voltage", 3.301, "V", "voltage", True)
+    assert (readings[24].data_value, readings[24].definition.options) == ("on", ["off", "on"])
+    # the out of range option is an invalid reading - flagged in the bitmap
+    assert not readings[-1].is_valid and readings[-1].data_value.startswith("Invalid response for mode")
+    assert [reading.is_valid for reading in readings].count(False) == readings.invalid_count() == 1
+    assert str(first) == "Reading: self.data_name='cell_01_voltage', self.data_value=3.301, self.data_unit='V', self.is_valid=True"
+    assert readings[24].to_dto().data_value == "on"
+
+
+def test_metadata_interned_per_command():
+    command_definition = _cell_command()
+    responses = [(f"cell_{cell:02d}_voltage", 3.3) for cell in range(1, 25)]
+    first = _result(command_definition, responses).readings
+    second = _result(command_definition, responses).readings
+    # every poll shares the same metadata objects
+    assert all(a is b for a, b in zip(first.metas, second.metas))
+    assert len(ReadingLayout.for_command(command_definition)) == 24
+    assert ReadingLayout.for_command(_cell_command()) is not ReadingLayout.for_command(command_definition)
+
+
+def test_with_readings_and_add_readings():
+    command_definition = _cell_command()
+    result = _result(command_definition, [("cell_01_voltage", 3.3), ("cell_02_voltage", 3.4)])
+    filtered = result.with_readings(result.readings[1:])
+    assert [reading.data_name for reading in filtered.readings] == ["cell_02_voltage"]
+    assert len(result.readings) == 2
+
+    extra = Reading(raw_value=None, processed_value="x", definition=ReadingDefinition.from_config({"description": "Extra"}))
+    extra.is_valid = False
+    result.add_readings([extra])
+    assert (result.readings[-1].data_name, result.readings[-1].is_valid) == ("Extra", False)
+
+
+def test_metadata_keyed_on_options():
+    layout = ReadingLayout()
+    modes = [ReadingDefinition.from_config({"description": "mode", "response_type": ResponseType.LIST, "options": options}, "mode")
+             for options in (["off", "on"], ["standby", "line", "battery"], {"0": "off", "1": "on"})]
+    metas = [layout.meta(definition) for definition in modes]
+    # same name / unit / class, different options - each reading keeps a definition with its own options
+    assert len({id(meta) for meta in metas}) == 3
+    assert [meta.definition.options for meta in metas] == [definition.options for definition in modes]
+    assert layout.meta(ReadingDefinition.from_config({"description": "mode", "response_type": ResponseType.LIST, "options": ["off", "on"]}, "mode")) is metas[0]